@@ -0,0 +1,150 @@
+"""
+Compares end-to-end graph latency with LLM-planned and direct tool calls.
+
+The LLMs and the vector search are replaced with stand-ins that sleep for a
+configurable latency, so the benchmark runs offline; the ML tools are real.
+
+Usage:
+    poetry run python -m benchmarks.bench_graph_modes --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import numpy as np
+from langchain_core.messages import AIMessage
+
+from src.app import graph
+from src.app.config import settings
+
+FRAUD_REQUEST = {
+    "transaction_id": "t12345",
+    "customer_id": "c67890",
+    "transaction_amount": 2500.75,
+    "merchant_id": "m54321",
+    "merchant_category": "electronics",
+    "transaction_hour": 3,
+}
+CREDIT_REQUEST = {
+    "application_id": "a98765",
+    "customer_id": "c11223",
+    "loan_amount": 50000,
+    "annual_income": 80000,
+    "credit_score": 650,
+    "dti_ratio": 0.45,
+    "employment_length_years": 2,
+}
+
+
+class SimulatedLLM:
+    """Answers every prompt with a fixed message after `latency` seconds."""
+
+    def __init__(self, message: AIMessage, latency: float):
+        self.message = message
+        self.latency = latency
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.message
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self.message
+
+
+class SimulatedVectorSearch:
+    name = "query_databricks_vector_search"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def ainvoke(self, args: dict) -> str:
+        await asyncio.sleep(self.latency)
+        return json.dumps([{"source": "bench", "content": args["query"]}])
+
+
+def _planned_calls(ml_tool: str, ml_arg: str, payload: dict) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"name": ml_tool, "args": {ml_arg: payload}, "id": "ml"},
+            {
+                "name": "query_databricks_vector_search",
+                "args": {"query": "history"},
+                "id": "rag",
+            },
+        ],
+    )
+
+
+async def _run(payloads: list, concurrency: int) -> np.ndarray:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(payload):
+        async with semaphore:
+            start = time.perf_counter()
+            # A fresh thread per request, so no request reuses another's results.
+            config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            await graph.app.ainvoke({"input_data": payload, "messages": []}, config)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    return np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--rag-latency-ms", type=float, default=80.0)
+    args = parser.parse_args()
+
+    llm_latency = args.llm_latency_ms / 1000
+    graph.fraud_agent_llm = SimulatedLLM(
+        _planned_calls("run_fraud_detection_model", "transaction_data", FRAUD_REQUEST),
+        llm_latency,
+    )
+    graph.credit_agent_llm = SimulatedLLM(
+        _planned_calls(
+            "run_credit_risk_model", "loan_application_data", CREDIT_REQUEST
+        ),
+        llm_latency,
+    )
+    graph.triage_llm = SimulatedLLM(AIMessage(content="general_query"), llm_latency)
+    graph.synthesis_llm = SimulatedLLM(AIMessage(content="Summary."), llm_latency)
+    graph.query_databricks_vector_search = SimulatedVectorSearch(
+        args.rag_latency_ms / 1000
+    )
+
+    payloads = [FRAUD_REQUEST, CREDIT_REQUEST] * (args.requests // 2)
+    print(
+        f"{len(payloads)} requests, concurrency {args.concurrency}, "
+        f"LLM {args.llm_latency_ms:.0f} ms, RAG {args.rag_latency_ms:.0f} ms"
+    )
+    print(f"{'mode':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>8} {'llm calls':>10}")
+    for mode in ("llm", "direct"):
+        settings.AGENT_TOOL_MODE = mode
+        asyncio.run(_run(payloads[:2], 2))  # Warm up model loading.
+        llms = (graph.fraud_agent_llm, graph.credit_agent_llm, graph.synthesis_llm)
+        calls_before = sum(llm.calls for llm in llms)
+        start = time.perf_counter()
+        latencies = asyncio.run(_run(payloads, args.concurrency))
+        elapsed = time.perf_counter() - start
+        llm_calls = sum(llm.calls for llm in llms) - calls_before
+        print(
+            f"{mode:>8} {np.percentile(latencies, 50) * 1e3:>9.1f} "
+            f"{np.percentile(latencies, 99) * 1e3:>9.1f} "
+            f"{len(payloads) / elapsed:>8.1f} {llm_calls:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
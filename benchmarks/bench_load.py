@@ -0,0 +1,255 @@
+"""
+Load-tests the chat API end to end, offline, against a stored baseline.
+
+N concurrent sessions each send a sequence of chat turns to the ASGI app,
+in-process and with its lifespan. The LLMs and the vector search are the
+deterministic fakes from `benchmarks.fakes`; the fraud and credit models
+are the real joblib models from the training scripts. Reports throughput,
+request latency, latency per graph node, LLM and tool (from each request's
+timing breakdown) and peak memory. With --check, the run fails when it is
+worse than the baseline by more than the tolerance.
+
+Usage (after training the fraud and credit models):
+    poetry run python -m benchmarks.bench_load --sessions 32 --turns 4
+    poetry run python -m benchmarks.bench_load --check
+    poetry run python -m benchmarks.bench_load --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+from benchmarks.fakes import LatencyModel, install_fakes
+from src.app import graph
+from src.app.config import settings
+from src.app.tools.ml_models import model_registry
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "bench_load.json")
+REQUIRED_MODELS = {
+    "fraud_detection_model.joblib": "python -m data_processing.train_fraud_model",
+    "credit_risk_model.joblib": "python -m data_processing.train_credit_model",
+}
+GENERAL_QUERIES = (
+    "What are common signs of card-not-present fraud?",
+    "How is a debt-to-income ratio calculated?",
+    "When should a transaction be escalated for manual review?",
+)
+
+
+def session_turns(session: int, turns: int, seed: int) -> list:
+    """The payloads one session sends, drawn deterministically from the seed."""
+    rng = random.Random(seed * 100_003 + session)
+    payloads = []
+    for turn in range(turns):
+        kind = rng.choice(("fraud", "credit", "general"))
+        if kind == "fraud":
+            payloads.append(
+                {
+                    "transaction_id": f"t{session}-{turn}",
+                    "customer_id": f"c{rng.randrange(500)}",
+                    "merchant_id": f"m{rng.randrange(200)}",
+                    "transaction_amount": round(rng.lognormvariate(4.0, 1.5), 2),
+                    "timestamp": f"2025-07-22T{rng.randrange(24):02d}:30:00Z",
+                }
+            )
+        elif kind == "credit":
+            payloads.append(
+                {
+                    "application_id": f"a{session}-{turn}",
+                    "customer_id": f"c{rng.randrange(500)}",
+                    "loan_amount": rng.randrange(1_000, 100_000),
+                    "annual_income": rng.randrange(20_000, 200_000),
+                    "employment_length_years": rng.randrange(0, 30),
+                    "dti_ratio": round(rng.uniform(0.05, 0.6), 2),
+                }
+            )
+        else:
+            payloads.append({"text_query": rng.choice(GENERAL_QUERIES)})
+    return payloads
+
+
+async def _chat(client: httpx.AsyncClient, payload: dict, thread_id: str) -> dict:
+    response = await client.post(
+        "/chat",
+        params={"timings": "true"},
+        json={"query": payload, "thread_id": thread_id},
+    )
+    response.raise_for_status()
+    return response.json()["timings"]
+
+
+async def _run(app, sessions: int, turns: int, seed: int) -> tuple:
+    """Returns request latencies (s), spans by name and the wall time (s)."""
+    latencies, spans = [], defaultdict(list)
+
+    async def session(client, index):
+        thread_id = str(uuid.uuid4())
+        for payload in session_turns(index, turns, seed):
+            started = time.perf_counter()
+            timings = await _chat(client, payload, thread_id)
+            latencies.append(time.perf_counter() - started)
+            for span in timings["spans"]:
+                spans[f"{span['kind']}:{span['name']}"].append(span["duration_ms"])
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(session(client, i) for i in range(sessions)))
+        elapsed = time.perf_counter() - started
+    return np.asarray(latencies), spans, elapsed
+
+
+async def _load_test(args) -> dict:
+    # Imported here, after the UI is disabled, so Gradio is never loaded.
+    settings.GRADIO_UI_ENABLED = False
+    from src.app.main import app
+
+    async with app.router.lifespan_context(app):
+        await _run(app, min(args.sessions, 4), 1, args.seed + 1)  # Warm up.
+        latencies, spans, elapsed = await _run(
+            app, args.sessions, args.turns, args.seed
+        )
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms": _percentiles(latencies * 1e3),
+        "spans_ms": {name: _percentiles(np.asarray(v)) for name, v in spans.items()},
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / (2**20 if sys.platform == "darwin" else 2**10),
+    }
+
+
+def _percentiles(values: np.ndarray) -> dict:
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+
+def regressions(result: dict, baseline: dict, tolerance: float, min_ms: float):
+    """Describes every metric that is worse than the baseline beyond tolerance."""
+    found = []
+    if result["requests_per_second"] < baseline["requests_per_second"] * (
+        1 - tolerance
+    ):
+        found.append(
+            f"throughput {result['requests_per_second']:.1f} req/s < baseline "
+            f"{baseline['requests_per_second']:.1f}"
+        )
+    compared = [("request", result["latency_ms"], baseline["latency_ms"])]
+    compared += [
+        (name, result["spans_ms"].get(name), expected)
+        for name, expected in baseline["spans_ms"].items()
+    ]
+    for name, actual, expected in compared:
+        # Sub-millisecond spans are dominated by scheduling noise.
+        if actual is None or expected["p99"] < min_ms:
+            continue
+        if actual["p99"] > expected["p99"] * (1 + tolerance):
+            found.append(
+                f"{name} p99 {actual['p99']:.1f} ms > baseline {expected['p99']:.1f}"
+            )
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        found.append(
+            f"peak RSS {result['peak_rss_mb']:.0f} MB > baseline "
+            f"{baseline['peak_rss_mb']:.0f}"
+        )
+    return found
+
+
+def _report(result: dict):
+    print(
+        f"{result['requests_per_second']:.1f} req/s, "
+        f"peak RSS {result['peak_rss_mb']:.0f} MB"
+    )
+    print(f"{'':<46} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = [("request", result["latency_ms"]), *sorted(result["spans_ms"].items())]
+    for name, stats in rows:
+        print(
+            f"{name:<46} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--rag-latency-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    missing = [
+        script
+        for filename, script in REQUIRED_MODELS.items()
+        if not os.path.exists(os.path.join(args.model_dir, filename))
+    ]
+    if missing:
+        sys.exit(f"Train the models first: {', '.join(missing)}")
+    # Serve the models that were checked above, not the default directory.
+    model_registry.model_dir = args.model_dir
+
+    install_fakes(
+        graph,
+        LatencyModel(args.llm_latency_ms / 1e3, args.llm_latency_sigma, args.seed),
+        LatencyModel(args.rag_latency_ms / 1e3, args.llm_latency_sigma, args.seed),
+        tokens_per_second=args.tokens_per_second,
+    )
+    config = {
+        name: getattr(args, name)
+        for name in (
+            "sessions",
+            "turns",
+            "llm_latency_ms",
+            "llm_latency_sigma",
+            "tokens_per_second",
+            "rag_latency_ms",
+            "seed",
+        )
+    }
+    print(", ".join(f"{name}={value}" for name, value in config.items()))
+    result = asyncio.run(_load_test(args))
+    _report(result)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, **result}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            sys.exit(f"The baseline was recorded with {baseline['config']}.")
+        found = regressions(result, baseline, args.tolerance, args.min_ms)
+        if found:
+            print("Regressions against the baseline:")
+            print("\n".join(f"  {line}" for line in found))
+            sys.exit(1)
+        print(f"Within {args.tolerance:.0%} of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
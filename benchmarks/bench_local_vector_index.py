@@ -0,0 +1,107 @@
+"""
+Compares recall and latency of local vector search against an exact scan.
+
+Exact local search, IVF local search at several probe counts and, when
+--index-name is given, the remote Databricks index are queried with the
+same vectors. Recall@k is measured against the exact local scan, which
+is the ground truth for the remote index too once the mirror is synced.
+
+Usage:
+    poetry run python -m benchmarks.bench_local_vector_index --rows 200000
+    poetry run python -m benchmarks.bench_local_vector_index --index-name <index>
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.app.tools.local_vector_index import (
+    LocalVectorIndex,
+    write_local_vector_index,
+)
+
+
+def _synthetic_corpus(rows: int, dimension: int, rng) -> np.ndarray:
+    """Clustered vectors, closer to real embeddings than uniform noise."""
+    centers = rng.normal(size=(max(1, rows // 300), dimension))
+    labels = rng.integers(0, len(centers), rows)
+    return (centers[labels] + rng.normal(size=(rows, dimension)) * 0.8).astype(
+        np.float32
+    )
+
+
+def _measure(search, queries, truth, k: int):
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = search(query)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(set(ids[:k]) & expected) / k)
+    latencies = np.asarray(latencies) * 1e3
+    return np.mean(recalls), np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--local-dir", help="Existing local index to benchmark.")
+    parser.add_argument("--index-name", help="Also query this Databricks index.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.local_dir:
+        index = LocalVectorIndex.load(args.local_dir)
+    else:
+        vectors = _synthetic_corpus(args.rows, args.dimension, rng)
+        documents = [{"id": str(i), "content": f"doc {i}"} for i in range(args.rows)]
+        start = time.perf_counter()
+        index = write_local_vector_index(tempfile.mkdtemp(), documents, vectors)
+        print(f"built {index.size} rows in {time.perf_counter() - start:.1f}s")
+
+    sample = rng.integers(0, index.size, args.queries)
+    queries = np.asarray(index.vectors[sample], dtype=np.float32)
+    queries += rng.normal(size=queries.shape).astype(np.float32) * 0.02
+    exact = LocalVectorIndex(index.vectors, index.documents, index.meta)
+
+    def ids(hits):
+        return [document["id"] for document, _ in hits]
+
+    truth = [set(ids(exact.search(query, args.k))) for query in queries]
+    print(
+        f"{index.size} rows, {index.meta['n_lists']} IVF lists, "
+        f"{args.queries} queries, recall@{args.k} vs exact scan"
+    )
+    print(f"{'backend':>16} {'recall':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    backends = {"local exact": lambda q: ids(exact.search(q, args.k))}
+    if index.centroids is not None:
+        for n_probe in (1, 4, 8, 16, 32):
+            backends[f"local ivf/{n_probe}"] = lambda q, n=n_probe: ids(
+                index.search(q, args.k, n_probe=n)
+            )
+    if args.index_name:
+        backends["databricks"] = _remote_search(args.index_name, args.k)
+
+    for name, search in backends.items():
+        recall, p50, p99 = _measure(search, queries, truth, args.k)
+        print(f"{name:>16} {recall:>8.3f} {p50:>9.3f} {p99:>9.3f}")
+
+
+def _remote_search(index_name: str, k: int):
+    from src.app.tools.databricks_rag import vector_search_pool
+
+    store = vector_search_pool.get(index_name).vectorstore
+
+    def search(query):
+        documents = store.similarity_search_by_vector(query.tolist(), k=k)
+        return [str(document.metadata.get("id")) for document in documents]
+
+    return search
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Records chat requests against the live LLMs once, then replays them offline.
+
+Each request in the workload is sent to the ASGI app, in-process and with
+its lifespan. With --mode record the real LLM providers answer and every
+response, with its latency, is stored in the cassette (LLM_CASSETTE_PATH);
+with --mode replay the same workload is served from the cassette with no
+network access, optionally after the recorded latencies (--replay-timing).
+The vector search is the deterministic fake from `benchmarks.fakes` in both
+modes, so the prompts, and therefore the cassette keys, match between runs.
+
+The workload is a JSONL file of {"query": ..., "thread_id": ...} requests,
+e.g. sampled from production logs, or synthetic sessions when omitted.
+Reports request and per-span latency; --output saves them and --compare
+prints the change against a saved run, e.g. from before a code change.
+
+Usage (after training the fraud and credit models):
+    poetry run python -m benchmarks.bench_replay --mode record --requests prod.jsonl
+    poetry run python -m benchmarks.bench_replay --requests prod.jsonl \\
+        --replay-timing --output before.json
+    poetry run python -m benchmarks.bench_replay --requests prod.jsonl \\
+        --replay-timing --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_load import REQUIRED_MODELS, _chat, _percentiles, session_turns
+from benchmarks.fakes import LatencyModel, fake_vector_search
+from src.app import graph
+from src.app.config import settings
+from src.app.tools.ml_models import model_registry
+
+
+def load_requests(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_requests(sessions: int, turns: int, seed: int) -> list:
+    return [
+        {"query": payload, "thread_id": f"session-{session}"}
+        for session in range(sessions)
+        for payload in session_turns(session, turns, seed)
+    ]
+
+
+async def _replay(requests: list, concurrency: int) -> dict:
+    """Sends each thread's requests in order, `concurrency` threads at a time."""
+    threads = defaultdict(list)
+    for request in requests:
+        threads[request.get("thread_id") or str(uuid.uuid4())].append(request)
+    latencies, spans = [], defaultdict(list)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def thread(client, thread_id, requests):
+        async with slots:
+            for request in requests:
+                started = time.perf_counter()
+                timings = await _chat(client, request["query"], thread_id)
+                latencies.append(time.perf_counter() - started)
+                for span in timings["spans"]:
+                    spans[f"{span['kind']}:{span['name']}"].append(span["duration_ms"])
+
+    # Imported here, after the UI is disabled, so Gradio is never loaded.
+    settings.GRADIO_UI_ENABLED = False
+    from src.app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(thread(client, key, value) for key, value in threads.items())
+        )
+        elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "latency_ms": _percentiles(np.asarray(latencies) * 1e3),
+        "spans_ms": {name: _percentiles(np.asarray(v)) for name, v in spans.items()},
+    }
+
+
+def _report(result: dict, before: dict):
+    """Latency quantiles, each followed by its change from `before` if any."""
+    print(f"{result['requests_per_second']:.1f} req/s")
+    print(f"{'':<46} {'p50 ms':>15} {'p95 ms':>15} {'p99 ms':>15}")
+    rows = [("request", result["latency_ms"], before.get("latency_ms"))]
+    rows += [
+        (name, stats, before.get("spans_ms", {}).get(name))
+        for name, stats in sorted(result["spans_ms"].items())
+    ]
+    for name, stats, previous in rows:
+        cells = []
+        for quantile in ("p50", "p95", "p99"):
+            change = (
+                ""
+                if previous is None
+                else f"{stats[quantile] - previous[quantile]:+.1f}"
+            )
+            cells.append(f"{stats[quantile]:>8.1f} {change:>6}")
+        print(f"{name:<46} {' '.join(cells)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("record", "replay"), default="replay")
+    parser.add_argument("--cassette", default=settings.LLM_CASSETTE_PATH)
+    parser.add_argument("--replay-timing", action="store_true")
+    parser.add_argument("--requests", help="JSONL workload; synthetic when unset")
+    parser.add_argument("--sessions", type=int, default=32)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rag-latency-ms", type=float, default=20.0)
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+
+    missing = [
+        script
+        for filename, script in REQUIRED_MODELS.items()
+        if not os.path.exists(os.path.join(args.model_dir, filename))
+    ]
+    if missing:
+        sys.exit(f"Train the models first: {', '.join(missing)}")
+    # Serve the models that were checked above, not the default directory.
+    model_registry.model_dir = args.model_dir
+
+    settings.LLM_CASSETTE_MODE = args.mode
+    settings.LLM_CASSETTE_PATH = args.cassette
+    settings.LLM_CASSETTE_REPLAY_TIMING = args.replay_timing
+    graph.query_databricks_vector_search = fake_vector_search(
+        LatencyModel(args.rag_latency_ms / 1e3, seed=args.seed)
+    )
+    requests = (
+        load_requests(args.requests)
+        if args.requests
+        else synthetic_requests(args.sessions, args.turns, args.seed)
+    )
+    print(f"{args.mode} {len(requests)} requests with cassette {args.cassette}")
+    result = asyncio.run(_replay(requests, args.concurrency))
+
+    before = {}
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+    _report(result, before)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Measures API server import time and cold start to the first served request.
+
+Each measurement runs in a fresh interpreter. The import-time report comes
+from `python -X importtime` and lists the slowest imports, by cumulative
+time, so regressions can be traced to the module that introduced them. Cold
+start runs the FastAPI lifespan (model and LLM client warm-up) and serves
+one /stats request in-process; the script fails when it exceeds the budget.
+
+Usage:
+    poetry run python -m benchmarks.bench_startup --budget-seconds 3
+    poetry run python -m benchmarks.bench_startup --report benchmarks/startup_report.txt
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+FIRST_REQUEST = """
+import asyncio, json, time
+started = time.perf_counter()
+import httpx
+from src.app.main import app
+imported = time.perf_counter()
+
+async def first_request():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/stats")
+        response.raise_for_status()
+        return ready, time.perf_counter()
+
+ready, served = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - started,
+    "lifespan": ready - imported,
+    "first_request": served - ready,
+}))
+"""
+
+
+def import_times(module: str):
+    """Returns (module, self seconds, cumulative seconds, depth) per import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6, depth))
+    return rows
+
+
+def cold_start():
+    """Seconds from process launch until the first request was served."""
+    launched = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    phases["total"] = time.perf_counter() - launched
+    return phases
+
+
+def format_report(module: str, rows, top: int) -> str:
+    total = max(cumulative for _, _, cumulative, _ in rows)
+    packages = {}
+    for name, self_seconds, _, _ in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + self_seconds
+
+    lines = [f"import {module}: {total * 1e3:.0f} ms", ""]
+    lines.append(f"{'top-level package':<40} {'self ms':>9}")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"{package:<40} {seconds * 1e3:>9.1f}")
+    lines += ["", f"{'module':<60} {'cumulative ms':>14}"]
+    for name, _, cumulative, depth in sorted(rows, key=lambda row: -row[2])[:top]:
+        lines.append(f"{'  ' * depth + name:<60} {cumulative * 1e3:>14.1f}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="src.app.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-seconds", type=float, default=3.0)
+    parser.add_argument("--report", help="Also write the import-time report here.")
+    args = parser.parse_args()
+
+    report = format_report(args.module, import_times(args.module), args.top)
+    print(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(report)
+
+    runs = [cold_start() for _ in range(args.runs)]
+    print(f"{'phase':>14} {'p50 ms':>9} {'max ms':>9}")
+    for phase in ("import", "lifespan", "first_request", "total"):
+        values = np.asarray([run[phase] for run in runs]) * 1e3
+        print(f"{phase:>14} {np.median(values):>9.1f} {values.max():>9.1f}")
+
+    cold = float(np.median([run["total"] for run in runs]))
+    if cold > args.budget_seconds:
+        print(f"Cold start {cold:.2f}s exceeds the {args.budget_seconds:.2f}s budget.")
+        sys.exit(1)
+    print(f"Cold start {cold:.2f}s is within the {args.budget_seconds:.2f}s budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Replays a labeled set of scored requests through the synthesis cascade.
+
+Each record is a fraud or credit request with the model's probability and the
+true label. The synthesis LLMs are stand-ins that sleep for a configurable
+latency, and the small one escalates a configurable share of its answers, so
+the benchmark runs offline. It reports the tier mix, the LLM calls saved
+against sending everything to the large model, synthesis latency, and how
+often the templated assessment agrees with the label.
+
+Without --dataset, a synthetic set is drawn with Beta-distributed scores.
+A dataset is JSONL with one {"request_type", "probability", "label"} per line.
+
+Usage:
+    poetry run python -m benchmarks.bench_synthesis_cascade --requests 2000
+    poetry run python -m benchmarks.bench_synthesis_cascade --dataset labeled.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+from langchain_core.messages import AIMessage
+
+from src.app import graph
+from src.app.config import settings
+from src.app.synthesis_cascade import (
+    ESCALATE_TOKEN,
+    LARGE_TIER,
+    PROBABILITY_FIELDS,
+    SMALL_TIER,
+    TEMPLATE_TIER,
+)
+
+REPORT = (
+    "1.  **Overall Assessment:** ...\n"
+    "2.  **Key Evidence:** ...\n"
+    "3.  **Recommended Actions:** ..."
+)
+
+
+class SimulatedLLM:
+    """Answers after `latency` seconds, escalating `escalation_rate` of the time."""
+
+    def __init__(self, latency: float, escalation_rate: float, seed: int):
+        self.latency = latency
+        self.escalation_rate = escalation_rate
+        self.rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    async def ainvoke(self, prompt, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        escalate = self.rng.random() < self.escalation_rate
+        return AIMessage(ESCALATE_TOKEN if escalate else REPORT)
+
+
+def synthetic_dataset(requests: int, positive_rate: float, seed: int):
+    """Positives score high and negatives low, with an overlapping tail."""
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(requests):
+        label = int(rng.random() < positive_rate)
+        probability = rng.beta(6, 1.5) if label else rng.beta(1, 12)
+        request_type = "fraud_check" if rng.random() < 0.5 else "credit_risk"
+        records.append(
+            {
+                "request_type": request_type,
+                "probability": float(probability),
+                "label": label,
+            }
+        )
+    return records
+
+
+def load_dataset(path: str):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _state(record: dict) -> dict:
+    field = PROBABILITY_FIELDS[record["request_type"]]
+    return {
+        "input_data": {"id": "bench"},
+        "request_type": record["request_type"],
+        "ml_tool_output": json.dumps({field: record["probability"]}),
+        "rag_context": "[]",
+        "messages": [],
+    }
+
+
+async def replay(records):
+    tiers, latencies, agreements = [], [], []
+    for record in records:
+        started = time.perf_counter()
+        result = await graph.asynthesis_node(_state(record))
+        latencies.append(time.perf_counter() - started)
+        tiers.append(result["synthesis_tier"])
+        if result["synthesis_tier"] == TEMPLATE_TIER:
+            predicted = int("High risk" in result["final_summary"])
+            agreements.append(predicted == record["label"])
+    return tiers, np.asarray(latencies) * 1e3, agreements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dataset", help="Labeled JSONL; synthetic when omitted.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--positive-rate", type=float, default=0.05)
+    parser.add_argument("--gray-zone-low", type=float, default=0.1)
+    parser.add_argument("--gray-zone-high", type=float, default=0.9)
+    parser.add_argument("--small-latency-ms", type=float, default=5.0)
+    parser.add_argument("--large-latency-ms", type=float, default=20.0)
+    parser.add_argument("--escalation-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    records = (
+        load_dataset(args.dataset)
+        if args.dataset
+        else synthetic_dataset(args.requests, args.positive_rate, args.seed)
+    )
+    small = SimulatedLLM(args.small_latency_ms / 1e3, args.escalation_rate, args.seed)
+    large = SimulatedLLM(args.large_latency_ms / 1e3, 0.0, args.seed)
+    graph.small_synthesis_llm, graph.synthesis_llm = small, large
+    settings.SYNTHESIS_CASCADE_ENABLED = True
+    settings.SYNTHESIS_GRAY_ZONE_LOW = args.gray_zone_low
+    settings.SYNTHESIS_GRAY_ZONE_HIGH = args.gray_zone_high
+
+    tiers, latencies, agreements = asyncio.run(replay(records))
+
+    print(
+        f"{len(records)} requests, gray zone [{args.gray_zone_low}, "
+        f"{args.gray_zone_high}]"
+    )
+    print(f"{'final tier':>12} {'share':>8}")
+    for tier in (TEMPLATE_TIER, SMALL_TIER, LARGE_TIER):
+        print(f"{tier:>12} {tiers.count(tier) / len(tiers):>8.1%}")
+    llm_calls = small.calls + large.calls
+    print(
+        f"LLM calls: {llm_calls} ({small.calls} small, {large.calls} large) "
+        f"vs {len(records)} large without the cascade"
+    )
+    print(
+        f"latency ms: p50 {np.percentile(latencies, 50):.1f}, "
+        f"p99 {np.percentile(latencies, 99):.1f}, mean {latencies.mean():.1f} "
+        f"vs {args.large_latency_ms:.1f} without the cascade"
+    )
+    if agreements:
+        print(
+            f"template tier agrees with the label on {np.mean(agreements):.2%} "
+            f"of {len(agreements)} requests"
+        )
+
+
+if __name__ == "__main__":
+    main()
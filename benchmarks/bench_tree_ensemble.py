@@ -0,0 +1,61 @@
+"""
+Compares the compiled NumPy tree evaluator with native xgboost predict_proba.
+
+Usage (after training and exporting the fraud model):
+    poetry run python -m benchmarks.bench_tree_ensemble
+"""
+
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+
+from src.app.tools.tree_ensemble import CompiledTreeEnsemble
+
+BATCH_SIZES = (1, 64, 10_000)
+
+
+def _time_per_call(fn, X, min_seconds: float = 0.5) -> float:
+    fn(X)  # Warm up caches and lazy initialization.
+    calls, start = 0, time.perf_counter()
+    while True:
+        fn(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-dir", default="models")
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.join(args.model_dir, "fraud_detection_model.joblib"))
+    ensemble = CompiledTreeEnsemble.load(
+        os.path.join(args.model_dir, "fraud_detection_trees")
+    )
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(max(BATCH_SIZES), ensemble.n_features_in_)) * 100
+    X = X.astype(np.float32)
+
+    max_diff = np.abs(model.predict_proba(X) - ensemble.predict_proba(X)).max()
+    print(
+        f"{ensemble.n_trees} trees, max depth {ensemble.max_depth}, "
+        f"max |diff| = {max_diff:.2e}"
+    )
+    print(f"{'batch':>8} {'xgboost ms':>12} {'compiled ms':>12} {'speedup':>8}")
+    for batch_size in BATCH_SIZES:
+        batch = X[:batch_size]
+        native = _time_per_call(model.predict_proba, batch)
+        compiled = _time_per_call(ensemble.predict_proba, batch)
+        print(
+            f"{batch_size:>8} {native * 1e3:>12.3f} {compiled * 1e3:>12.3f} "
+            f"{native / compiled:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
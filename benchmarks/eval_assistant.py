@@ -0,0 +1,159 @@
+"""
+Benchmarks the assistant against the baseline ML models on a labeled dataset.
+
+The dataset (CSV or JSON Lines, with API field names or --rename mappings)
+is streamed through two paths: the task's baseline model (XGBoost for
+fraud, Logistic Regression for credit) scoring records in bulk, and the
+compiled graph answering one request per record, with bounded concurrency
+and optional per-provider LLM rate limits. Every result is appended to
+--results as it completes, so rerunning the same command after a crash
+resumes where it stopped. The graph's prediction is the verdict of its
+summary's "Overall Assessment". Reports accuracy, AUC for the baseline, the
+share of records that got a prediction (coverage), how often the graph's
+verdict agrees with its tool's model score, latency percentiles and
+throughput for each path.
+
+Usage (after training the fraud and credit models):
+    poetry run python -m benchmarks.eval_assistant data/ieee_cis.csv \\
+        --task fraud --label isFraud --rename TransactionAmt=transaction_amount \\
+        --results eval/fraud.jsonl --concurrency 16 --rate-limit gemini=5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from itertools import islice
+
+from src.app.config import settings
+from src.app.evaluation import (
+    BASELINE_PATH,
+    GRAPH_PATH,
+    TASKS,
+    ResultLog,
+    labeled_records,
+    read_records,
+    run_baseline,
+    run_graph,
+    summarize,
+)
+from src.app.tools.batch_scoring import DEFAULT_CHUNK_SIZE
+from src.app.tools.ml_models import model_registry
+
+REQUIRED_MODELS = {
+    "fraud": (
+        "fraud_detection_model.joblib",
+        "python -m data_processing.train_fraud_model",
+    ),
+    "credit": (
+        "credit_risk_model.joblib",
+        "python -m data_processing.train_credit_model",
+    ),
+}
+
+
+def _mapping(pairs: list, value_type=str) -> dict:
+    mapping = {}
+    for pair in pairs:
+        key, _, value = pair.partition("=")
+        mapping[key] = value_type(value)
+    return mapping
+
+
+def _report(summaries: dict):
+    print(
+        f"{'':<10} {'records':>8} {'coverage':>9} {'accuracy':>9} {'auc':>7} "
+        f"{'agreement':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rec/s':>9}"
+    )
+    for name, summary in summaries.items():
+        cells = [
+            f"{summary['records']:>8}",
+            _cell(summary["coverage"], 9, ".1%"),
+            _cell(summary["accuracy"], 9, ".3f"),
+            _cell(summary["auc"], 7, ".3f"),
+            _cell(summary["tool_agreement"], 9, ".1%"),
+            *(_cell(summary["latency_ms"][q], 9, ".2f") for q in ("p50", "p95", "p99")),
+            _cell(summary["records_per_second"], 9, ".1f"),
+        ]
+        print(f"{name:<10} {' '.join(cells)}")
+
+
+def _cell(value, width: int, spec: str) -> str:
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}{spec}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("dataset")
+    parser.add_argument("--task", choices=sorted(TASKS), required=True)
+    parser.add_argument("--label", required=True, help="The label column")
+    parser.add_argument("--rename", action="append", default=[], metavar="COL=FIELD")
+    parser.add_argument("--results", required=True, help="JSON Lines progress file")
+    parser.add_argument(
+        "--paths", nargs="+", choices=(BASELINE_PATH, GRAPH_PATH), default=None
+    )
+    parser.add_argument("--limit", type=int, help="Evaluate the first N records")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--rate-limit",
+        action="append",
+        default=[],
+        metavar="PROVIDER=RPS",
+        help="LLM requests per second for a provider (gemini, openai)",
+    )
+    parser.add_argument("--tool-mode", choices=("llm", "direct"))
+    parser.add_argument("--model-dir", default="models")
+    parser.add_argument("--report", help="Also write the summaries as JSON")
+    args = parser.parse_args()
+    paths = args.paths or [BASELINE_PATH, GRAPH_PATH]
+
+    filename, script = REQUIRED_MODELS[args.task]
+    if not os.path.exists(os.path.join(args.model_dir, filename)):
+        sys.exit(f"Train the model first: {script}")
+
+    settings.LLM_PROVIDER_RATE_LIMITS = _mapping(args.rate_limit, float)
+    if args.tool_mode:
+        settings.AGENT_TOOL_MODE = args.tool_mode
+    # Score with the models that were checked above, not the default directory.
+    model_registry.model_dir = args.model_dir
+    model_registry.preload()
+    task = TASKS[args.task]
+    rename = _mapping(args.rename)
+
+    def records():
+        return islice(
+            labeled_records(read_records(args.dataset), args.label, rename),
+            args.limit,
+        )
+
+    log = ResultLog(args.results)
+    try:
+        if BASELINE_PATH in paths:
+            scored = run_baseline(task, records(), log, args.chunk_size)
+            print(f"{BASELINE_PATH}: scored {scored} records")
+        if GRAPH_PATH in paths:
+            # Imported here so a baseline-only run never loads the LLM stack.
+            from src.app.graph import workflow
+
+            # Records are independent, so the graph keeps no thread state.
+            graph_app = workflow.compile()
+            done = asyncio.run(
+                run_graph(task, records(), log, graph_app, args.concurrency)
+            )
+            print(f"{GRAPH_PATH}: ran {done} records")
+        summaries = {name: summarize(log.results(name)) for name in paths}
+    finally:
+        log.close()
+
+    _report(summaries)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summaries, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Summaries written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
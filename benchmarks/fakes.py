@@ -0,0 +1,256 @@
+"""
+Deterministic stand-ins for the LLMs and the vector search, for offline runs.
+
+The fakes are real LangChain chat models and tools, so the graph drives them
+exactly like the providers: callbacks, tracing and token streaming all work.
+Replies are a function of the prompt, and latencies come from seeded
+lognormal distributions, so two runs with the same seed see the same work.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+from pydantic import PrivateAttr
+
+
+class LatencyModel:
+    """Seeded lognormal latencies around a median, thread-safe."""
+
+    def __init__(self, median_seconds: float, sigma: float = 0.5, seed: int = 0):
+        self.median_seconds = median_seconds
+        self.sigma = sigma
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if self.median_seconds <= 0:
+            return 0.0
+        with self._lock:
+            return self.median_seconds * self._rng.lognormvariate(0.0, self.sigma)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Replies with `reply(prompt)` after a time to first token drawn from
+    `latency`, then one token per 1/`tokens_per_second`. Reports token usage
+    like the providers do, counting whitespace-separated words as tokens.
+    """
+
+    reply: Callable[[str], AIMessage]
+    latency: Any
+    tokens_per_second: float = 200.0
+    model_name: str = "fake-chat-model"
+    _calls: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def bind_tools(self, tools, **kwargs):
+        # Replies already carry the tool calls the graph expects.
+        return self
+
+    def _get_ls_params(self, stop=None, **kwargs):
+        params = super()._get_ls_params(stop=stop, **kwargs)
+        params["ls_model_name"] = self.model_name
+        return params
+
+    def _respond(self, messages: List[BaseMessage]) -> tuple:
+        self._calls += 1
+        prompt = "\n".join(str(message.content) for message in messages)
+        message = self.reply(prompt)
+        words = message.content.split(" ") if message.content else []
+        message.usage_metadata = {
+            "input_tokens": len(prompt.split()),
+            "output_tokens": len(words),
+            "total_tokens": len(prompt.split()) + len(words),
+        }
+        return message, words
+
+    def _generation_seconds(self, words: list) -> float:
+        return len(words) / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message, words = self._respond(messages)
+        time.sleep(self.latency.sample() + self._generation_seconds(words))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        message, words = self._respond(messages)
+        await asyncio.sleep(self.latency.sample() + self._generation_seconds(words))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        message, words = self._respond(messages)
+        await asyncio.sleep(self.latency.sample())
+        if message.tool_calls or not words:
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=message.content,
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+            return
+        for i, word in enumerate(words):
+            await asyncio.sleep(1 / self.tokens_per_second)
+            text = word if i == 0 else f" {word}"
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=message.usage_metadata)
+        )
+
+
+def fake_documents(query: str, count: int, sentences: int) -> list:
+    """Documents derived from the query's hash, so a query always gets the same."""
+    digest = hashlib.sha256(query.encode()).hexdigest()
+    return [
+        {
+            "source": f"kb-{digest[i * 4 : i * 4 + 4]}",
+            "content": " ".join(
+                f"Record {digest[i:i + 8]} noted pattern {j} for this query."
+                for j in range(sentences)
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+def fake_vector_search(
+    latency: LatencyModel, documents: int = 3, sentences: int = 4
+) -> StructuredTool:
+    """A stand-in for `query_databricks_vector_search` with the same signature."""
+
+    def search(query: str, index_name: str) -> str:
+        time.sleep(latency.sample())
+        return json.dumps(fake_documents(query, documents, sentences))
+
+    async def asearch(query: str, index_name: str) -> str:
+        await asyncio.sleep(latency.sample())
+        return json.dumps(fake_documents(query, documents, sentences))
+
+    return StructuredTool.from_function(
+        func=search,
+        coroutine=asearch,
+        name="query_databricks_vector_search",
+        description="Finds records related to the query in the given index.",
+    )
+
+
+def _payload_after(prompt: str, marker: str) -> Optional[dict]:
+    try:
+        return json.loads(prompt.split(marker, 1)[1].strip())
+    except (IndexError, json.JSONDecodeError):
+        return None
+
+
+def triage_reply(prompt: str) -> AIMessage:
+    user_input = prompt.split("User Input:")[-1].split("Classification:")[0]
+    if "loan_amount" in user_input or "annual_income" in user_input:
+        return AIMessage("credit_risk")
+    if "transaction" in user_input:
+        return AIMessage("fraud_check")
+    return AIMessage("general_query")
+
+
+def agent_reply(model_tool: str, model_arg: str, marker: str) -> Callable:
+    """Plans the model and retrieval calls for the payload quoted in the prompt."""
+
+    def reply(prompt: str) -> AIMessage:
+        payload = _payload_after(prompt, marker) or {}
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": model_tool, "args": {model_arg: payload}, "id": "model"},
+                {
+                    "name": "query_databricks_vector_search",
+                    "args": {"query": f"History for {json.dumps(payload)}"},
+                    "id": "retrieval",
+                },
+            ],
+        )
+
+    return reply
+
+
+def synthesis_reply(words: int) -> Callable:
+    def reply(prompt: str) -> AIMessage:
+        evidence = " ".join(["evidence"] * max(words - 12, 1))
+        return AIMessage(
+            "1. **Overall Assessment:** Moderate risk. "
+            f"2. **Key Evidence:** {evidence} "
+            "3. **Recommended Actions:** Review manually."
+        )
+
+    return reply
+
+
+def install_fakes(
+    graph_module,
+    llm_latency: LatencyModel,
+    rag_latency: LatencyModel,
+    tokens_per_second: float = 200.0,
+    summary_words: int = 80,
+):
+    """Replaces the graph's LLMs and vector search with fakes; returns the LLMs."""
+    llms = {
+        "triage_llm": FakeChatModel(
+            reply=triage_reply,
+            latency=llm_latency,
+            tokens_per_second=tokens_per_second,
+            model_name="fake-triage",
+        ),
+        "fraud_agent_llm": FakeChatModel(
+            reply=agent_reply(
+                "run_fraud_detection_model", "transaction_data", "Transaction:"
+            ),
+            latency=llm_latency,
+            tokens_per_second=tokens_per_second,
+            model_name="fake-fraud-agent",
+        ),
+        "credit_agent_llm": FakeChatModel(
+            reply=agent_reply(
+                "run_credit_risk_model", "loan_application_data", "Application:"
+            ),
+            latency=llm_latency,
+            tokens_per_second=tokens_per_second,
+            model_name="fake-credit-agent",
+        ),
+        "small_synthesis_llm": FakeChatModel(
+            reply=synthesis_reply(summary_words // 2),
+            latency=llm_latency,
+            tokens_per_second=tokens_per_second * 2,
+            model_name="fake-synthesis-small",
+        ),
+        "synthesis_llm": FakeChatModel(
+            reply=synthesis_reply(summary_words),
+            latency=llm_latency,
+            tokens_per_second=tokens_per_second,
+            model_name="fake-synthesis",
+        ),
+    }
+    for name, llm in llms.items():
+        setattr(graph_module, name, llm)
+    graph_module.query_databricks_vector_search = fake_vector_search(rag_latency)
+    return llms
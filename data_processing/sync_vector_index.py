@@ -0,0 +1,95 @@
+import argparse
+
+from src.app.config import settings
+from src.app.tools.databricks_rag import local_index_dir
+from src.app.tools.local_vector_index import (
+    LocalVectorIndex,
+    content_hash,
+    sync_local_vector_index,
+)
+
+# Mirrors Databricks Vector Search indexes into the local memory-mapped
+# format served when an index is listed in RAG_LOCAL_INDEXES. Only documents
+# whose content changed since the last sync are rewritten, and documents
+# removed upstream are deleted. Run it on a schedule; the app hot-swaps the
+# mirror after each sync.
+
+parser = argparse.ArgumentParser(description="Sync local vector index mirrors.")
+parser.add_argument(
+    "--index",
+    action="append",
+    help="Index to mirror (repeatable). Defaults to the fraud and credit indexes.",
+)
+parser.add_argument("--id-column", default="id")
+parser.add_argument("--text-column", default="content")
+parser.add_argument("--source-column", default="source")
+parser.add_argument("--vector-column", default="embedding")
+parser.add_argument("--page-size", type=int, default=1000)
+args = parser.parse_args()
+
+
+def _unwrap(value):
+    """Unwraps the typed values in scan results, e.g. {"string_value": "x"}."""
+    if isinstance(value, dict) and len(value) == 1:
+        ((kind, inner),) = value.items()
+        if kind == "list_value":
+            return [_unwrap(item) for item in inner.get("values", [])]
+        if kind == "null_value":
+            return None
+        return inner
+    return value
+
+
+def scan_index(index_name: str):
+    """Yields every row of a Databricks index as a dict of column values."""
+    from databricks.vector_search.client import VectorSearchClient
+
+    index = VectorSearchClient(
+        workspace_url=settings.DATABRICKS_HOST,
+        personal_access_token=settings.DATABRICKS_TOKEN,
+        disable_notice=True,
+    ).get_index(endpoint_name=settings.VECTOR_SEARCH_ENDPOINT, index_name=index_name)
+    last_primary_key = None
+    while True:
+        page = index.scan(num_results=args.page_size, last_primary_key=last_primary_key)
+        rows = page.get("data") or []
+        for row in rows:
+            yield {field["key"]: _unwrap(field.get("value")) for field in row["fields"]}
+        last_primary_key = page.get("last_primary_key")
+        if not rows or not last_primary_key:
+            return
+
+
+for index_name in args.index or [
+    settings.FRAUD_RAG_INDEX_NAME,
+    settings.CREDIT_RAG_INDEX_NAME,
+]:
+    directory = local_index_dir(index_name)
+    existing = {}
+    try:
+        current = LocalVectorIndex.load(directory)
+        existing = {doc["id"]: doc.get("content_hash") for doc in current.documents}
+    except FileNotFoundError:
+        pass
+
+    upserts, seen = [], set()
+    for row in scan_index(index_name):
+        document = {
+            "id": str(row[args.id_column]),
+            "content": row.get(args.text_column) or "",
+            "source": row.get(args.source_column) or "N/A",
+        }
+        document["content_hash"] = content_hash(document)
+        seen.add(document["id"])
+        if existing.get(document["id"]) != document["content_hash"]:
+            upserts.append((document, row[args.vector_column]))
+
+    deleted = set(existing) - seen
+    if upserts or deleted or not existing:
+        index = sync_local_vector_index(directory, upserts, deleted)
+        print(
+            f"{index_name}: {len(upserts)} upserted, {len(deleted)} deleted, "
+            f"{index.size} documents ({index.meta['n_lists']} IVF lists)"
+        )
+    else:
+        print(f"{index_name}: up to date ({len(existing)} documents)")
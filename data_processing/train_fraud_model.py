@@ -1,38 +1,142 @@
-import pandas as pd
-import xgboost as xgb
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import joblib
+import argparse
 import os
+
+import joblib
 import numpy as np
+import xgboost as xgb
+from sklearn.metrics import accuracy_score, roc_auc_score
 
-print("Training dummy fraud detection model...")
+from data_processing.pipeline import (
+    SOURCES,
+    StageTimer,
+    ingest_csv,
+    ingest_records,
+)
+from src.app.features import FRAUD_FEATURE_SPEC
 
-# 1. Create dummy data
-# In a real scenario, you would load the IEEE Fraud Detection dataset here.
-X = pd.DataFrame(np.random.rand(100, 2), columns=["feature1", "feature2"])
-y = pd.Series(np.random.randint(0, 2, 100))
+# Trains the fraud detection model out of core: the CSV is ingested in
+# chunks into a Parquet cache, and XGBoost builds its histogram index from
+# an iterator over the cached parts, spilling pages to disk, so memory stays
+# bounded by one part however large the dataset. Without --csv it trains on
+# generated sample data.
+#
+# Run from the project root: python -m data_processing.train_fraud_model
 
-# 2. Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+parser = argparse.ArgumentParser(description="Train the fraud detection model.")
+parser.add_argument("--csv", help="e.g. IEEE-CIS train_transaction.csv")
+parser.add_argument("--source", choices=["ieee-cis"], default="ieee-cis")
+parser.add_argument("--cache-dir", default="data/cache/fraud")
+parser.add_argument("--chunksize", type=int, default=250_000)
+parser.add_argument("--rounds", type=int, default=100)
+parser.add_argument("--max-depth", type=int, default=6)
+parser.add_argument("--learning-rate", type=float, default=0.3)
+parser.add_argument("--max-bin", type=int, default=256)
+parser.add_argument("--model-dir", default="models")
+args = parser.parse_args()
 
-# 3. Train XGBoost model
-model = xgb.XGBClassifier(use_label_encoder=False, eval_metric="logloss")
-model.fit(X_train, y_train)
 
-# 4. Evaluate (optional)
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-print(f"Dummy Model Accuracy: {accuracy:.2f}")
+class PartBatches(xgb.DataIter):
+    """Feature batches from the cached parts, one part per iteration."""
 
-# 5. Save the model
-model_dir = "models"
-if not os.path.exists(model_dir):
-    os.makedirs(model_dir)
+    def __init__(self, dataset, split: str, cache_prefix: str):
+        self.dataset = dataset
+        self.split = split
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._batches is None:
+            self._batches = self.dataset.batches(features, self.split)
+        batch = next(self._batches, None)
+        if batch is None:
+            return False
+        X, y = batch
+        input_data(data=X, label=y)
+        return True
 
-model_path = os.path.join(model_dir, "fraud_detection_model.joblib")
-joblib.dump(model, model_path)
+    def reset(self):
+        self._batches = None
 
-print(f"Dummy fraud detection model saved to {model_path}")
+
+features = FRAUD_FEATURE_SPEC.compile()
+timer = StageTimer()
+
+# 1. Ingest the data into the Parquet cache
+with timer.stage("ingest"):
+    if args.csv:
+        print(f"Ingesting {args.csv} ({args.source})...")
+        dataset = ingest_csv(
+            SOURCES[args.source], args.csv, args.cache_dir, args.chunksize
+        )
+    else:
+        print("No --csv given; generating sample fraud data...")
+        # Records use the same field names as the API payloads so that the
+        # shared feature spec encodes training and serving data identically.
+        rng = np.random.default_rng(42)
+        n_records = 1000
+        amounts = rng.lognormal(mean=4.0, sigma=1.5, size=n_records).round(2)
+        hours = rng.integers(0, 24, size=n_records)
+        records = [
+            {
+                "transaction_id": f"t{i}",
+                "customer_id": f"c{rng.integers(0, 500)}",
+                "merchant_id": f"m{rng.integers(0, 200)}",
+                "transaction_amount": float(amounts[i]),
+                "timestamp": f"2025-07-22T{hours[i]:02d}:30:00Z",
+            }
+            for i in range(n_records)
+        ]
+        # Large night-time transactions are more likely to be fraudulent.
+        fraud_score = (amounts > 500) * 0.5 + (hours < 6) * 0.3
+        labels = (rng.random(n_records) < fraud_score).astype(int)
+        dataset = ingest_records(records, labels, args.cache_dir, args.chunksize)
+print(f"{dataset.n_rows} rows in {len(dataset.parts)} parts under {dataset.directory}")
+
+# 2. Build the external-memory training matrix
+with timer.stage("index"):
+    train_batches = PartBatches(
+        dataset, "train", os.path.join(dataset.directory, "xgb-train")
+    )
+    dtrain = xgb.ExtMemQuantileDMatrix(train_batches, max_bin=args.max_bin)
+
+# 3. Train XGBoost with the hist method
+with timer.stage("train"):
+    booster = xgb.train(
+        {
+            "objective": "binary:logistic",
+            "eval_metric": "logloss",
+            "tree_method": "hist",
+            "max_depth": args.max_depth,
+            "learning_rate": args.learning_rate,
+            "max_bin": args.max_bin,
+        },
+        dtrain,
+        num_boost_round=args.rounds,
+    )
+
+# 4. Evaluate on the held-out rows, one part at a time
+with timer.stage("evaluate"):
+    y_test, scores = [], []
+    for X, y in dataset.batches(features, "test"):
+        y_test.append(y)
+        scores.append(booster.inplace_predict(X))
+    y_test, scores = np.concatenate(y_test), np.concatenate(scores)
+    accuracy = accuracy_score(y_test, scores >= 0.5)
+    auc = roc_auc_score(y_test, scores) if len(set(y_test)) == 2 else float("nan")
+print(f"Held-out accuracy: {accuracy:.3f}, AUC: {auc:.3f}")
+
+# 5. Save the model
+with timer.stage("save"):
+    # Served as an XGBClassifier, like models fitted in memory.
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw("json")))
+    os.makedirs(args.model_dir, exist_ok=True)
+    model_path = os.path.join(args.model_dir, "fraud_detection_model.joblib")
+    # The serving registry refuses a model trained on another feature spec.
+    joblib.dump(FRAUD_FEATURE_SPEC.stamp(model), model_path)
+
+print(
+    f"Fraud detection model saved to {model_path} "
+    f"(feature spec {FRAUD_FEATURE_SPEC.fingerprint})"
+)
+timer.report()
@@ -0,0 +1,72 @@
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score
+import joblib
+import os
+
+print("Training dummy triage text classifier...")
+
+# 1. Create dummy data
+# In a real scenario, you would use labeled queries from the triage LLM's
+# production decisions. Labels match the graph's request types.
+templates = {
+    "fraud_check": [
+        "is this transaction fraudulent",
+        "check this card payment for fraud",
+        "suspicious charge at merchant {x}",
+        "was transaction {x} legitimate",
+        "flag unusual purchase of {x} dollars",
+        "customer disputes a payment to merchant {x}",
+    ],
+    "credit_risk": [
+        "assess the default risk of this loan application",
+        "should we approve a loan of {x}",
+        "what is the credit risk for applicant {x}",
+        "evaluate debt to income ratio for this borrower",
+        "is this applicant likely to default on the mortgage",
+        "review loan application {x} for early warning signs",
+    ],
+    "general_query": [
+        "what are the latest regulations on anti money laundering",
+        "summarize our risk appetite statement",
+        "how do I reset my password",
+        "explain basel iii capital requirements",
+        "what does kyc stand for",
+        "list the steps of our incident response policy",
+    ],
+}
+texts, labels = [], []
+for label, phrases in templates.items():
+    for phrase in phrases:
+        for x in ("a1", "500", "m42", "10000", "c7"):
+            texts.append(phrase.format(x=x))
+            labels.append(label)
+
+# 2. Split data
+X_train, X_test, y_train, y_test = train_test_split(
+    texts, labels, test_size=0.2, random_state=42, stratify=labels
+)
+
+# 3. Train TF-IDF + Logistic Regression pipeline
+model = make_pipeline(
+    TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True),
+    LogisticRegression(max_iter=1000),
+)
+model.fit(X_train, y_train)
+
+# 4. Evaluate (optional)
+y_pred = model.predict(X_test)
+accuracy = accuracy_score(y_test, y_pred)
+print(f"Dummy Model Accuracy: {accuracy:.2f}")
+
+# 5. Save the model
+model_dir = "models"
+if not os.path.exists(model_dir):
+    os.makedirs(model_dir)
+
+model_path = os.path.join(model_dir, "triage_classifier.joblib")
+joblib.dump(model, model_path)
+
+print(f"Dummy triage classifier saved to {model_path}")
@@ -0,0 +1,316 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from langchain_core.language_models.chat_models import generate_from_stream
+from langchain_core.messages import (
+    AIMessageChunk,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.app import metrics
+from src.app.config import settings
+
+CASSETTE_MODES = ("off", "record", "replay")
+
+cassette_requests_counter = metrics.counter(
+    "llm_cassette_requests_total",
+    "LLM requests recorded to or replayed from the cassette, by result.",
+    labelnames=("mode", "result"),
+)
+
+
+class CassetteMissError(KeyError):
+    """Raised on replay for a request the cassette holds no recording of."""
+
+
+def normalize_prompt(messages) -> str:
+    """The prompt with whitespace collapsed, so reformatting keeps the key."""
+    lines = []
+    for message in messages:
+        content = message.content
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        lines.append(f"{message.type}: {' '.join(content.split())}")
+    return "\n".join(lines)
+
+
+def request_key(model: str, prompt: str, tools) -> str:
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "tools": tools}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class Cassette:
+    """
+    LLM responses recorded to a SQLite file, keyed by a hash of the model,
+    the normalized prompt and the bound tools. Each recording of a key is a
+    take, and replay cycles through a key's takes in recording order, so
+    repeated prompts see the same variety they did live. A take stores the
+    response message (content, tool calls, token usage), its stream chunks
+    and the latencies observed, as zlib-compressed JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._takes: Dict[str, List[dict]] = {}
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS takes ("
+                "key TEXT NOT NULL, take INTEGER NOT NULL, model TEXT NOT NULL, "
+                "prompt BLOB NOT NULL, entry BLOB NOT NULL, "
+                "PRIMARY KEY (key, take))"
+            )
+            self._connection = connection
+        return self._connection
+
+    def record(self, key: str, model: str, prompt: str, entry: dict):
+        with self._lock:
+            connection = self._connect()
+            (take,) = connection.execute(
+                "SELECT COUNT(*) FROM takes WHERE key = ?", (key,)
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO takes VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    take,
+                    model,
+                    zlib.compress(prompt.encode()),
+                    zlib.compress(json.dumps(entry).encode()),
+                ),
+            )
+            self._takes.pop(key, None)
+
+    def play(self, key: str) -> Optional[dict]:
+        with self._lock:
+            takes = self._takes.get(key)
+            if takes is None:
+                rows = (
+                    self._connect()
+                    .execute(
+                        "SELECT entry FROM takes WHERE key = ? ORDER BY take", (key,)
+                    )
+                    .fetchall()
+                )
+                takes = self._takes[key] = [
+                    json.loads(zlib.decompress(row[0])) for row in rows
+                ]
+            if not takes:
+                return None
+            entry = takes[self._cursors[key] % len(takes)]
+            self._cursors[key] += 1
+            return entry
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+@functools.lru_cache(maxsize=None)
+def _cassette(path: str) -> Cassette:
+    return Cassette(path)
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette selected by LLM_CASSETTE_MODE, or None when it is off."""
+    if settings.LLM_CASSETTE_MODE not in CASSETTE_MODES:
+        raise ValueError(f"Unknown cassette mode '{settings.LLM_CASSETTE_MODE}'.")
+    if settings.LLM_CASSETTE_MODE == "off":
+        return None
+    return _cassette(settings.LLM_CASSETTE_PATH)
+
+
+# --- Chat Model Layer ---
+
+
+def _entry(result: ChatResult, chunks, first_token_seconds, seconds) -> dict:
+    return {
+        "message": message_to_dict(result.generations[0].message),
+        "chunks": chunks,
+        "first_token_seconds": first_token_seconds,
+        "seconds": seconds,
+    }
+
+
+def _result(entry: dict) -> ChatResult:
+    (message,) = messages_from_dict([entry["message"]])
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _replayed_chunks(entry: dict) -> List[ChatGenerationChunk]:
+    """The response as stream chunks, split where the recorded stream was."""
+    (message,) = messages_from_dict([entry["message"]])
+    if message.tool_calls or not entry["chunks"]:
+        return [
+            ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=message.content,
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": i,
+                        }
+                        for i, call in enumerate(message.tool_calls)
+                    ],
+                    usage_metadata=message.usage_metadata,
+                )
+            )
+        ]
+    chunks = [
+        ChatGenerationChunk(message=AIMessageChunk(content=text))
+        for text in entry["chunks"]
+    ]
+    chunks[-1].message.usage_metadata = message.usage_metadata
+    return chunks
+
+
+def _chunk_delays(entry: dict, count: int) -> List[float]:
+    """Recorded time to first chunk, then the rest spread over the chunks."""
+    if not settings.LLM_CASSETTE_REPLAY_TIMING:
+        return [0.0] * count
+    first = entry["first_token_seconds"] or entry["seconds"]
+    rest = max(entry["seconds"] - first, 0.0) / max(count - 1, 1)
+    return [first] + [rest] * (count - 1)
+
+
+class CassetteChatModel:
+    """
+    Mixed in ahead of `_PooledChatModel`. When LLM_CASSETTE_MODE is "record",
+    every provider response is captured with its latencies; when "replay",
+    responses are served from the cassette without calling the provider,
+    optionally after the recorded latency (LLM_CASSETTE_REPLAY_TIMING).
+    """
+
+    def _cassette_request(self, messages, kwargs) -> tuple:
+        model = getattr(self, "model_name", None) or getattr(self, "model", "")
+        prompt = normalize_prompt(messages)
+        return str(model), prompt, request_key(model, prompt, kwargs.get("tools"))
+
+    def _replay(self, tape: Cassette, key: str, model: str) -> dict:
+        entry = tape.play(key)
+        if entry is None:
+            cassette_requests_counter.inc(mode="replay", result="miss")
+            raise CassetteMissError(f"No recording for a {model} request ({key}).")
+        cassette_requests_counter.inc(mode="replay", result="hit")
+        return entry
+
+    def _record(self, tape, key, model, prompt, result, chunks, first, seconds):
+        tape.record(key, model, prompt, _entry(result, chunks, first, seconds))
+        cassette_requests_counter.inc(mode="record", result="recorded")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        generate = super()._generate
+        tape = active_cassette()
+        if tape is None:
+            return generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        model, prompt, key = self._cassette_request(messages, kwargs)
+        if settings.LLM_CASSETTE_MODE == "replay":
+            entry = self._replay(tape, key, model)
+            time.sleep(sum(_chunk_delays(entry, 1)))
+            return _result(entry)
+        started = time.perf_counter()
+        result = generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        seconds = time.perf_counter() - started
+        self._record(tape, key, model, prompt, result, None, None, seconds)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        agenerate = super()._agenerate
+        tape = active_cassette()
+        if tape is None:
+            return await agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            )
+        model, prompt, key = self._cassette_request(messages, kwargs)
+        if settings.LLM_CASSETTE_MODE == "replay":
+            entry = self._replay(tape, key, model)
+            await asyncio.sleep(sum(_chunk_delays(entry, 1)))
+            return _result(entry)
+        started = time.perf_counter()
+        result = await agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        seconds = time.perf_counter() - started
+        self._record(tape, key, model, prompt, result, None, None, seconds)
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        stream = super()._stream
+        tape = active_cassette()
+        if tape is None:
+            yield from stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            return
+        model, prompt, key = self._cassette_request(messages, kwargs)
+        if settings.LLM_CASSETTE_MODE == "replay":
+            entry = self._replay(tape, key, model)
+            chunks = _replayed_chunks(entry)
+            for delay, chunk in zip(_chunk_delays(entry, len(chunks)), chunks):
+                time.sleep(delay)
+                yield chunk
+            return
+        started, first, chunks = time.perf_counter(), None, []
+        for chunk in stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks.append(chunk)
+            yield chunk
+        seconds = time.perf_counter() - started
+        texts = [chunk.text for chunk in chunks if chunk.text]
+        result = generate_from_stream(iter(chunks))
+        self._record(tape, key, model, prompt, result, texts, first, seconds)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        astream = super()._astream
+        tape = active_cassette()
+        if tape is None:
+            async for chunk in astream(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                yield chunk
+            return
+        model, prompt, key = self._cassette_request(messages, kwargs)
+        if settings.LLM_CASSETTE_MODE == "replay":
+            entry = self._replay(tape, key, model)
+            chunks = _replayed_chunks(entry)
+            for delay, chunk in zip(_chunk_delays(entry, len(chunks)), chunks):
+                await asyncio.sleep(delay)
+                yield chunk
+            return
+        started, first, chunks = time.perf_counter(), None, []
+        async for chunk in astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            if first is None:
+                first = time.perf_counter() - started
+            chunks.append(chunk)
+            yield chunk
+        seconds = time.perf_counter() - started
+        texts = [chunk.text for chunk in chunks if chunk.text]
+        result = generate_from_stream(iter(chunks))
+        self._record(tape, key, model, prompt, result, texts, first, seconds)
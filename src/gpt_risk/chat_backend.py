@@ -0,0 +1,81 @@
+from typing import AsyncIterator, Optional, Tuple
+
+import httpx
+
+from src.app.config import settings
+from src.app.streaming import parse_sse, stream_chat
+
+
+class InProcessChatBackend:
+    """Runs the graph in this process; the default when the UI is mounted here."""
+
+    async def stream(
+        self, query: dict, thread_id: str
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        async for event, data in stream_chat(query, thread_id):
+            yield event, data
+
+    async def aclose(self):
+        pass
+
+
+class HttpChatBackend:
+    """
+    Streams from a remote API server's /chat/stream endpoint, for a UI
+    deployed separately from the graph. All requests share one pooled
+    `httpx.AsyncClient`, so connections are kept alive between messages.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 120.0,
+        max_connections: int = 20,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def stream(
+        self, query: dict, thread_id: str
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        async with self._get_client().stream(
+            "POST",
+            f"{self.base_url}/chat/stream",
+            json={"query": query, "thread_id": thread_id},
+        ) as response:
+            response.raise_for_status()
+            async for event, data in parse_sse(response.aiter_lines()):
+                yield event, data
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the event loop that first uses it.
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+
+def create_chat_backend():
+    """In-process unless CHAT_BACKEND_URL points the UI at a remote server."""
+    if settings.CHAT_BACKEND_URL:
+        return HttpChatBackend(
+            settings.CHAT_BACKEND_URL,
+            timeout=settings.CHAT_BACKEND_TIMEOUT_SECONDS,
+            max_connections=settings.CHAT_BACKEND_MAX_CONNECTIONS,
+        )
+    return InProcessChatBackend()
@@ -0,0 +1,369 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from src.app import metrics
+from src.app.config import settings
+
+CHECKPOINTERS = ("memory", "sqlite", "none")
+
+evictions_counter = metrics.counter(
+    "checkpointer_evictions_total",
+    "Threads evicted from the in-memory checkpointer to stay within its limit.",
+)
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class LatestCheckpointSaver(BaseCheckpointSaver):
+    """
+    A checkpointer that keeps only the latest checkpoint of each thread, with
+    its pending writes. The graph always resumes a thread from its latest
+    state and never replays history, so older checkpoints would only take
+    up space.
+
+    Each thread (and checkpoint namespace) is one record, serialized with the
+    saver's serde (msgpack), so saving a checkpoint is a single write.
+    Subclasses store the serialized records.
+    """
+
+    def __init__(self, serde=None):
+        super().__init__(serde=serde)
+        # Guards the read-modify-write in `put_writes`.
+        self._lock = threading.RLock()
+
+    # --- Storage, provided by subclasses ---
+
+    def _read(self, thread_id: str, checkpoint_ns: str) -> Optional[Tuple[str, bytes]]:
+        raise NotImplementedError
+
+    def _write(self, thread_id: str, checkpoint_ns: str, record: Tuple[str, bytes]):
+        raise NotImplementedError
+
+    def _delete(self, thread_id: str):
+        raise NotImplementedError
+
+    def _keys(self) -> List[Tuple[str, str]]:
+        raise NotImplementedError
+
+    async def _run(self, func, *args):
+        """Runs a storage call for the async API; inline unless it blocks."""
+        return func(*args)
+
+    def close(self):
+        pass
+
+    # --- Checkpointer API ---
+
+    def _load(self, thread_id: str, checkpoint_ns: str) -> Optional[dict]:
+        record = self._read(thread_id, checkpoint_ns)
+        return None if record is None else self.serde.loads_typed(record)
+
+    def _save(self, thread_id: str, checkpoint_ns: str, record: dict):
+        self._write(thread_id, checkpoint_ns, self.serde.dumps_typed(record))
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, record: dict):
+        parent_id = record["parent_id"]
+        return CheckpointTuple(
+            config=_config(thread_id, checkpoint_ns, record["checkpoint"]["id"]),
+            checkpoint=record["checkpoint"],
+            metadata=record["metadata"],
+            parent_config=(
+                _config(thread_id, checkpoint_ns, parent_id) if parent_id else None
+            ),
+            pending_writes=[
+                (task_id, channel, value)
+                for task_id, _, channel, value, _ in record["writes"]
+            ],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        record = self._load(thread_id, checkpoint_ns)
+        if record is None:
+            return None
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id and checkpoint_id != record["checkpoint"]["id"]:
+            return None
+        return self._tuple(thread_id, checkpoint_ns, record)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        keys = self._keys()
+        if config:
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            keys = [
+                key
+                for key in keys
+                if key[0] == thread_id and checkpoint_ns in (None, key[1])
+            ]
+        before_id = get_checkpoint_id(before) if before else None
+        for thread_id, checkpoint_ns in keys:
+            if limit is not None and limit <= 0:
+                return
+            record = self._load(thread_id, checkpoint_ns)
+            if record is None:
+                continue
+            checkpoint_id = record["checkpoint"]["id"]
+            if config and get_checkpoint_id(config) not in (None, checkpoint_id):
+                continue
+            if before_id and checkpoint_id >= before_id:
+                continue
+            if filter and any(
+                record["metadata"].get(key) != value for key, value in filter.items()
+            ):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield self._tuple(thread_id, checkpoint_ns, record)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        record = {
+            "checkpoint": checkpoint,
+            "metadata": get_checkpoint_metadata(config, metadata),
+            "parent_id": config["configurable"].get("checkpoint_id"),
+            "writes": [],
+        }
+        with self._lock:
+            self._save(thread_id, checkpoint_ns, record)
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, object]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            record = self._load(thread_id, checkpoint_ns)
+            # Writes for a superseded checkpoint are never read again.
+            if record is None or (
+                record["checkpoint"]["id"] != config["configurable"]["checkpoint_id"]
+            ):
+                return
+            saved = {(write[0], write[1]): write for write in record["writes"]}
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                # Regular writes are kept from the first attempt; special
+                # channels (negative indexes) are overwritten.
+                if key[1] >= 0 and key in saved:
+                    continue
+                saved[key] = [task_id, key[1], channel, value, task_path]
+            record["writes"] = list(saved.values())
+            self._save(thread_id, checkpoint_ns, record)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._delete(thread_id)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ):
+        items = await self._run(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, object]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await self._run(self.delete_thread, thread_id)
+
+
+class MemoryCheckpointSaver(LatestCheckpointSaver):
+    """
+    Keeps checkpoints in process memory for a single-node deployment. Beyond
+    `max_threads`, the least recently used threads are evicted.
+    """
+
+    def __init__(self, max_threads: int = 1000, serde=None):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[str, dict]" = OrderedDict()
+
+    def _read(self, thread_id, checkpoint_ns):
+        with self._lock:
+            namespaces = self._threads.get(thread_id)
+            if namespaces is None:
+                return None
+            self._threads.move_to_end(thread_id)
+            return namespaces.get(checkpoint_ns)
+
+    def _write(self, thread_id, checkpoint_ns, record):
+        with self._lock:
+            self._threads.setdefault(thread_id, {})[checkpoint_ns] = record
+            self._threads.move_to_end(thread_id)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+                evictions_counter.inc()
+
+    def _delete(self, thread_id):
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def _keys(self):
+        with self._lock:
+            return [
+                (thread_id, checkpoint_ns)
+                for thread_id, namespaces in self._threads.items()
+                for checkpoint_ns in namespaces
+            ]
+
+
+class SqliteCheckpointSaver(LatestCheckpointSaver):
+    """
+    Keeps checkpoints in a SQLite database on local disk, so threads survive
+    restarts. The connection is opened on first use and shared under the
+    saver's lock; async calls run on a worker thread.
+    """
+
+    def __init__(self, path: str, serde=None):
+        super().__init__(serde=serde)
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None
+            )
+            # WAL with NORMAL sync skips the fsync on every commit; a crash can
+            # lose the last few checkpoints but never corrupts the database.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+                "type TEXT NOT NULL, data BLOB NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (thread_id, checkpoint_ns))"
+            )
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, func, *args):
+        return await asyncio.to_thread(func, *args)
+
+    def _read(self, thread_id, checkpoint_ns):
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT type, data FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ?",
+                    (thread_id, checkpoint_ns),
+                )
+                .fetchone()
+            )
+        return None if row is None else (row[0], row[1])
+
+    def _write(self, thread_id, checkpoint_ns, record):
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, record[0], record[1], time.time()),
+            )
+
+    def _delete(self, thread_id):
+        with self._lock:
+            self._connect().execute(
+                "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+            )
+
+    def _keys(self):
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    "SELECT thread_id, checkpoint_ns FROM checkpoints "
+                    "ORDER BY updated_at"
+                )
+                .fetchall()
+            )
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_checkpointer() -> Optional[LatestCheckpointSaver]:
+    """The checkpointer selected by CHECKPOINTER, or None when disabled."""
+    if settings.CHECKPOINTER not in CHECKPOINTERS:
+        raise ValueError(f"Unknown checkpointer '{settings.CHECKPOINTER}'.")
+    if settings.CHECKPOINTER == "memory":
+        return MemoryCheckpointSaver(max_threads=settings.CHECKPOINT_MAX_THREADS)
+    if settings.CHECKPOINTER == "sqlite":
+        return SqliteCheckpointSaver(settings.CHECKPOINT_SQLITE_PATH)
+    return None
@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,30 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str
     OPENAI_API_KEY: str
 
+    # OpenAI-compatible endpoints serving Qwen and Llama (OpenAI when unset)
+    QWEN_BASE_URL: Optional[str] = None
+    LLAMA_BASE_URL: Optional[str] = None
+
+    # LLM clients: models on the same provider and base URL share one pooled
+    # HTTP client; transient failures are retried with jittered backoff
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_READ_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    # Concurrent requests per provider ("gemini", "openai"), sync and async
+    # each; providers not listed use the default
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_PROVIDER_MAX_CONCURRENCY: Dict[str, int] = {}
+    # Requests per second per provider; providers not listed are not limited
+    LLM_PROVIDER_RATE_LIMITS: Dict[str, float] = {}
+    # LLM cassette for reproducible runs: "record" stores every response and
+    # its latency, "replay" serves them back without calling the providers
+    # (after the recorded latency when timing is on), "off" bypasses it
+    LLM_CASSETTE_MODE: str = "off"
+    LLM_CASSETTE_PATH: str = "cassettes/llm.sqlite"
+    LLM_CASSETTE_REPLAY_TIMING: bool = False
+
     # Databricks Configuration
     DATABRICKS_HOST: str
     DATABRICKS_TOKEN: str
@@ -14,6 +40,92 @@ class Settings(BaseSettings):
     FRAUD_RAG_INDEX_NAME: str
     CREDIT_RAG_INDEX_NAME: str
 
+    # Databricks Vector Search clients (pooled per index)
+    # The endpoint is inferred from the index name when unset
+    VECTOR_SEARCH_ENDPOINT: Optional[str] = None
+    VECTOR_SEARCH_EMBEDDING_ENDPOINT: str = "databricks-bge-large-en"
+    # Set for indexes that embed queries server-side (one round trip per query)
+    VECTOR_SEARCH_MANAGED_EMBEDDINGS: bool = False
+    VECTOR_SEARCH_MAX_CONNECTIONS: int = 8
+    VECTOR_SEARCH_CLIENT_MAX_AGE_SECONDS: float = 900.0
+
+    # RAG caches: query embeddings (LRU, optionally persisted) and results (TTL)
+    RAG_EMBEDDING_CACHE_MAX_ENTRIES: int = 10_000
+    RAG_EMBEDDING_CACHE_PATH: Optional[str] = None
+    RAG_RESULT_CACHE_TTL_SECONDS: float = 300.0
+    RAG_RESULT_CACHE_MAX_ENTRIES: int = 1024
+
+    # Indexes served from a local memory-mapped mirror instead of Databricks
+    RAG_LOCAL_INDEXES: List[str] = []
+    # IVF lists scanned per query on large local indexes
+    RAG_LOCAL_IVF_PROBES: int = 8
+    # Hybrid BM25 + vector retrieval on local indexes, fused with RRF and
+    # diversified with MMR; near-duplicates above the similarity are dropped
+    RAG_HYBRID_ENABLED: bool = True
+    RAG_HYBRID_CANDIDATES: int = 20
+    RAG_MMR_LAMBDA: float = 0.7
+    RAG_DEDUP_SIMILARITY: float = 0.95
+
+    # ML Model Registry
+    MODEL_WATCH_INTERVAL_SECONDS: float = 2.0
+    # "xgboost" serves the joblib model; "compiled" serves the exported trees
+    FRAUD_MODEL_BACKEND: str = "xgboost"
+
+    # Micro-batching of concurrent ML tool calls
+    MICRO_BATCH_ENABLED: bool = True
+    MICRO_BATCH_WINDOW_MS: float = 2.0
+    MICRO_BATCH_MAX_ROWS: int = 256
+
+    # Local triage before the LLM
+    FAST_TRIAGE_ENABLED: bool = True
+    FAST_TRIAGE_CONFIDENCE_THRESHOLD: float = 0.9
+
+    # How agent nodes plan tool calls: "llm" asks the agent LLM, "direct"
+    # builds them from the input so only synthesis calls an LLM
+    AGENT_TOOL_MODE: str = "llm"
+
+    # Conversation state per thread_id, so follow-up turns reuse earlier tool
+    # results: "memory" (LRU over threads), "sqlite" (local disk) or "none"
+    CHECKPOINTER: str = "memory"
+    CHECKPOINT_MAX_THREADS: int = 1000
+    CHECKPOINT_SQLITE_PATH: str = "checkpoints/checkpoints.sqlite"
+
+    # Synthesis cascade: model scores outside the gray zone get a templated
+    # summary without an LLM; inside it the small LLM answers first and
+    # escalates to the large one when unsure
+    SYNTHESIS_CASCADE_ENABLED: bool = True
+    SYNTHESIS_GRAY_ZONE_LOW: float = 0.1
+    SYNTHESIS_GRAY_ZONE_HIGH: float = 0.9
+
+    # Prompt token budgets per section: inputs keep only the fields the model
+    # reads, retrieved documents are summarized and packed in rank order.
+    # Tokens are estimated per provider, or counted with tiktoken for the
+    # OpenAI-compatible models ("estimate" or "tiktoken")
+    PROMPT_BUDGET_ENABLED: bool = True
+    PROMPT_INPUT_TOKEN_BUDGET: int = 256
+    PROMPT_ML_OUTPUT_TOKEN_BUDGET: int = 256
+    PROMPT_RAG_TOKEN_BUDGET: int = 1024
+    PROMPT_RAG_DOCUMENT_TOKEN_BUDGET: int = 256
+    PROMPT_TOKEN_COUNTER: str = "estimate"
+
+    # Per-tool timeout when agent nodes run tool calls concurrently
+    TOOL_TIMEOUT_SECONDS: float = 30.0
+
+    # Executor for async model scoring: "thread" or "process"
+    INFERENCE_EXECUTOR: str = "thread"
+    INFERENCE_WORKERS: int = 4
+
+    # API server
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # API-only workers can skip importing and mounting the Gradio UI
+    GRADIO_UI_ENABLED: bool = True
+    # The Gradio UI runs the graph in-process unless this points it at a
+    # separately deployed API server (e.g. http://risk-api:8000)
+    CHAT_BACKEND_URL: Optional[str] = None
+    CHAT_BACKEND_TIMEOUT_SECONDS: float = 120.0
+    CHAT_BACKEND_MAX_CONNECTIONS: int = 20
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
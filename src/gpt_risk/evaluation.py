@@ -0,0 +1,314 @@
+import asyncio
+import csv
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+from src.app.synthesis_cascade import assessment_verdict, model_probability
+from src.app.tools.batch_scoring import (
+    DEFAULT_CHUNK_SIZE,
+    score_credit_batch,
+    score_fraud_batch,
+)
+
+# Baseline model scores at or above this are predicted positive, as in the
+# templated synthesis summary.
+DECISION_THRESHOLD = 0.5
+
+BASELINE_PATH = "baseline"
+GRAPH_PATH = "graph"
+
+
+@dataclass(frozen=True)
+class EvalTask:
+    """A labeled prediction task, scored by a baseline model and by the graph."""
+
+    name: str
+    request_type: str
+    score_batch: Callable[[Iterable[dict], int], Iterator[dict]]
+    probability_field: str
+
+
+TASKS = {
+    "fraud": EvalTask("fraud", "fraud_check", score_fraud_batch, "fraud_probability"),
+    "credit": EvalTask(
+        "credit", "credit_risk", score_credit_batch, "default_probability"
+    ),
+}
+
+
+# --- Datasets ---
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """Streams the records of a CSV or JSON Lines file, one at a time."""
+    with open(path, newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            raise ValueError(f"Unknown dataset format '{path}'.")
+
+
+def labeled_records(
+    records: Iterable[dict],
+    label_field: str,
+    rename: Optional[Dict[str, str]] = None,
+) -> Iterator[Tuple[int, dict, int]]:
+    """
+    (index, record, label) for each record, with the label taken out of the
+    record and columns renamed to the API's field names.
+    """
+    rename = rename or {}
+    for index, record in enumerate(records):
+        record = {rename.get(key, key): value for key, value in record.items()}
+        label = int(float(record.pop(label_field)))
+        yield index, record, label
+
+
+# --- Progress ---
+
+
+class ResultLog:
+    """
+    An append-only JSON Lines file of per-record results, so an interrupted
+    run resumes where it stopped: records with a result are skipped, while
+    records that failed are retried. A line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session = uuid.uuid4().hex[:8]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a+")
+        # Start on a fresh line if the last one was cut short.
+        if self._file.tell() > 0:
+            self._file.seek(self._file.tell() - 1)
+            if self._file.read(1) != "\n":
+                self._file.write("\n")
+
+    def results(self, path_name: str) -> List[dict]:
+        """The latest result for each record of one path, in index order."""
+        latest = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if result.get("path") == path_name:
+                    latest[result["index"]] = result
+        return [latest[index] for index in sorted(latest)]
+
+    def completed(self, path_name: str) -> Set[int]:
+        return {
+            result["index"]
+            for result in self.results(path_name)
+            if result.get("error") is None
+        }
+
+    def append(self, results: List[dict]):
+        self._file.write("".join(json.dumps(result) + "\n" for result in results))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _pending(records, completed: Set[int]):
+    return (item for item in records if item[0] not in completed)
+
+
+def _result(
+    log, path_name, index, label, prediction, probability, latency_ms, started_at
+):
+    return {
+        "path": path_name,
+        "index": index,
+        "label": label,
+        "prediction": prediction,
+        "probability": probability,
+        "latency_ms": latency_ms,
+        "session": log.session,
+        "session_started_at": started_at,
+        "completed_at": time.time(),
+    }
+
+
+# --- Runners ---
+
+
+def run_baseline(
+    task: EvalTask,
+    records: Iterable[Tuple[int, dict, int]],
+    log: ResultLog,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Scores the records not yet in `log` with the task's ML model in bulk,
+    predicting positive at DECISION_THRESHOLD. Each record's latency is its
+    share of its chunk's scoring time. Returns the number of records scored.
+    """
+    started_at = time.time()
+    pending = _pending(records, log.completed(BASELINE_PATH))
+    scored = 0
+    while True:
+        chunk = list(islice(pending, chunk_size))
+        if not chunk:
+            return scored
+        started = time.perf_counter()
+        scores = list(task.score_batch([record for _, record, _ in chunk], chunk_size))
+        latency_ms = (time.perf_counter() - started) * 1e3 / len(chunk)
+        log.append(
+            [
+                _result(
+                    log,
+                    BASELINE_PATH,
+                    index,
+                    label,
+                    int(score[task.probability_field] >= DECISION_THRESHOLD),
+                    score[task.probability_field],
+                    latency_ms,
+                    started_at,
+                )
+                for (index, _, label), score in zip(chunk, scores)
+            ]
+        )
+        scored += len(chunk)
+
+
+async def run_graph(
+    task: EvalTask,
+    records: Iterable[Tuple[int, dict, int]],
+    log: ResultLog,
+    graph_app,
+    concurrency: int = 8,
+) -> int:
+    """
+    Runs the records not yet in `log` through the compiled graph, at most
+    `concurrency` at a time. The graph's prediction is the verdict of the
+    "Overall Assessment" in its final summary; a request triaged as another
+    type, or without a clear verdict, counts as unanswered. The model score
+    its tool reported is kept alongside, to measure how often the assistant
+    agrees with it. Returns the number of records run.
+    """
+    started_at = time.time()
+    pending = _pending(records, log.completed(GRAPH_PATH))
+    done = 0
+
+    async def worker():
+        nonlocal done
+        # Workers share one iterator, so the dataset is read once and lazily.
+        for index, record, label in pending:
+            started = time.perf_counter()
+            error = None
+            try:
+                state = await graph_app.ainvoke(
+                    {"input_data": record, "messages": []},
+                    {"configurable": {"thread_id": f"eval-{log.session}-{index}"}},
+                )
+            except Exception as exc:
+                state, error = {}, f"{type(exc).__name__}: {exc}"
+            latency_ms = (time.perf_counter() - started) * 1e3
+            routed = state.get("request_type") == task.request_type
+            verdict = assessment_verdict(state.get("final_summary")) if routed else None
+            result = _result(
+                log,
+                GRAPH_PATH,
+                index,
+                label,
+                None if verdict is None else int(verdict),
+                None,
+                latency_ms,
+                started_at,
+            )
+            result.update(
+                routed=routed,
+                error=error,
+                tool_probability=model_probability(state) if routed else None,
+            )
+            log.append([result])
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+
+# --- Metrics ---
+
+
+def _percentiles(values: np.ndarray) -> dict:
+    if not len(values):
+        return {"p50": None, "p95": None, "p99": None}
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+    }
+
+
+def _throughput(results: List[dict]) -> Optional[float]:
+    """Records per second of run time, summed over resumed sessions."""
+    sessions = {}
+    for result in results:
+        started, ended = sessions.get(
+            result["session"], (result["session_started_at"], 0.0)
+        )
+        sessions[result["session"]] = (started, max(ended, result["completed_at"]))
+    seconds = sum(ended - started for started, ended in sessions.values())
+    return len(results) / seconds if seconds > 0 else None
+
+
+def _auc(results: List[dict]) -> Optional[float]:
+    scored = [result for result in results if result["probability"] is not None]
+    labels = [result["label"] for result in scored]
+    if len(set(labels)) != 2:
+        return None
+    return float(roc_auc_score(labels, [result["probability"] for result in scored]))
+
+
+def _tool_agreement(results: List[dict]) -> Optional[float]:
+    """How often the graph's verdict matches its own tool's model score."""
+    compared = [
+        result["prediction"] == int(result["tool_probability"] >= DECISION_THRESHOLD)
+        for result in results
+        if result["prediction"] is not None
+        and result.get("tool_probability") is not None
+    ]
+    return float(np.mean(compared)) if compared else None
+
+
+def summarize(results: List[dict]) -> dict:
+    """
+    Accuracy over the records that got a prediction, the share that did
+    (coverage), AUC where a path reports probabilities, the graph's agreement
+    with its tool's model score, latency percentiles and throughput of one
+    path's results.
+    """
+    predicted = [result for result in results if result["prediction"] is not None]
+    labels = np.array([result["label"] for result in predicted], dtype=int)
+    predictions = np.array([result["prediction"] for result in predicted], dtype=int)
+    return {
+        "records": len(results),
+        "errors": sum(result.get("error") is not None for result in results),
+        "coverage": len(predicted) / len(results) if results else None,
+        "accuracy": float((predictions == labels).mean()) if predicted else None,
+        "auc": _auc(results),
+        "tool_agreement": _tool_agreement(results),
+        "latency_ms": _percentiles(
+            np.array([result["latency_ms"] for result in results])
+        ),
+        "records_per_second": _throughput(results),
+    }
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from src.app import metrics
+from src.app.tools.ml_models import model_registry
+
+REQUEST_TYPES = ("fraud_check", "credit_risk", "general_query")
+
+# Key signatures of the structured payloads. Weights reflect how strongly a
+# key alone identifies the request type; shared keys such as customer_id
+# are deliberately absent.
+FRAUD_KEY_WEIGHTS = {
+    "transaction_amount": 3.0,
+    "merchant_id": 3.0,
+    "transaction_id": 2.0,
+    "merchant_category": 2.0,
+    "card_id": 1.0,
+}
+CREDIT_KEY_WEIGHTS = {
+    "loan_amount": 3.0,
+    "dti_ratio": 3.0,
+    "application_id": 2.0,
+    "annual_income": 2.0,
+    "employment_length_years": 2.0,
+    "credit_score": 1.0,
+}
+
+TEXT_QUERY_FIELD = "text_query"
+
+model_registry.register("triage_classifier", "triage_classifier.joblib")
+
+triage_decisions = metrics.counter(
+    "triage_decisions_total",
+    "Triage decisions by the path that produced them (rules, classifier, llm).",
+    labelnames=("path", "request_type"),
+)
+
+
+@dataclass(frozen=True)
+class TriageDecision:
+    request_type: str
+    confidence: float
+    path: str
+
+
+def classify_by_keys(input_data: dict) -> Optional[TriageDecision]:
+    """
+    Classifies structured payloads by their key signature.
+    Confidence grows with the evidence for the winning type and shrinks when
+    keys of the other type are present as well.
+    """
+    keys = set(input_data)
+    fraud = sum(FRAUD_KEY_WEIGHTS.get(key, 0.0) for key in keys)
+    credit = sum(CREDIT_KEY_WEIGHTS.get(key, 0.0) for key in keys)
+    winner, loser = max(fraud, credit), min(fraud, credit)
+    if winner == 0 or winner == loser:
+        return None
+    confidence = (winner - loser) / (winner + loser) * (1 - 0.5**winner)
+    request_type = "fraud_check" if fraud > credit else "credit_risk"
+    return TriageDecision(request_type, confidence, "rules")
+
+
+def classify_by_text(input_data: dict) -> Optional[TriageDecision]:
+    """
+    Classifies free-text queries with the optional trained text classifier
+    (see data_processing/train_triage_model.py).
+    """
+    text = input_data.get(TEXT_QUERY_FIELD)
+    if not isinstance(text, str) or not text.strip():
+        return None
+    loaded = model_registry.get("triage_classifier")
+    if loaded is None:
+        return None
+    probabilities = loaded.model.predict_proba([text])[0]
+    best = int(probabilities.argmax())
+    return TriageDecision(
+        str(loaded.model.classes_[best]), float(probabilities[best]), "classifier"
+    )
+
+
+def fast_triage(input_data: dict, threshold: float) -> Optional[TriageDecision]:
+    """
+    Returns a local triage decision if one is at least `threshold` confident,
+    otherwise None so the caller falls back to the LLM.
+    """
+    decision = classify_by_keys(input_data) or classify_by_text(input_data)
+    if decision is None or decision.confidence < threshold:
+        return None
+    if decision.request_type not in REQUEST_TYPES:
+        return None
+    triage_decisions.inc(path=decision.path, request_type=decision.request_type)
+    return decision
+
+
+def record_llm_triage(request_type: str):
+    """Counts a decision that had to fall back to the LLM."""
+    triage_decisions.inc(path="llm", request_type=request_type)
+
+
+def triage_stats() -> dict:
+    """How often each triage path was taken, overall and per request type."""
+    by_path = {}
+    for (path, request_type), count in triage_decisions.samples().items():
+        entry = by_path.setdefault(path, {"total": 0})
+        entry[request_type] = count
+        entry["total"] += count
+    return by_path
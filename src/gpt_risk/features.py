@@ -0,0 +1,355 @@
+import hashlib
+import json
+import math
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+TRANSFORMS = (
+    "identity",
+    "log1p",
+    "ratio",
+    "hour_of_day",
+    "hash_bucket",
+    "one_hot",
+    "indicator",
+)
+
+
+# The attribute holding the fingerprint of the spec a model was trained on.
+FINGERPRINT_ATTRIBUTE = "feature_spec_fingerprint"
+
+
+class FeatureSkewError(ValueError):
+    """A model was trained on a different feature spec than serving uses."""
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    One model input derived from the request.
+
+    `source` is a field name, or a (numerator, denominator) pair for `ratio`.
+    `default` is used when the source field is missing, null or unparsable.
+    """
+
+    name: str
+    source: Union[str, Tuple[str, str]]
+    transform: str = "identity"
+    default: float = 0.0
+    buckets: int = 0
+    categories: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        if self.transform not in TRANSFORMS:
+            raise ValueError(f"Unknown transform '{self.transform}' for {self.name}.")
+        if self.transform == "ratio" and not isinstance(self.source, tuple):
+            raise ValueError(f"Feature {self.name}: 'ratio' needs two source fields.")
+        if self.transform == "hash_bucket" and self.buckets <= 0:
+            raise ValueError(f"Feature {self.name}: 'hash_bucket' needs buckets > 0.")
+        if self.transform == "one_hot" and not self.categories:
+            raise ValueError(f"Feature {self.name}: 'one_hot' needs categories.")
+
+    @property
+    def columns(self) -> List[str]:
+        if self.transform == "one_hot":
+            return [f"{self.name}={category}" for category in self.categories]
+        return [self.name]
+
+    @property
+    def sources(self) -> Tuple[str, ...]:
+        return self.source if isinstance(self.source, tuple) else (self.source,)
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """
+    The model's input columns and how each one is derived from the raw request.
+    Shared by the training scripts and the inference tools, so serving always
+    produces exactly the columns the model was trained on.
+    """
+
+    name: str
+    features: Tuple[Feature, ...] = field(default_factory=tuple)
+
+    @property
+    def columns(self) -> List[str]:
+        return [column for feature in self.features for column in feature.columns]
+
+    @property
+    def source_fields(self) -> List[str]:
+        """The raw request fields the model actually reads, in spec order."""
+        seen = []
+        for feature in self.features:
+            for source in feature.sources:
+                if source not in seen:
+                    seen.append(source)
+        return seen
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        A short hash of the spec, stored with trained models by `stamp` and
+        checked by `verify` when they are loaded, to detect skew.
+        """
+        payload = json.dumps(
+            [feature.__dict__ for feature in self.features], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:12]
+
+    def stamp(self, model):
+        """Stores the spec's fingerprint on a trained model, before it is saved."""
+        setattr(model, FINGERPRINT_ATTRIBUTE, self.fingerprint)
+        return model
+
+    def verify(self, model):
+        """
+        Returns the model, or raises `FeatureSkewError` if it was trained on
+        another spec. Models saved without a fingerprint are accepted.
+        """
+        trained = getattr(model, FINGERPRINT_ATTRIBUTE, None)
+        if trained is not None and trained != self.fingerprint:
+            raise FeatureSkewError(
+                f"Model was trained on {self.name} feature spec '{trained}', "
+                f"but serving uses '{self.fingerprint}'."
+            )
+        return model
+
+    def compile(self) -> "CompiledFeatures":
+        return CompiledFeatures(self)
+
+
+class CompiledFeatures:
+    """
+    The executable form of a `FeatureSpec`.
+    `transform_row` handles a single request; `transform` encodes a batch
+    column by column so the numeric transforms run vectorized.
+    """
+
+    def __init__(self, spec: FeatureSpec, dtype=np.float32):
+        self.spec = spec
+        self.dtype = dtype
+        self.columns = spec.columns
+        self.n_columns = len(self.columns)
+        self._row_writers = []
+        self._column_writers = []
+        offset = 0
+        for feature in spec.features:
+            width = len(feature.columns)
+            self._row_writers.append(_compile_row_writer(feature, offset))
+            self._column_writers.append(_compile_column_writer(feature, offset))
+            offset += width
+
+    def transform_row(self, record: dict, out: np.ndarray = None) -> np.ndarray:
+        """Encodes one record into a (1, n_columns) matrix, reusing `out` if given."""
+        if out is None:
+            out = np.empty((1, self.n_columns), dtype=self.dtype)
+        row = out[0]
+        for write in self._row_writers:
+            write(record, row)
+        return out
+
+    def transform(self, records: Sequence[dict], out: np.ndarray = None) -> np.ndarray:
+        """Encodes records into an (n_records, n_columns) matrix, reusing `out` if given."""
+        if len(records) == 1:
+            return self.transform_row(records[0], out)
+        if out is None:
+            out = np.empty((len(records), self.n_columns), dtype=self.dtype)
+        for write in self._column_writers:
+            write(records, out)
+        return out
+
+
+# --- Transform Compilation ---
+
+
+def _to_float(value) -> float:
+    if value is None or isinstance(value, bool):
+        return math.nan if value is None else float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _hour_of_day(value) -> float:
+    if not isinstance(value, str):
+        return math.nan
+    try:
+        return float(datetime.fromisoformat(value.replace("Z", "+00:00")).hour)
+    except ValueError:
+        return math.nan
+
+
+def _hash_bucket(value, buckets: int) -> float:
+    if value is None:
+        return math.nan
+    # crc32 is stable across processes, unlike the built-in hash().
+    return float(zlib.crc32(str(value).encode()) % buckets)
+
+
+def _scalar_fn(feature: Feature) -> Callable[[dict], float]:
+    """Returns a function computing the (single-column) feature from a record."""
+    source, default = feature.source, feature.default
+
+    if feature.transform == "identity":
+
+        def compute(record):
+            value = _to_float(record.get(source))
+            return default if math.isnan(value) else value
+
+    elif feature.transform == "log1p":
+
+        def compute(record):
+            value = _to_float(record.get(source))
+            return default if math.isnan(value) else math.log1p(max(value, 0.0))
+
+    elif feature.transform == "ratio":
+        numerator, denominator = feature.source
+
+        def compute(record):
+            num = _to_float(record.get(numerator))
+            den = _to_float(record.get(denominator))
+            if math.isnan(num) or math.isnan(den) or den == 0:
+                return default
+            return num / den
+
+    elif feature.transform == "hour_of_day":
+
+        def compute(record):
+            value = _hour_of_day(record.get(source))
+            return default if math.isnan(value) else value
+
+    elif feature.transform == "hash_bucket":
+        buckets = feature.buckets
+
+        def compute(record):
+            value = _hash_bucket(record.get(source), buckets)
+            return default if math.isnan(value) else value
+
+    elif feature.transform == "indicator":
+
+        def compute(record):
+            return 0.0 if record.get(source) is None else 1.0
+
+    else:
+        raise ValueError(f"'{feature.transform}' is not a single-column transform.")
+
+    return compute
+
+
+def _compile_row_writer(feature: Feature, offset: int):
+    if feature.transform == "one_hot":
+        index = {category: offset + i for i, category in enumerate(feature.categories)}
+        end = offset + len(feature.categories)
+        source = feature.source
+
+        def write(record, row):
+            row[offset:end] = 0.0
+            position = index.get(str(record.get(source)))
+            if position is not None:
+                row[position] = 1.0
+
+        return write
+
+    compute = _scalar_fn(feature)
+
+    def write(record, row):
+        row[offset] = compute(record)
+
+    return write
+
+
+def _compile_column_writer(feature: Feature, offset: int):
+    source, default = feature.source, feature.default
+
+    if feature.transform in ("identity", "log1p"):
+        # Numeric columns are gathered once and transformed in a single pass.
+        def write(records, out):
+            values = np.fromiter(
+                (_to_float(record.get(source)) for record in records),
+                dtype=np.float64,
+                count=len(records),
+            )
+            if feature.transform == "log1p":
+                values = np.log1p(np.maximum(values, 0.0))
+            out[:, offset] = np.where(np.isnan(values), default, values)
+
+        return write
+
+    if feature.transform == "ratio":
+        numerator, denominator = feature.source
+
+        def write(records, out):
+            num = np.fromiter(
+                (_to_float(record.get(numerator)) for record in records),
+                dtype=np.float64,
+                count=len(records),
+            )
+            den = np.fromiter(
+                (_to_float(record.get(denominator)) for record in records),
+                dtype=np.float64,
+                count=len(records),
+            )
+            valid = ~(np.isnan(num) | np.isnan(den)) & (den != 0)
+            out[:, offset] = default
+            np.divide(num, den, out=out[:, offset], where=valid)
+
+        return write
+
+    if feature.transform == "one_hot":
+        index = {category: i for i, category in enumerate(feature.categories)}
+        end = offset + len(feature.categories)
+
+        def write(records, out):
+            out[:, offset:end] = 0.0
+            for row, record in enumerate(records):
+                position = index.get(str(record.get(source)))
+                if position is not None:
+                    out[row, offset + position] = 1.0
+
+        return write
+
+    # Parsing and hashing transforms are inherently per value.
+    compute = _scalar_fn(feature)
+
+    def write(records, out):
+        out[:, offset] = np.fromiter(
+            (compute(record) for record in records),
+            dtype=np.float64,
+            count=len(records),
+        )
+
+    return write
+
+
+# --- Model Feature Specs ---
+
+FRAUD_FEATURE_SPEC = FeatureSpec(
+    name="fraud_detection",
+    features=(
+        Feature("transaction_amount", "transaction_amount"),
+        Feature("amount_log", "transaction_amount", "log1p"),
+        Feature("hour_of_day", "timestamp", "hour_of_day", default=-1.0),
+        Feature("merchant_bucket", "merchant_id", "hash_bucket", -1.0, buckets=1024),
+        Feature("customer_bucket", "customer_id", "hash_bucket", -1.0, buckets=1024),
+    ),
+)
+
+CREDIT_FEATURE_SPEC = FeatureSpec(
+    name="credit_risk",
+    features=(
+        Feature("loan_amount_log", "loan_amount", "log1p"),
+        Feature("annual_income_log", "annual_income", "log1p"),
+        Feature("loan_to_income", ("loan_amount", "annual_income"), "ratio"),
+        Feature("employment_length_years", "employment_length_years"),
+        Feature("dti_ratio", "dti_ratio"),
+        Feature("income_reported", "annual_income", "indicator"),
+    ),
+)
+
+FRAUD_FEATURES = FRAUD_FEATURE_SPEC.compile()
+CREDIT_FEATURES = CREDIT_FEATURE_SPEC.compile()
@@ -1,31 +1,106 @@
 from langgraph.graph import StateGraph, END, START
+from langgraph.constants import TAG_NOSTREAM
 from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
 from src.app.state import AgentState
-from src.app.llms import get_gemini_llm, get_qwen_llm, get_llama_llm
+from src.app.checkpointer import create_checkpointer
+from src.app import metrics
+from src.app.llms import (
+    get_gemini_flash_llm,
+    get_gemini_llm,
+    get_qwen_llm,
+    get_llama_llm,
+)
 from src.app.tools.ml_models import run_fraud_detection_model, run_credit_risk_model
 from src.app.tools.databricks_rag import query_databricks_vector_search
 from src.app.config import settings
-import json
-
-# --- Initialize Models and Tools ---
-triage_llm = get_qwen_llm()
-synthesis_llm = get_gemini_llm()
-fraud_agent_llm = get_gemini_llm().bind_tools(
-    [run_fraud_detection_model, query_databricks_vector_search]
+from src.app.fast_triage import fast_triage, record_llm_triage
+from src.app.prompt_budget import (
+    documents_section,
+    input_section,
+    token_usage,
+    tool_output_section,
 )
-credit_agent_llm = get_llama_llm().bind_tools(
-    [run_credit_risk_model, query_databricks_vector_search]
+from src.app.synthesis_cascade import (
+    LARGE_TIER,
+    SMALL_TIER,
+    TEMPLATE_TIER,
+    first_tier,
+    needs_escalation,
+    record_tier,
+    small_tier_prompt,
+    template_summary,
 )
+import asyncio
+import hashlib
+import json
+import time
 
+AGENT_TOOL_MODES = ("llm", "direct")
 
-# --- Agent Nodes ---
-
+reused_results_counter = metrics.counter(
+    "graph_reused_results_total",
+    "Node runs skipped because the thread already held results for the input.",
+    labelnames=("node",),
+)
 
-def triage_node(state: AgentState) -> dict:
+# --- Initialize Models and Tools ---
+# Built on first use by `_llm`, so importing the graph creates no clients.
+triage_llm = None
+synthesis_llm = None
+small_synthesis_llm = None
+fraud_agent_llm = None
+credit_agent_llm = None
+
+_LLM_FACTORIES = {
+    "triage_llm": get_qwen_llm,
+    "synthesis_llm": get_gemini_llm,
+    "small_synthesis_llm": get_gemini_flash_llm,
+    "fraud_agent_llm": lambda: get_gemini_llm().bind_tools(
+        [run_fraud_detection_model, query_databricks_vector_search]
+    ),
+    "credit_agent_llm": lambda: get_llama_llm().bind_tools(
+        [run_credit_risk_model, query_databricks_vector_search]
+    ),
+}
+
+
+# The provider behind each node's LLM, for counting prompt tokens.
+NODE_PROVIDERS = {
+    "triage": "openai",
+    "fraud_agent": "gemini",
+    "credit_agent": "openai",
+    "synthesis": "gemini",
+}
+
+
+def _llm(name: str):
+    llm = globals()[name]
+    if llm is None:
+        llm = globals()[name] = _LLM_FACTORIES[name]()
+    return llm
+
+
+def preload_llms():
+    """Builds every LLM client up front, e.g. in the API server's startup."""
+    for name in _LLM_FACTORIES:
+        _llm(name)
+
+
+def reset_llms():
     """
-    Determines the type of request (fraud, credit, or general) based on the input.
+    Drops the graph's LLM clients, e.g. after `aclose_llm_clients` closed the
+    HTTP clients they use; the next request builds them anew.
     """
-    prompt = f"""
+    for name in _LLM_FACTORIES:
+        globals()[name] = None
+
+
+# --- Prompts ---
+
+
+def _triage_prompt(state: AgentState) -> str:
+    return f"""
     You are a request triage expert for a financial institution.
     Analyze the user's input and classify it into one of three categories: 'fraud_check', 'credit_risk', or 'general_query'.
     - 'fraud_check' is for analyzing a single financial transaction for fraud. Keywords: transaction, merchant, amount.
@@ -33,33 +108,286 @@ def triage_node(state: AgentState) -> dict:
     - 'general_query' is for all other questions.
 
     User Input:
-    {json.dumps(state["input_data"])}
+    {input_section(state["input_data"], None, NODE_PROVIDERS["triage"])}
 
     Classification:
     """
-    response = triage_llm.invoke(prompt)
+
+
+def _fraud_agent_prompt(state: AgentState) -> str:
+    input_str = input_section(
+        state["input_data"], "fraud_check", NODE_PROVIDERS["fraud_agent"]
+    )
+    return f"Analyze the following transaction for fraud. First, use the `run_fraud_detection_model` tool. Then, use the `query_databricks_vector_search` tool with the index '{settings.FRAUD_RAG_INDEX_NAME}' to find related historical patterns for the customer or merchant. Transaction: {input_str}"
+
+
+def _credit_agent_prompt(state: AgentState) -> str:
+    input_str = input_section(
+        state["input_data"], "credit_risk", NODE_PROVIDERS["credit_agent"]
+    )
+    return f"Assess the credit risk for the following loan application. First, use the `run_credit_risk_model` tool. Then, use the `query_databricks_vector_search` tool with the index '{settings.CREDIT_RAG_INDEX_NAME}' to get the applicant's financial history. Application: {input_str}"
+
+
+def _synthesis_prompt(state: AgentState) -> str:
+    # General queries skip the agent nodes, so tool outputs may be absent, or
+    # come from an earlier turn of the thread that a follow-up refers to.
+    provider = NODE_PROVIDERS["synthesis"]
+    return f"""
+    You are a senior financial risk analyst. Your task is to create a concise, clear, and actionable summary based on the provided data.
+
+    Original User Request:
+    {input_section(state["input_data"], state["request_type"], provider)}
+
+    Request Type: {state["request_type"]}
+
+    Machine Learning Model Output:
+    {tool_output_section(state.get("ml_tool_output"), provider)}
+
+    Retrieved Context from Knowledge Base:
+    {documents_section(state.get("rag_context"), provider)}
+
+    Based on all the information above, provide a final summary. The summary should be in Markdown format and include:
+    1.  **Overall Assessment:** A clear, one-sentence conclusion (e.g., "High risk of fraud detected.").
+    2.  **Key Evidence:** 2-3 bullet points summarizing the evidence from the ML model and retrieved context that supports your assessment.
+    3.  **Recommended Actions:** A list of 2-3 concrete, actionable steps for the banker to take next.
+    """
+
+
+def _parse_request_type(response) -> str:
     request_type = response.content.strip().lower()
 
     # Basic validation
     if request_type not in ["fraud_check", "credit_risk", "general_query"]:
         request_type = "general_query"
+    record_llm_triage(request_type)
+    return request_type
+
+
+def _local_triage(state: AgentState):
+    if not settings.FAST_TRIAGE_ENABLED:
+        return None
+    return fast_triage(state["input_data"], settings.FAST_TRIAGE_CONFIDENCE_THRESHOLD)
+
+
+# --- Tool Planning ---
+# In "direct" mode the agent nodes build their tool calls from the input
+# instead of asking the agent LLM, which always plans the same two calls.
+
+FRAUD_RETRIEVAL_SUBJECTS = (("customer_id", "customer"), ("merchant_id", "merchant"))
+CREDIT_RETRIEVAL_SUBJECTS = (
+    ("customer_id", "customer"),
+    ("application_id", "application"),
+)
+
+
+def _retrieval_query(topic: str, subjects: tuple, input_data: dict) -> str:
+    """
+    Templates a vector-search query from the identifiers in the input, e.g.
+    "Historical fraud patterns for customer c1 and merchant m2".
+    """
+    parts = [
+        f"{label} {input_data[key]}" for key, label in subjects if input_data.get(key)
+    ]
+    if not parts:
+        return f"{topic} similar to: {json.dumps(input_data)}"
+    return f"{topic} for {' and '.join(parts)}"
+
+
+def _direct_fraud_tool_calls(input_data: dict) -> list:
+    query = _retrieval_query(
+        "Historical fraud patterns", FRAUD_RETRIEVAL_SUBJECTS, input_data
+    )
+    return [
+        {"name": "run_fraud_detection_model", "args": {"transaction_data": input_data}},
+        {"name": "query_databricks_vector_search", "args": {"query": query}},
+    ]
+
+
+def _direct_credit_tool_calls(input_data: dict) -> list:
+    query = _retrieval_query("Financial history", CREDIT_RETRIEVAL_SUBJECTS, input_data)
+    return [
+        {
+            "name": "run_credit_risk_model",
+            "args": {"loan_application_data": input_data},
+        },
+        {"name": "query_databricks_vector_search", "args": {"query": query}},
+    ]
+
+
+def _direct_tool_mode() -> bool:
+    if settings.AGENT_TOOL_MODE not in AGENT_TOOL_MODES:
+        raise ValueError(f"Unknown agent tool mode '{settings.AGENT_TOOL_MODE}'.")
+    return settings.AGENT_TOOL_MODE == "direct"
 
-    return {"request_type": request_type, "messages": ""}
+
+# --- Tool Execution ---
+
+
+async def _arun_tool_calls(tool_calls: list, tools: dict, index_name: str) -> dict:
+    """
+    Runs the tool calls from one LLM response concurrently, each with its own
+    timeout. Returns the output of each tool by name; a timed-out or failed
+    tool yields a JSON error like the tools themselves do.
+    """
+
+    async def run(tool_call):
+        name = tool_call["name"]
+        tool = tools.get(name)
+        if tool is None:
+            return None
+        args = dict(tool_call["args"])
+        if name == "query_databricks_vector_search":
+            # Ensure the index name is passed correctly
+            args["index_name"] = index_name
+        try:
+            output = await asyncio.wait_for(
+                tool.ainvoke(args), timeout=settings.TOOL_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            output = json.dumps(
+                {"error": f"{name} timed out after {settings.TOOL_TIMEOUT_SECONDS}s"}
+            )
+        except Exception as e:
+            output = json.dumps({"error": f"{name} failed: {str(e)}"})
+        return name, output
+
+    results = await asyncio.gather(*(run(tool_call) for tool_call in tool_calls))
+    return dict(result for result in results if result is not None)
+
+
+# --- Reuse Across Turns ---
+# With a checkpointer, a thread's state carries over between turns. When a
+# turn repeats the input an earlier one was triaged or analyzed for, the
+# saved request type and tool outputs are reused instead of recomputed.
+
+
+def _input_key(input_data: dict) -> str:
+    encoded = json.dumps(input_data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def _reusable_request_type(state: AgentState) -> bool:
+    if state.get("request_type") and state.get("triage_input_key") == _input_key(
+        state["input_data"]
+    ):
+        reused_results_counter.inc(node="triage")
+        return True
+    return False
+
+
+def _tool_input_key(state: AgentState, node: str) -> str:
+    return f"{node}:{_input_key(state['input_data'])}"
+
+
+def _reusable_tool_outputs(state: AgentState, node: str) -> bool:
+    if (
+        state.get("tool_input_key") == _tool_input_key(state, node)
+        and state.get("ml_tool_output") is not None
+        and state.get("rag_context") is not None
+    ):
+        reused_results_counter.inc(node=node)
+        return True
+    return False
+
+
+def _tool_succeeded(output: str) -> bool:
+    # Tools report failures, including timeouts, as a JSON {"error": ...}.
+    if not output:
+        return False
+    try:
+        parsed = json.loads(output)
+    except ValueError:
+        return True
+    return not (isinstance(parsed, dict) and "error" in parsed)
+
+
+def _tool_results(
+    state: AgentState, node: str, ml_output: str, rag_output: str, usage: dict
+) -> dict:
+    # Only outputs from tools that both succeeded are reused by a later turn;
+    # a failed or missing tool is retried.
+    succeeded = _tool_succeeded(ml_output) and _tool_succeeded(rag_output)
+    return {
+        "ml_tool_output": ml_output,
+        "rag_context": rag_output,
+        "tool_input_key": _tool_input_key(state, node) if succeeded else None,
+        "token_usage": usage,
+    }
+
+
+# --- Agent Nodes ---
+# Each node has a sync and an async implementation; `ainvoke`/`astream` on
+# the compiled graph runs the async ones.
+
+
+def _token_usage(node: str, calls: list) -> dict:
+    return token_usage(node, NODE_PROVIDERS[node], calls)
+
+
+def _triage_result(state: AgentState, request_type: str) -> dict:
+    return {
+        "request_type": request_type,
+        "triage_input_key": _input_key(state["input_data"]),
+        "messages": [],
+    }
+
+
+def triage_node(state: AgentState) -> dict:
+    """
+    Determines the type of request (fraud, credit, or general) based on the input.
+    Obvious requests are classified locally; only ambiguous ones reach the LLM.
+    """
+    if _reusable_request_type(state):
+        return {"messages": []}
+    decision = _local_triage(state)
+    if decision is not None:
+        return _triage_result(state, decision.request_type)
+
+    prompt = _triage_prompt(state)
+    response = _llm("triage_llm").invoke(prompt)
+    return {
+        **_triage_result(state, _parse_request_type(response)),
+        "token_usage": _token_usage("triage", [(prompt, response)]),
+    }
+
+
+async def atriage_node(state: AgentState) -> dict:
+    """Async version of `triage_node`."""
+    if _reusable_request_type(state):
+        return {"messages": []}
+    decision = _local_triage(state)
+    if decision is not None:
+        return _triage_result(state, decision.request_type)
+
+    prompt = _triage_prompt(state)
+    response = await _llm("triage_llm").ainvoke(prompt)
+    return {
+        **_triage_result(state, _parse_request_type(response)),
+        "token_usage": _token_usage("triage", [(prompt, response)]),
+    }
 
 
 def fraud_agent_node(state: AgentState) -> dict:
     """
     Handles fraud detection tasks by calling ML and RAG tools.
+    The tool calls are planned by the agent LLM, or built directly from the
+    input when AGENT_TOOL_MODE is "direct".
     """
-    input_str = json.dumps(state["input_data"])
-    prompt = f"Analyze the following transaction for fraud. First, use the `run_fraud_detection_model` tool. Then, use the `query_databricks_vector_search` tool with the index '{settings.FRAUD_RAG_INDEX_NAME}' to find related historical patterns for the customer or merchant. Transaction: {input_str}"
-
-    response = fraud_agent_llm.invoke(prompt)
+    if _reusable_tool_outputs(state, "fraud_agent"):
+        return {}
+    usage = {}
+    if _direct_tool_mode():
+        tool_calls = _direct_fraud_tool_calls(state["input_data"])
+    else:
+        prompt = _fraud_agent_prompt(state)
+        response = _llm("fraud_agent_llm").invoke(prompt)
+        tool_calls = response.tool_calls
+        usage = _token_usage("fraud_agent", [(prompt, response)])
 
     ml_output = ""
     rag_output = ""
 
-    for tool_call in response.tool_calls:
+    for tool_call in tool_calls:
         if tool_call["name"] == "run_fraud_detection_model":
             ml_output = run_fraud_detection_model.invoke(tool_call["args"])
         elif tool_call["name"] == "query_databricks_vector_search":
@@ -67,56 +395,191 @@ def fraud_agent_node(state: AgentState) -> dict:
             tool_call["args"]["index_name"] = settings.FRAUD_RAG_INDEX_NAME
             rag_output = query_databricks_vector_search.invoke(tool_call["args"])
 
-    return {"ml_tool_output": ml_output, "rag_context": rag_output}
+    return _tool_results(state, "fraud_agent", ml_output, rag_output, usage)
+
+
+async def afraud_agent_node(state: AgentState) -> dict:
+    """
+    Async version of `fraud_agent_node`. The ML and RAG tools are independent,
+    so they run concurrently and the node takes as long as the slowest one.
+    """
+    if _reusable_tool_outputs(state, "fraud_agent"):
+        return {}
+    usage = {}
+    if _direct_tool_mode():
+        tool_calls = _direct_fraud_tool_calls(state["input_data"])
+    else:
+        prompt = _fraud_agent_prompt(state)
+        response = await _llm("fraud_agent_llm").ainvoke(prompt)
+        tool_calls = response.tool_calls
+        usage = _token_usage("fraud_agent", [(prompt, response)])
+    outputs = await _arun_tool_calls(
+        tool_calls,
+        {
+            "run_fraud_detection_model": run_fraud_detection_model,
+            "query_databricks_vector_search": query_databricks_vector_search,
+        },
+        settings.FRAUD_RAG_INDEX_NAME,
+    )
+    return _tool_results(
+        state,
+        "fraud_agent",
+        outputs.get("run_fraud_detection_model", ""),
+        outputs.get("query_databricks_vector_search", ""),
+        usage,
+    )
 
 
 def credit_agent_node(state: AgentState) -> dict:
     """
     Handles credit risk assessment tasks.
     """
-    input_str = json.dumps(state["input_data"])
-    prompt = f"Assess the credit risk for the following loan application. First, use the `run_credit_risk_model` tool. Then, use the `query_databricks_vector_search` tool with the index '{settings.CREDIT_RAG_INDEX_NAME}' to get the applicant's financial history. Application: {input_str}"
-
-    response = credit_agent_llm.invoke(prompt)
+    if _reusable_tool_outputs(state, "credit_agent"):
+        return {}
+    usage = {}
+    if _direct_tool_mode():
+        tool_calls = _direct_credit_tool_calls(state["input_data"])
+    else:
+        prompt = _credit_agent_prompt(state)
+        response = _llm("credit_agent_llm").invoke(prompt)
+        tool_calls = response.tool_calls
+        usage = _token_usage("credit_agent", [(prompt, response)])
 
     ml_output = ""
     rag_output = ""
 
-    for tool_call in response.tool_calls:
+    for tool_call in tool_calls:
         if tool_call["name"] == "run_credit_risk_model":
             ml_output = run_credit_risk_model.invoke(tool_call["args"])
         elif tool_call["name"] == "query_databricks_vector_search":
             tool_call["args"]["index_name"] = settings.CREDIT_RAG_INDEX_NAME
             rag_output = query_databricks_vector_search.invoke(tool_call["args"])
 
-    return {"ml_tool_output": ml_output, "rag_context": rag_output}
+    return _tool_results(state, "credit_agent", ml_output, rag_output, usage)
+
+
+async def acredit_agent_node(state: AgentState) -> dict:
+    """Async version of `credit_agent_node`, running its tools concurrently."""
+    if _reusable_tool_outputs(state, "credit_agent"):
+        return {}
+    usage = {}
+    if _direct_tool_mode():
+        tool_calls = _direct_credit_tool_calls(state["input_data"])
+    else:
+        prompt = _credit_agent_prompt(state)
+        response = await _llm("credit_agent_llm").ainvoke(prompt)
+        tool_calls = response.tool_calls
+        usage = _token_usage("credit_agent", [(prompt, response)])
+    outputs = await _arun_tool_calls(
+        tool_calls,
+        {
+            "run_credit_risk_model": run_credit_risk_model,
+            "query_databricks_vector_search": query_databricks_vector_search,
+        },
+        settings.CREDIT_RAG_INDEX_NAME,
+    )
+    return _tool_results(
+        state,
+        "credit_agent",
+        outputs.get("run_credit_risk_model", ""),
+        outputs.get("query_databricks_vector_search", ""),
+        usage,
+    )
+
+
+def _synthesis_tier(state: AgentState) -> str:
+    if not settings.SYNTHESIS_CASCADE_ENABLED:
+        return LARGE_TIER
+    return first_tier(
+        state, settings.SYNTHESIS_GRAY_ZONE_LOW, settings.SYNTHESIS_GRAY_ZONE_HIGH
+    )
+
+
+def _template_result(state: AgentState) -> dict:
+    started = time.perf_counter()
+    summary = template_summary(state)
+    record_tier(TEMPLATE_TIER, "answered", time.perf_counter() - started)
+    return {"final_summary": summary, "synthesis_tier": TEMPLATE_TIER}
+
+
+def _small_tier_result(calls: list, started: float):
+    """The small LLM's result, or None when it has to escalate."""
+    response = calls[-1][1]
+    escalate = needs_escalation(response.content)
+    outcome = "escalated" if escalate else "answered"
+    record_tier(SMALL_TIER, outcome, time.perf_counter() - started)
+    if escalate:
+        return None
+    return {
+        "final_summary": response.content,
+        "synthesis_tier": SMALL_TIER,
+        "token_usage": _token_usage("synthesis", calls),
+    }
+
+
+def _large_tier_result(calls: list, started: float) -> dict:
+    """The large LLM's result; `calls` include an escalated small-tier call."""
+    record_tier(LARGE_TIER, "answered", time.perf_counter() - started)
+    return {
+        "final_summary": calls[-1][1].content,
+        "synthesis_tier": LARGE_TIER,
+        "token_usage": _token_usage("synthesis", calls),
+    }
+
+
+# The small LLM's tokens are not streamed to the user, since its answer may
+# be discarded on escalation; an accepted answer is sent once complete.
+SMALL_TIER_CONFIG = {"tags": [TAG_NOSTREAM]}
 
 
 def synthesis_node(state: AgentState) -> dict:
     """
     Synthesizes all gathered information into a final report for the user.
+    Clear-cut model scores get a templated report without any LLM call;
+    gray-zone ones try the small LLM before the large one.
     """
-    prompt = f"""
-    You are a senior financial risk analyst. Your task is to create a concise, clear, and actionable summary based on the provided data.
-
-    Original User Request:
-    {json.dumps(state["input_data"])}
-
-    Request Type: {state["request_type"]}
-
-    Machine Learning Model Output:
-    {state["ml_tool_output"]}
-
-    Retrieved Context from Knowledge Base:
-    {state["rag_context"]}
-
-    Based on all the information above, provide a final summary. The summary should be in Markdown format and include:
-    1.  **Overall Assessment:** A clear, one-sentence conclusion (e.g., "High risk of fraud detected.").
-    2.  **Key Evidence:** 2-3 bullet points summarizing the evidence from the ML model and retrieved context that supports your assessment.
-    3.  **Recommended Actions:** A list of 2-3 concrete, actionable steps for the banker to take next.
-    """
-    response = synthesis_llm.invoke(prompt)
-    return {"final_summary": response.content}
+    tier = _synthesis_tier(state)
+    if tier == TEMPLATE_TIER:
+        return _template_result(state)
+    prompt = _synthesis_prompt(state)
+    calls = []
+    if tier == SMALL_TIER:
+        started = time.perf_counter()
+        small_prompt = small_tier_prompt(prompt)
+        response = _llm("small_synthesis_llm").invoke(
+            small_prompt, config=SMALL_TIER_CONFIG
+        )
+        calls.append((small_prompt, response))
+        result = _small_tier_result(calls, started)
+        if result is not None:
+            return result
+
+    started = time.perf_counter()
+    calls.append((prompt, _llm("synthesis_llm").invoke(prompt)))
+    return _large_tier_result(calls, started)
+
+
+async def asynthesis_node(state: AgentState) -> dict:
+    """Async version of `synthesis_node`."""
+    tier = _synthesis_tier(state)
+    if tier == TEMPLATE_TIER:
+        return _template_result(state)
+    prompt = _synthesis_prompt(state)
+    calls = []
+    if tier == SMALL_TIER:
+        started = time.perf_counter()
+        small_prompt = small_tier_prompt(prompt)
+        response = await _llm("small_synthesis_llm").ainvoke(
+            small_prompt, config=SMALL_TIER_CONFIG
+        )
+        calls.append((small_prompt, response))
+        result = _small_tier_result(calls, started)
+        if result is not None:
+            return result
+
+    started = time.perf_counter()
+    calls.append((prompt, await _llm("synthesis_llm").ainvoke(prompt)))
+    return _large_tier_result(calls, started)
 
 
 # --- Conditional Routing ---
@@ -141,11 +604,15 @@ def route_request(state: AgentState) -> str:
 
 workflow = StateGraph(AgentState)
 
-# Add nodes
-workflow.add_node("triage", triage_node)
-workflow.add_node("fraud_agent", fraud_agent_node)
-workflow.add_node("credit_agent", credit_agent_node)
-workflow.add_node("synthesis", synthesis_node)
+# Add nodes (sync implementation for invoke, async one for ainvoke/astream)
+workflow.add_node("triage", RunnableLambda(triage_node, afunc=atriage_node))
+workflow.add_node(
+    "fraud_agent", RunnableLambda(fraud_agent_node, afunc=afraud_agent_node)
+)
+workflow.add_node(
+    "credit_agent", RunnableLambda(credit_agent_node, afunc=acredit_agent_node)
+)
+workflow.add_node("synthesis", RunnableLambda(synthesis_node, afunc=asynthesis_node))
 
 # Define the workflow edges
 workflow.set_entry_point("triage")
@@ -164,5 +631,19 @@ workflow.add_edge("fraud_agent", "synthesis")
 workflow.add_edge("credit_agent", "synthesis")
 workflow.add_edge("synthesis", END)
 
-# Compile the graph
-app = workflow.compile()
+# Compile the graph; the checkpointer keeps each thread's state between turns
+checkpointer = create_checkpointer()
+app = workflow.compile(checkpointer=checkpointer)
+
+
+def turn_input(input_data: dict) -> dict:
+    """
+    The graph input for one turn of a thread. The previous turn's summary is
+    cleared, so a turn whose synthesis produced nothing never returns it.
+    """
+    return {
+        "input_data": input_data,
+        "messages": [],
+        "final_summary": None,
+        "synthesis_tier": None,
+    }
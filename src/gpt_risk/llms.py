@@ -1,25 +1,351 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
+import asyncio
+import functools
+import random
+import threading
+import time
+import weakref
+from typing import ClassVar, Dict, Optional, Tuple
+
+import httpx
+
+from src.app import metrics
+from src.app.cassette import CassetteChatModel
 from src.app.config import settings
+from src.app.tracing import record_queue_time
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_http_clients: Dict[
+    Tuple[str, Optional[str]], Tuple[httpx.Client, httpx.AsyncClient]
+] = {}
+_http_clients_lock = threading.Lock()
+
+retries_counter = metrics.counter(
+    "llm_request_retries_total",
+    "LLM requests retried after a transient failure.",
+    labelnames=("provider",),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def transient_errors() -> tuple:
+    """
+    Failures worth retrying: the request never reached the model, or the
+    provider asked us to back off. Anything else is raised straight away.
+    """
+    import openai
+    from google.api_core import exceptions as google_exceptions
+
+    return (
+        httpx.TransportError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.InternalServerError,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServiceUnavailable,
+    )
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt + 1`."""
+    ceiling = min(
+        settings.LLM_RETRY_BACKOFF_MAX_SECONDS,
+        settings.LLM_RETRY_BACKOFF_SECONDS * 2**attempt,
+    )
+    return random.uniform(0, ceiling)
+
+
+class ConcurrencyLimit:
+    """Caps in-flight requests to one provider, separately for sync and async."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.slots = threading.BoundedSemaphore(limit)
+        self._async_slots = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def async_slots(self) -> asyncio.Semaphore:
+        # An asyncio.Semaphore binds to the first loop that waits on it, so
+        # each event loop (e.g. each `asyncio.run`) gets its own.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = self._async_slots[loop] = asyncio.Semaphore(self.limit)
+        return slots
+
+
+@functools.lru_cache(maxsize=None)
+def concurrency_limit(provider: str, base_url: Optional[str]) -> ConcurrencyLimit:
+    limit = settings.LLM_PROVIDER_MAX_CONCURRENCY.get(
+        provider, settings.LLM_MAX_CONCURRENCY
+    )
+    return ConcurrencyLimit(limit)
+
+
+class RateLimit:
+    """
+    Spaces requests to one provider at least 1/`per_second` apart, across
+    threads and event loops; each request reserves the next free start time.
+    """
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserves a start time and returns the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        return start - now
+
+
+@functools.lru_cache(maxsize=None)
+def rate_limit(provider: str) -> Optional[RateLimit]:
+    # One budget per provider, shared by all its models and endpoints.
+    per_second = settings.LLM_PROVIDER_RATE_LIMITS.get(provider)
+    return RateLimit(per_second) if per_second else None
+
+
+class _PooledChatModel:
+    """
+    Mixed into a provider's chat model so that every request holds one of
+    the provider's concurrency slots, waits for its rate limit if it has one,
+    and transient failures are retried with jittered backoff. A stream is
+    only retried if it fails before its first chunk, since the chunks
+    already sent cannot be taken back.
+    """
+
+    provider: ClassVar[str] = ""
+
+    def _limit(self) -> ConcurrencyLimit:
+        # OpenAI-compatible providers are told apart by their base URL.
+        return concurrency_limit(self.provider, getattr(self, "openai_api_base", None))
+
+    def _rate_limit_delay(self) -> float:
+        limit = rate_limit(self.provider)
+        return limit.reserve() if limit is not None else 0.0
+
+    def _wait_for_rate_limit(self):
+        delay = self._rate_limit_delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def _await_rate_limit(self):
+        delay = self._rate_limit_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if attempt >= settings.LLM_MAX_RETRIES or not isinstance(
+            error, transient_errors()
+        ):
+            return False
+        retries_counter.inc(provider=self.provider)
+        return True
+
+    def _queued(self, queued_at: float, kwargs: dict):
+        waited = time.perf_counter() - queued_at
+        record_queue_time(self.provider, waited, kwargs.get("run_manager"))
+
+    def _generate(self, *args, **kwargs):
+        generate = super()._generate
+        queued_at = time.perf_counter()
+        with self._limit().slots:
+            self._queued(queued_at, kwargs)
+            attempt = 0
+            while True:
+                self._wait_for_rate_limit()
+                try:
+                    return generate(*args, **kwargs)
+                except Exception as error:
+                    if not self._should_retry(error, attempt):
+                        raise
+                time.sleep(backoff_seconds(attempt))
+                attempt += 1
+
+    async def _agenerate(self, *args, **kwargs):
+        agenerate = super()._agenerate
+        queued_at = time.perf_counter()
+        async with self._limit().async_slots:
+            self._queued(queued_at, kwargs)
+            attempt = 0
+            while True:
+                await self._await_rate_limit()
+                try:
+                    return await agenerate(*args, **kwargs)
+                except Exception as error:
+                    if not self._should_retry(error, attempt):
+                        raise
+                await asyncio.sleep(backoff_seconds(attempt))
+                attempt += 1
+
+    def _stream(self, *args, **kwargs):
+        stream = super()._stream
+        queued_at = time.perf_counter()
+        with self._limit().slots:
+            self._queued(queued_at, kwargs)
+            attempt = 0
+            while True:
+                self._wait_for_rate_limit()
+                started = False
+                try:
+                    for chunk in stream(*args, **kwargs):
+                        started = True
+                        yield chunk
+                    return
+                except Exception as error:
+                    if started or not self._should_retry(error, attempt):
+                        raise
+                time.sleep(backoff_seconds(attempt))
+                attempt += 1
+
+    async def _astream(self, *args, **kwargs):
+        astream = super()._astream
+        queued_at = time.perf_counter()
+        async with self._limit().async_slots:
+            self._queued(queued_at, kwargs)
+            attempt = 0
+            while True:
+                await self._await_rate_limit()
+                started = False
+                try:
+                    async for chunk in astream(*args, **kwargs):
+                        started = True
+                        yield chunk
+                    return
+                except Exception as error:
+                    if started or not self._should_retry(error, attempt):
+                        raise
+                await asyncio.sleep(backoff_seconds(attempt))
+                attempt += 1
+
+
+@functools.lru_cache(maxsize=None)
+def pooled_chat_model(base: type, provider_name: str) -> type:
+    """
+    `base` with `_PooledChatModel` mixed in, behind the LLM cassette. Built
+    on demand so that the provider SDKs, which are slow to import, load only
+    when a model is used.
+    """
+
+    class PooledChatModel(CassetteChatModel, _PooledChatModel, base):
+        provider: ClassVar[str] = provider_name
+
+    PooledChatModel.__name__ = PooledChatModel.__qualname__ = f"Pooled{base.__name__}"
+    return PooledChatModel
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.LLM_READ_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS
+    )
+
+
+def http_clients(
+    provider: str, base_url: Optional[str]
+) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    The sync and async HTTP clients shared by every model on one provider
+    and base URL. Their pools are sized to the provider's concurrency limit,
+    so connections are reused rather than opened per request. HTTP/2 is used
+    when the `h2` package is installed.
+    """
+    key = (provider, base_url)
+    with _http_clients_lock:
+        if key not in _http_clients:
+            limit = concurrency_limit(provider, base_url).limit
+            limits = httpx.Limits(
+                max_connections=limit, max_keepalive_connections=limit
+            )
+            _http_clients[key] = (
+                httpx.Client(timeout=_timeout(), limits=limits, http2=HTTP2_AVAILABLE),
+                httpx.AsyncClient(
+                    timeout=_timeout(), limits=limits, http2=HTTP2_AVAILABLE
+                ),
+            )
+        return _http_clients[key]
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_compatible_llm(model: str, base_url: Optional[str] = None):
+    """
+    Returns the process-wide client for an OpenAI-compatible model. Retries
+    are handled by `_PooledChatModel`, so the SDK's own are disabled.
+    """
+    from langchain_openai import ChatOpenAI
+
+    http_client, http_async_client = http_clients("openai", base_url)
+    return pooled_chat_model(ChatOpenAI, "openai")(
+        model=model,
+        api_key=settings.OPENAI_API_KEY,
+        base_url=base_url,
+        timeout=_timeout(),
+        max_retries=0,
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_google_llm(model: str):
+    """
+    Returns the process-wide client for a Gemini model. It talks gRPC, which
+    multiplexes requests over one HTTP/2 channel, so it has no HTTP pool to
+    share. `max_retries=1` means a single attempt, leaving retries to
+    `_PooledChatModel`.
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return pooled_chat_model(ChatGoogleGenerativeAI, "gemini")(
+        model=model,
+        google_api_key=settings.GOOGLE_API_KEY,
+        timeout=settings.LLM_READ_TIMEOUT_SECONDS,
+        max_retries=1,
+    )
+
+
+async def aclose_llm_clients():
+    """Closes the pooled HTTP clients; models requested afterwards get new ones."""
+    with _http_clients_lock:
+        clients = list(_http_clients.values())
+        _http_clients.clear()
+    get_openai_compatible_llm.cache_clear()
+    for http_client, http_async_client in clients:
+        http_client.close()
+        await http_async_client.aclose()
 
 
 def get_gemini_llm():
     """Initializes and returns the Gemini Pro LLM."""
-    return ChatGoogleGenerativeAI(
-        model="gemini-1.5-pro-latest", google_api_key=settings.GOOGLE_API_KEY
-    )
+    return get_google_llm("gemini-1.5-pro-latest")
+
+
+def get_gemini_flash_llm():
+    """Initializes and returns Gemini Flash, the cheaper synthesis tier."""
+    return get_google_llm("gemini-1.5-flash-latest")
 
 
 def get_qwen_llm():
     """
     Initializes and returns the Qwen LLM.
     NOTE: This uses the OpenAI client as a proxy for an OpenAI-compatible API.
-    Update the base_url if you are self-hosting or using a different provider.
+    Set QWEN_BASE_URL if you are self-hosting or using a different provider.
     """
-    return ChatOpenAI(
-        model="qwen-32b-chat",  # Or the specific model name you are using
-        api_key=settings.OPENAI_API_KEY,
-        # base_url="http://localhost:8000/v1" # Example for a local server
+    return get_openai_compatible_llm(
+        "qwen-32b-chat",  # Or the specific model name you are using
+        settings.QWEN_BASE_URL,
     )
 
 
@@ -27,10 +353,6 @@ def get_llama_llm():
     """
     Initializes and returns the Llama 3 LLM.
     NOTE: This uses the OpenAI client as a proxy.
-    Update the base_url for your specific Llama 3 hosting endpoint.
+    Set LLAMA_BASE_URL to your Llama 3 hosting endpoint.
     """
-    return ChatOpenAI(
-        model="llama-3-70b-instruct",
-        api_key=settings.OPENAI_API_KEY,
-        # base_url="http://your-llama-api-endpoint/v1"
-    )
+    return get_openai_compatible_llm("llama-3-70b-instruct", settings.LLAMA_BASE_URL)
@@ -1,19 +1,87 @@
-import gradio as gr
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import uvicorn
 import httpx
 import json
+import threading
 from pydantic import BaseModel
 
 # Mount the Gradio gpt_risk
-from src.app.graph import app as langgraph_app
+from src.app.graph import (
+    app as langgraph_app,
+    checkpointer,
+    preload_llms,
+    reset_llms,
+    turn_input,
+)
+from src.app.tools.ml_models import (
+    model_registry,
+    fraud_batcher,
+    credit_batcher,
+    inference_executor,
+)
+from src.app import metrics
+from src.app.fast_triage import triage_stats
+from src.app.synthesis_cascade import cascade_stats
+from src.app.tracing import RequestTrace
+from src.app.streaming import format_sse, stream_chat
+from src.app.chat_backend import create_chat_backend
+from src.app.llms import aclose_llm_clients
+from src.app.tools.databricks_rag import (
+    cache_stats as rag_cache_stats,
+    embedding_cache,
+    invalidate_index,
+    vector_search_pool,
+)
+from src.app.tools.batch_scoring import (
+    DEFAULT_CHUNK_SIZE,
+    ModelNotLoadedError,
+    score_fraud_batch,
+    score_credit_batch,
+    to_ndjson,
+)
+from src.app.config import settings
 
 # --- FastAPI App ---
 
+chat_backend = create_chat_backend()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warms the ML models and LLM clients before serving and watches the models
+    for hot-swaps.
+    """
+    model_registry.preload()
+    # The provider SDKs take seconds to import; build the LLM clients in the
+    # background so the server starts accepting requests straight away.
+    threading.Thread(target=preload_llms, name="llm-preload", daemon=True).start()
+    if settings.RAG_EMBEDDING_CACHE_PATH:
+        embedding_cache.load(settings.RAG_EMBEDDING_CACHE_PATH)
+    model_registry.start_watching(settings.MODEL_WATCH_INTERVAL_SECONDS)
+    inference_executor.start()
+    yield
+    inference_executor.shutdown()
+    model_registry.stop_watching()
+    fraud_batcher.stop()
+    credit_batcher.stop()
+    vector_search_pool.close()
+    if checkpointer is not None:
+        checkpointer.close()
+    await chat_backend.aclose()
+    await aclose_llm_clients()
+    reset_llms()
+    if settings.RAG_EMBEDDING_CACHE_PATH:
+        embedding_cache.save(settings.RAG_EMBEDDING_CACHE_PATH)
+
+
 app = FastAPI(
     title="Financial AI Assistant API",
     description="API for interacting with the financial risk assessment agent.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -23,34 +91,166 @@ class ChatRequest(BaseModel):
 
 
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, timings: bool = False):
     """
     Endpoint to interact with the financial agent.
-    Streams the final response back.
+    Streams the final response back. With `timings=true`, the response also
+    breaks the request's time down by graph node, LLM call and tool call.
     """
-    config = {"configurable": {"thread_id": request.thread_id}}
+    trace = RequestTrace()
+    config = {"configurable": {"thread_id": request.thread_id}, "callbacks": [trace]}
     final_response = ""
     async for event in langgraph_app.astream(
-        {"input_data": request.query, "messages": ""},
+        turn_input(request.query),
         config=config,
         stream_mode="values",
     ):
         if "final_summary" in event and event["final_summary"]:
             final_response = event["final_summary"]
 
+    if timings:
+        return {"response": final_response, "timings": trace.breakdown()}
     return {"response": final_response}
 
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest, timings: bool = False):
+    """
+    Streams the final summary as server-sent events: one `token` event per
+    chunk generated by the synthesis LLM, then a `done` event with the full
+    response (and, with `timings=true`, the request's timing breakdown).
+    """
+
+    async def events():
+        async for event, data in stream_chat(
+            request.query, request.thread_id, timings=timings
+        ):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _read_batch_records(request: Request) -> list:
+    """
+    Reads batch records from either an NDJSON body (one record per line)
+    or a JSON body of the form {"records": [...]}.
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            payload = json.loads(body or b"{}")
+            records = payload.get("records") if isinstance(payload, dict) else payload
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Malformed JSON: {e}")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=422, detail="Expected a list of records.")
+    # Rejected up front, since the results stream once scoring starts.
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise HTTPException(
+                status_code=422, detail=f"Record {index} is not a JSON object."
+            )
+    return records
+
+
+def _stream_scores(score_fn, records: list, chunk_size: int) -> StreamingResponse:
+    try:
+        results = score_fn(records, chunk_size=chunk_size)
+    except ModelNotLoadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    # The generator is synchronous, so Starlette iterates it in a worker
+    # thread and scoring never blocks the event loop.
+    return StreamingResponse(
+        to_ndjson(results, chunk_size=chunk_size), media_type="application/x-ndjson"
+    )
+
+
+@app.post("/score/fraud/batch")
+async def score_fraud_batch_endpoint(
+    request: Request, chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=100_000)
+):
+    """
+    Scores many transactions at once. Streams one NDJSON result per record.
+    """
+    records = await _read_batch_records(request)
+    return _stream_scores(score_fraud_batch, records, chunk_size)
+
+
+@app.post("/score/credit/batch")
+async def score_credit_batch_endpoint(
+    request: Request, chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=100_000)
+):
+    """
+    Scores many loan applications at once. Streams one NDJSON result per record.
+    """
+    records = await _read_batch_records(request)
+    return _stream_scores(score_credit_batch, records, chunk_size)
+
+
+@app.get("/models")
+async def models_endpoint():
+    """
+    Reports the version, load time and memory footprint of each loaded model.
+    """
+    return model_registry.stats()
+
+
+@app.post("/rag/cache/invalidate")
+async def invalidate_rag_cache_endpoint(index_name: str = Query(None)):
+    """
+    Drops cached retrieval results for `index_name` (or every index), e.g.
+    after the index has been refreshed.
+    """
+    return {"invalidated": invalidate_index(index_name)}
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Exposes every metric in the Prometheus text format for scraping."""
+    return PlainTextResponse(
+        metrics.prometheus_text(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/stats")
+async def stats_endpoint():
+    """
+    Reports runtime metrics, including micro-batcher batch sizes and queue delays
+    and the inference executor's queue depth and worker utilization.
+    """
+    return {
+        "inference_executor": inference_executor.stats(),
+        "triage": triage_stats(),
+        "synthesis_cascade": cascade_stats(),
+        "vector_search": vector_search_pool.stats(),
+        "rag_cache": rag_cache_stats(),
+        "micro_batchers": {
+            batcher.name: batcher.stats() for batcher in (fraud_batcher, credit_batcher)
+        },
+        "metrics": metrics.snapshot(),
+    }
+
+
 # --- Gradio UI ---
 
 
-def create_gradio_ui():
-    """Creates and returns the Gradio ChatInterface."""
+def create_gradio_ui(chat_backend):
+    """
+    Creates and returns the Gradio ChatInterface. `chat_backend` runs the
+    graph in-process or streams from a remote API server.
+    """
+    import gradio as gr
 
-    async def chat_fn(message, history):
-        thread_id = (
-            "user_session_123"  # In a real gpt_risk, this would be unique per user/session
-        )
+    async def chat_fn(message, history, request: gr.Request = None):
+        # One conversation thread per browser session, so follow-up questions
+        # see the results of the session's earlier turns.
+        thread_id = request.session_hash if request else "user_session_123"
 
         # Attempt to parse the message as JSON, otherwise treat as a text query
         try:
@@ -58,26 +258,20 @@ def create_gradio_ui():
         except json.JSONDecodeError:
             query_data = {"text_query": message}
 
-        # Use httpx to call the FastAPI backend
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    "http://127.0.0.1:8000/chat",
-                    json={"query": query_data, "thread_id": thread_id},
-                    timeout=120.0,
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                # Stream the response to the UI
-                full_response = result.get("response", "Sorry, I encountered an error.")
-                for i in range(len(full_response)):
-                    yield full_response[: i + 1]
-
-            except httpx.RequestError as e:
-                yield f"Error connecting to the backend: {e}"
-            except Exception as e:
-                yield f"An unexpected error occurred: {e}"
+        # Render tokens as the backend streams them
+        try:
+            partial_response = ""
+            async for event, data in chat_backend.stream(query_data, thread_id):
+                if event == "token":
+                    partial_response += data["text"]
+                    yield partial_response
+                elif event == "done" and not partial_response:
+                    yield "Sorry, I encountered an error."
+
+        except httpx.RequestError as e:
+            yield f"Error connecting to the backend: {e}"
+        except Exception as e:
+            yield f"An unexpected error occurred: {e}"
 
     # Example JSON inputs for easy testing
     fraud_example = json.dumps(
@@ -114,14 +308,18 @@ def create_gradio_ui():
     return interface
 
 
-# Mount the Gradio gpt_risk to the FastAPI gpt_risk
-gradio_ui = create_gradio_ui()
-app = gr.mount_gradio_app(app, gradio_ui, path="/")
+# Mount the Gradio gpt_risk to the FastAPI gpt_risk. Gradio is slow to import,
+# so API-only workers can skip it with GRADIO_UI_ENABLED=false.
+if settings.GRADIO_UI_ENABLED:
+    import gradio as gr
+
+    gradio_ui = create_gradio_ui(chat_backend)
+    app = gr.mount_gradio_app(app, gradio_ui, path="/")
 
 
 def run_app():
     """Function to run the Uvicorn server."""
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.SERVER_HOST, port=settings.SERVER_PORT)
 
 
 if __name__ == "__main__":
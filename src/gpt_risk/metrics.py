@@ -0,0 +1,224 @@
+import bisect
+import threading
+from typing import Dict, Sequence, Tuple
+
+# Default latency buckets in seconds, from sub-millisecond model calls up to
+# multi-second LLM round trips.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Counter:
+    """A monotonically increasing value, optionally split by labels."""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+    def samples(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def snapshot(self) -> dict:
+        return {
+            _label_str(self.labelnames, key): value
+            for key, value in self.samples().items()
+        }
+
+
+class Histogram:
+    """Bucketed observations with count and sum, optionally split by labels."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [bucket counts (+Inf last), count, sum]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def samples(self) -> Dict[Tuple, tuple]:
+        """Returns (bucket counts, count, sum) per label set."""
+        with self._lock:
+            return {
+                key: (list(counts), count, total)
+                for key, (counts, count, total) in self._series.items()
+            }
+
+    def quantile(self, q: float, **labels) -> float:
+        """Estimates a quantile by linear interpolation within its bucket."""
+        series = self.samples().get(_label_key(self.labelnames, labels))
+        if series is None:
+            return 0.0
+        return _bucket_quantile(self.buckets, series[0], series[1], q)
+
+    def snapshot(self) -> dict:
+        result = {}
+        for key, (counts, count, total) in self.samples().items():
+            result[_label_str(self.labelnames, key)] = {
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else 0.0,
+                "p50": _bucket_quantile(self.buckets, counts, count, 0.50),
+                "p95": _bucket_quantile(self.buckets, counts, count, 0.95),
+                "p99": _bucket_quantile(self.buckets, counts, count, 0.99),
+            }
+        return result
+
+
+# --- Registry ---
+
+_registry: Dict[str, object] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Returns the counter registered under `name`, creating it on first use."""
+    return _get_or_create(Counter, name, description, labelnames=labelnames)
+
+
+def histogram(
+    name: str,
+    description: str,
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+    labelnames: Sequence[str] = (),
+) -> Histogram:
+    """Returns the histogram registered under `name`, creating it on first use."""
+    return _get_or_create(
+        Histogram, name, description, buckets=buckets, labelnames=labelnames
+    )
+
+
+def all_metrics() -> list:
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def snapshot() -> dict:
+    """A JSON-friendly view of every registered metric."""
+    return {metric.name: metric.snapshot() for metric in all_metrics()}
+
+
+def prometheus_text() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in all_metrics():
+        kind = "counter" if isinstance(metric, Counter) else "histogram"
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {kind}")
+        if isinstance(metric, Counter):
+            for key, value in sorted(metric.samples().items()):
+                labels = _prometheus_labels(metric.labelnames, key)
+                lines.append(f"{metric.name}{labels} {_prometheus_value(value)}")
+            continue
+        for key, (counts, count, total) in sorted(metric.samples().items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*metric.buckets, "+Inf"), counts):
+                cumulative += bucket_count
+                labels = _prometheus_labels(
+                    metric.labelnames, key, le=_prometheus_value(bound)
+                )
+                lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+            labels = _prometheus_labels(metric.labelnames, key)
+            lines.append(f"{metric.name}_sum{labels} {_prometheus_value(total)}")
+            lines.append(f"{metric.name}_count{labels} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _prometheus_labels(labelnames: Tuple, key: Tuple, **extra) -> str:
+    pairs = [*zip(labelnames, key), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(v)}"' for name, v in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _get_or_create(cls, name, description, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, description, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' is already registered as another type.")
+        return metric
+
+
+def _label_key(labelnames: Tuple, labels: dict) -> Tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _label_str(labelnames: Tuple, key: Tuple) -> str:
+    if not labelnames:
+        return ""
+    return ",".join(f"{name}={value}" for name, value in zip(labelnames, key))
+
+
+def _bucket_quantile(buckets: Tuple, counts: list, count: int, q: float) -> float:
+    if count == 0:
+        return 0.0
+    rank = q * count
+    cumulative = 0
+    for i, bucket_count in enumerate(counts):
+        if cumulative + bucket_count >= rank and bucket_count:
+            lower = buckets[i - 1] if i > 0 else 0.0
+            # Observations above the last bucket are reported at its bound.
+            upper = buckets[i] if i < len(buckets) else buckets[-1]
+            return lower + (upper - lower) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+    return buckets[-1]
@@ -0,0 +1,218 @@
+import functools
+import json
+import re
+from typing import Optional
+
+from src.app import metrics
+from src.app.config import settings
+from src.app.features import CREDIT_FEATURE_SPEC, FRAUD_FEATURE_SPEC
+
+TOKEN_COUNTERS = ("estimate", "tiktoken")
+
+# Characters per token of each provider's tokenizer on English and JSON text.
+# Gemini only counts tokens through an API call, so it is always estimated.
+CHARS_PER_TOKEN = {"gemini": 4.0, "openai": 3.6}
+TRUNCATION_MARKER = " [...]"
+
+# Identifiers are kept for the retrieval query and the report, besides the
+# fields the model reads.
+IDENTIFIER_FIELDS = ("transaction_id", "application_id", "customer_id", "merchant_id")
+RELEVANT_FIELDS = {
+    "fraud_check": (*IDENTIFIER_FIELDS, *FRAUD_FEATURE_SPEC.source_fields),
+    "credit_risk": (*IDENTIFIER_FIELDS, *CREDIT_FEATURE_SPEC.source_fields),
+}
+
+tokens_counter = metrics.counter(
+    "llm_tokens_total",
+    "LLM tokens per graph node, by kind (prompt, completion).",
+    labelnames=("node", "kind"),
+)
+
+
+# --- Token Counting ---
+
+
+@functools.lru_cache(maxsize=1)
+def _tiktoken_encoding():
+    """cl100k_base, close to the Qwen and Llama tokenizers; None if unavailable."""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def _encoding(provider: str):
+    if settings.PROMPT_TOKEN_COUNTER not in TOKEN_COUNTERS:
+        raise ValueError(f"Unknown token counter '{settings.PROMPT_TOKEN_COUNTER}'.")
+    if settings.PROMPT_TOKEN_COUNTER == "tiktoken" and provider == "openai":
+        return _tiktoken_encoding()
+    return None
+
+
+def count_tokens(text: str, provider: str) -> int:
+    encoding = _encoding(provider)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return int(len(text) / CHARS_PER_TOKEN.get(provider, 4.0) + 0.5)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, provider: str) -> str:
+    if count_tokens(text, provider) <= max_tokens:
+        return text
+    room = max(max_tokens - count_tokens(TRUNCATION_MARKER, provider), 0)
+    encoding = _encoding(provider)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:room]) + TRUNCATION_MARKER
+    return text[: int(room * CHARS_PER_TOKEN.get(provider, 4.0))] + TRUNCATION_MARKER
+
+
+def summarize_text(text: str, max_tokens: int, provider: str) -> str:
+    """
+    Shortens text to the budget by keeping its leading sentences, so the cut
+    falls on a sentence boundary; a first sentence over budget is truncated.
+    """
+    if count_tokens(text, provider) <= max_tokens:
+        return text
+    kept = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        candidate = f"{kept} {sentence}" if kept else sentence
+        if count_tokens(candidate + TRUNCATION_MARKER, provider) > max_tokens:
+            break
+        kept = candidate
+    if not kept:
+        return truncate_to_tokens(text, max_tokens, provider)
+    return kept + TRUNCATION_MARKER
+
+
+# --- Prompt Sections ---
+
+
+def relevant_input(input_data: dict, request_type: Optional[str]) -> dict:
+    """
+    The input fields the ML model reads, plus identifiers. Other request types
+    keep every field, since the LLM has to interpret them itself.
+    """
+    fields = RELEVANT_FIELDS.get(request_type)
+    if fields is None:
+        return input_data
+    return {key: value for key, value in input_data.items() if key in fields}
+
+
+def fit_input(input_data: dict, max_tokens: int, provider: str) -> str:
+    """
+    The input as JSON within the budget. Fields are kept in order while they
+    fit; a long text field that does not fit is truncated.
+    """
+    kept = {}
+    used = count_tokens("{}", provider)
+    for key, value in input_data.items():
+        cost = _field_tokens(key, value, bool(kept), provider)
+        if used + cost <= max_tokens:
+            kept[key] = value
+            used += cost
+        elif isinstance(value, str):
+            empty = _field_tokens(key, "", bool(kept), provider)
+            room = max_tokens - used - empty
+            if room > 0:
+                kept[key] = truncate_to_tokens(value, room, provider)
+                used += empty + room
+    return json.dumps(kept)
+
+
+def _field_tokens(key: str, value, follows: bool, provider: str) -> int:
+    # Each field is counted once, as it appears in the JSON object, and
+    # rounded up by a token, so the running total never undercounts the
+    # joined JSON while the growing object is not re-serialized per field.
+    field = json.dumps({key: value})[1:-1]
+    return count_tokens(f", {field}" if follows else field, provider) + 1
+
+
+def fit_documents(
+    rag_context: Optional[str], max_tokens: int, document_tokens: int, provider: str
+) -> str:
+    """
+    The retrieved documents as JSON within the budget. Each document's
+    content is summarized to `document_tokens`, then documents are kept in
+    rank order while they fit. Output that is not a document list (e.g. a
+    tool error) is truncated.
+    """
+    try:
+        documents = json.loads(rag_context or "[]")
+    except json.JSONDecodeError:
+        documents = None
+    if not isinstance(documents, list):
+        return truncate_to_tokens(rag_context or "", max_tokens, provider)
+
+    kept = []
+    for document in documents:
+        if isinstance(document, dict) and isinstance(document.get("content"), str):
+            document = {
+                **document,
+                "content": summarize_text(
+                    document["content"], document_tokens, provider
+                ),
+            }
+        if count_tokens(json.dumps([*kept, document]), provider) > max_tokens:
+            break
+        kept.append(document)
+    return json.dumps(kept)
+
+
+# --- Budgeted Sections ---
+# The graph's prompts embed these instead of the raw state, each within its
+# PROMPT_*_TOKEN_BUDGET for the provider of the LLM that reads the prompt.
+
+
+def input_section(input_data: dict, request_type: Optional[str], provider: str) -> str:
+    if not settings.PROMPT_BUDGET_ENABLED:
+        return json.dumps(input_data)
+    return fit_input(
+        relevant_input(input_data, request_type),
+        settings.PROMPT_INPUT_TOKEN_BUDGET,
+        provider,
+    )
+
+
+def tool_output_section(ml_tool_output: Optional[str], provider: str) -> str:
+    if not settings.PROMPT_BUDGET_ENABLED:
+        return ml_tool_output or ""
+    return truncate_to_tokens(
+        ml_tool_output or "", settings.PROMPT_ML_OUTPUT_TOKEN_BUDGET, provider
+    )
+
+
+def documents_section(rag_context: Optional[str], provider: str) -> str:
+    if not settings.PROMPT_BUDGET_ENABLED:
+        return rag_context or ""
+    return fit_documents(
+        rag_context,
+        settings.PROMPT_RAG_TOKEN_BUDGET,
+        settings.PROMPT_RAG_DOCUMENT_TOKEN_BUDGET,
+        provider,
+    )
+
+
+# --- Token Usage ---
+
+
+def token_usage(node: str, provider: str, calls) -> dict:
+    """
+    Prompt and completion tokens of a node's LLM calls, given as (prompt,
+    response) pairs. The provider's reported usage is used when the response
+    carries it, and the tokens are counted locally otherwise.
+    """
+    usage = {"prompt_tokens": 0, "completion_tokens": 0}
+    for prompt, response in calls:
+        reported = getattr(response, "usage_metadata", None)
+        if isinstance(reported, dict):
+            usage["prompt_tokens"] += reported.get("input_tokens", 0)
+            usage["completion_tokens"] += reported.get("output_tokens", 0)
+            continue
+        usage["prompt_tokens"] += count_tokens(prompt, provider)
+        content = response.content if isinstance(response.content, str) else ""
+        usage["completion_tokens"] += count_tokens(content, provider)
+    tokens_counter.inc(usage["prompt_tokens"], node=node, kind="prompt")
+    tokens_counter.inc(usage["completion_tokens"], node=node, kind="completion")
+    return {node: usage}
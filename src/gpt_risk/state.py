@@ -2,6 +2,11 @@ from typing import TypedDict, List, Annotated, Optional
 import operator
 
 
+def merge_token_usage(current: Optional[dict], update: Optional[dict]) -> dict:
+    """Reducer for `token_usage`: each node's entry is replaced by its latest."""
+    return {**(current or {}), **(update or {})}
+
+
 class AgentState(TypedDict):
     """
     Represents the state of our financial agent. This state is passed
@@ -21,9 +26,18 @@ class AgentState(TypedDict):
     rag_context: Optional[str]
     ml_tool_output: Optional[str]  # Storing as JSON string
 
+    # Keys of the inputs the request type and tool outputs were computed for,
+    # so a thread's follow-up turns can reuse them
+    triage_input_key: Optional[str]
+    tool_input_key: Optional[str]
+
     # Final outputs for the user
     final_summary: Optional[str]
+    synthesis_tier: Optional[str]  # 'template', 'small' or 'large'
     mitigation_steps: Optional[List[str]]
 
+    # Prompt and completion tokens of the latest LLM calls, per node
+    token_usage: Annotated[dict, merge_token_usage]
+
     # System state for error handling
     error_log: Optional[str]
@@ -0,0 +1,95 @@
+import json
+import time
+from typing import AsyncIterator, Tuple
+
+from src.app import metrics
+from src.app.graph import app as langgraph_app, turn_input
+from src.app.tracing import RequestTrace
+
+# Only the synthesis LLM's tokens are user-facing; the triage and agent LLMs
+# stream through the same channel and are filtered out.
+STREAMED_NODES = ("synthesis",)
+
+time_to_first_token_histogram = metrics.histogram(
+    "chat_time_to_first_token_seconds",
+    "Time from receiving a chat request until its first summary token was sent.",
+)
+stream_duration_histogram = metrics.histogram(
+    "chat_stream_duration_seconds",
+    "Time from receiving a chat request until its stream completed.",
+)
+
+
+def _chunk_text(message) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    # Some providers send content blocks instead of a plain string.
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content
+    )
+
+
+async def stream_chat(
+    query: dict, thread_id: str, timings: bool = False
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Runs the graph for one request and yields ("token", {"text": ...}) events
+    as the synthesis LLM generates, then one ("done", {"response": ...}) event
+    with the full summary. If the LLM does not stream, the summary is sent as
+    a single token once it is complete. With `timings`, the done event also
+    carries the request's timing breakdown.
+    """
+    started = time.perf_counter()
+    trace = RequestTrace()
+    config = {"configurable": {"thread_id": thread_id}, "callbacks": [trace]}
+    streamed_any = False
+    final_response = ""
+    async for mode, chunk in langgraph_app.astream(
+        turn_input(query),
+        config=config,
+        stream_mode=["messages", "values"],
+    ):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") not in STREAMED_NODES:
+                continue
+            text = _chunk_text(message)
+            if not text:
+                continue
+            if not streamed_any:
+                streamed_any = True
+                time_to_first_token_histogram.observe(time.perf_counter() - started)
+            yield "token", {"text": text}
+        elif chunk.get("final_summary"):
+            final_response = chunk["final_summary"]
+
+    if not streamed_any and final_response:
+        time_to_first_token_histogram.observe(time.perf_counter() - started)
+        yield "token", {"text": final_response}
+    stream_duration_histogram.observe(time.perf_counter() - started)
+    if timings:
+        yield "done", {"response": final_response, "timings": trace.breakdown()}
+    else:
+        yield "done", {"response": final_response}
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def parse_sse(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[str, dict]]:
+    """Parses a server-sent event stream back into (event, data) pairs."""
+    event, data = "message", []
+    async for line in lines:
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:") :].strip())
+    if data:
+        yield event, json.loads("\n".join(data))
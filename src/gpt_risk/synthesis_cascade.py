@@ -0,0 +1,198 @@
+import json
+import re
+from typing import Optional
+
+from src.app import metrics
+
+# Tiers of the synthesis cascade, cheapest first.
+TEMPLATE_TIER = "template"
+SMALL_TIER = "small"
+LARGE_TIER = "large"
+
+# The small LLM answers with this alone when it is not confident enough.
+ESCALATE_TOKEN = "ESCALATE"
+REQUIRED_SECTIONS = ("Overall Assessment", "Key Evidence", "Recommended Actions")
+
+PROBABILITY_FIELDS = {
+    "fraud_check": "fraud_probability",
+    "credit_risk": "default_probability",
+}
+
+ASSESSMENTS = {
+    ("fraud_check", True): "High risk of fraud detected.",
+    ("fraud_check", False): "Low risk of fraud; the transaction looks legitimate.",
+    ("credit_risk", True): "High risk of default on this loan application.",
+    ("credit_risk", False): "Low risk of default on this loan application.",
+}
+
+STANDARD_ACTIONS = {
+    ("fraud_check", True): [
+        "Place a temporary hold on the card and block further transactions.",
+        "Contact the customer through a verified channel to confirm the transaction.",
+        "Escalate the case to the fraud investigation team.",
+    ],
+    ("fraud_check", False): [
+        "Approve the transaction; no further review is needed.",
+        "Keep the account under standard monitoring.",
+    ],
+    ("credit_risk", True): [
+        "Decline the application or refer it for manual underwriting.",
+        "Request additional income and employment verification.",
+        "Consider a smaller loan amount or additional collateral.",
+    ],
+    ("credit_risk", False): [
+        "Proceed with approval under standard terms.",
+        "Complete the standard documentation and identity checks.",
+    ],
+}
+
+# Phrases of an "Overall Assessment" that conclude high or low risk.
+HIGH_RISK_PHRASES = (
+    "high risk",
+    "elevated risk",
+    "significant risk",
+    "fraud detected",
+    "likely fraudulent",
+    "likely to default",
+)
+LOW_RISK_PHRASES = (
+    "low risk",
+    "minimal risk",
+    "no risk",
+    "legitimate",
+    "unlikely",
+)
+_ASSESSMENT = re.compile(
+    r"Overall Assessment(.*?)(?:Key Evidence|$)", re.IGNORECASE | re.DOTALL
+)
+
+tier_requests = metrics.counter(
+    "synthesis_tier_requests_total",
+    "Synthesis attempts per cascade tier and their outcome (answered, escalated).",
+    labelnames=("tier", "outcome"),
+)
+tier_latency = metrics.histogram(
+    "synthesis_tier_latency_seconds",
+    "Time spent in each synthesis cascade tier.",
+    labelnames=("tier",),
+)
+
+
+def model_probability(state: dict) -> Optional[float]:
+    """The ML model's probability from the tool output, if it produced one."""
+    field = PROBABILITY_FIELDS.get(state.get("request_type"))
+    if field is None or not state.get("ml_tool_output"):
+        return None
+    try:
+        output = json.loads(state["ml_tool_output"])
+    except json.JSONDecodeError:
+        return None
+    probability = output.get(field) if isinstance(output, dict) else None
+    return float(probability) if isinstance(probability, (int, float)) else None
+
+
+def assessment_verdict(summary: Optional[str]) -> Optional[bool]:
+    """
+    Whether a summary's "Overall Assessment" concludes high (True) or low
+    (False) risk. None when the section is missing, hedged or mixed.
+    """
+    match = _ASSESSMENT.search(summary or "")
+    if match is None:
+        return None
+    assessment = match.group(1).lower()
+    high = any(phrase in assessment for phrase in HIGH_RISK_PHRASES)
+    low = any(phrase in assessment for phrase in LOW_RISK_PHRASES)
+    return high if high != low else None
+
+
+def first_tier(state: dict, gray_zone_low: float, gray_zone_high: float) -> str:
+    """
+    Clear-cut model scores, outside [gray_zone_low, gray_zone_high], get the
+    templated summary; gray-zone scores start at the small LLM. Requests
+    without a model score (general queries, model errors) go to the large LLM.
+    """
+    probability = model_probability(state)
+    if probability is None:
+        return LARGE_TIER
+    if probability < gray_zone_low or probability > gray_zone_high:
+        return TEMPLATE_TIER
+    return SMALL_TIER
+
+
+def _retrieved_documents(rag_context: Optional[str]) -> list:
+    try:
+        documents = json.loads(rag_context or "[]")
+    except json.JSONDecodeError:
+        return []
+    return documents if isinstance(documents, list) else []
+
+
+def template_summary(state: dict) -> str:
+    """
+    A deterministic summary in the format the synthesis prompt asks for:
+    assessment, evidence from the model and knowledge base, standard actions.
+    """
+    request_type = state["request_type"]
+    probability = model_probability(state)
+    high_risk = probability >= 0.5
+    output = json.loads(state["ml_tool_output"])
+    subject = "fraud" if request_type == "fraud_check" else "default"
+
+    evidence = [
+        f"The {subject} model (version {output.get('model_version', 'unknown')}) "
+        f"scored a {probability:.1%} probability of {subject}."
+    ]
+    if output.get("contributing_features"):
+        features = ", ".join(output["contributing_features"])
+        evidence.append(f"Main contributing features: {features}.")
+    documents = _retrieved_documents(state.get("rag_context"))
+    if documents:
+        sources = sorted(
+            {
+                str(doc.get("source", "N/A"))
+                for doc in documents
+                if isinstance(doc, dict)
+            }
+        )
+        evidence.append(
+            f"{len(documents)} related records were found in the knowledge base "
+            f"({', '.join(sources)})."
+        )
+
+    lines = [f"1.  **Overall Assessment:** {ASSESSMENTS[request_type, high_risk]}"]
+    lines.append("2.  **Key Evidence:**")
+    lines += [f"    *   {item}" for item in evidence]
+    lines.append("3.  **Recommended Actions:**")
+    lines += [f"    *   {item}" for item in STANDARD_ACTIONS[request_type, high_risk]]
+    return "\n".join(lines)
+
+
+def small_tier_prompt(prompt: str) -> str:
+    return (
+        f"{prompt}\n"
+        f"    If the evidence is conflicting or too weak for a confident assessment, "
+        f"reply with only the word {ESCALATE_TOKEN}.\n"
+    )
+
+
+def needs_escalation(summary: str) -> bool:
+    """True when the small LLM declined, or left out a required section."""
+    if ESCALATE_TOKEN in summary:
+        return True
+    return not all(section in summary for section in REQUIRED_SECTIONS)
+
+
+def record_tier(tier: str, outcome: str, seconds: float):
+    tier_requests.inc(tier=tier, outcome=outcome)
+    tier_latency.observe(seconds, tier=tier)
+
+
+def cascade_stats() -> dict:
+    """How many requests each tier answered or escalated, with its latency."""
+    stats = {}
+    for (tier, outcome), count in tier_requests.samples().items():
+        stats.setdefault(tier, {})[outcome] = count
+    for tier, entry in stats.items():
+        entry["latency_p50_ms"] = tier_latency.quantile(0.5, tier=tier) * 1e3
+        entry["latency_p99_ms"] = tier_latency.quantile(0.99, tier=tier) * 1e3
+    return stats
@@ -0,0 +1,100 @@
+import json
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from src.app.tools.ml_models import (
+    model_registry,
+    fraud_feature_matrix,
+    credit_feature_matrix,
+)
+
+DEFAULT_CHUNK_SIZE = 4096
+
+
+class ModelNotLoadedError(RuntimeError):
+    """Raised when a batch is submitted for a model that has not been trained."""
+
+
+def score_fraud_batch(
+    records: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[dict]:
+    """
+    Scores transactions in bulk with the fraud detection model.
+    Yields one result per record, in input order.
+    """
+    return _score_batch(
+        records,
+        model_name="fraud_detection",
+        build_features=fraud_feature_matrix,
+        id_field="transaction_id",
+        output_field="fraud_probability",
+        chunk_size=chunk_size,
+    )
+
+
+def score_credit_batch(
+    records: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[dict]:
+    """
+    Scores loan applications in bulk with the credit risk model.
+    Yields one result per record, in input order.
+    """
+    return _score_batch(
+        records,
+        model_name="credit_risk",
+        build_features=credit_feature_matrix,
+        id_field="application_id",
+        output_field="default_probability",
+        chunk_size=chunk_size,
+    )
+
+
+def to_ndjson(
+    results: Iterable[dict], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """Encodes results as NDJSON, emitting one string per chunk of lines."""
+    results = iter(results)
+    while True:
+        chunk = list(islice(results, chunk_size))
+        if not chunk:
+            return
+        yield "".join(json.dumps(result) + "\n" for result in chunk)
+
+
+def _score_batch(
+    records: Iterable[dict],
+    model_name: str,
+    build_features: Callable[[list], object],
+    id_field: str,
+    output_field: str,
+    chunk_size: int,
+) -> Iterator[dict]:
+    # Resolve the model eagerly so a missing model fails before any output
+    # is streamed, and pin one snapshot for the whole batch so a hot-swap
+    # mid-run cannot mix model versions.
+    loaded = model_registry.get(model_name)
+    if loaded is None:
+        raise ModelNotLoadedError(
+            f"Model '{model_name}' not found. Please train it first."
+        )
+    return _iter_scores(
+        loaded, records, build_features, id_field, output_field, chunk_size
+    )
+
+
+def _iter_scores(loaded, records, build_features, id_field, output_field, chunk_size):
+    records = iter(records)
+    offset = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        probabilities = loaded.model.predict_proba(build_features(chunk))[:, 1]
+        for i, (record, probability) in enumerate(zip(chunk, probabilities.tolist())):
+            yield {
+                "index": offset + i,
+                id_field: record.get(id_field),
+                output_field: probability,
+                "model_version": loaded.version,
+            }
+        offset += len(chunk)
@@ -1,36 +1,212 @@
-from langchain_core.tools import tool
-from databricks_langchain import DatabricksVectorSearch, DatabricksEmbeddings
+from langchain_core.documents import Document
+from langchain_core.tools import StructuredTool
 from src.app.config import settings
+from src.app.tools.rag_cache import CachedEmbeddings, EmbeddingCache, ResultCache
+from src.app.tools.hybrid_retrieval import hybrid_search
+from src.app.tools.local_vector_index import load_local_vector_index
+from src.app.tools.ml_models import model_registry
+from src.app.tools.vector_search_pool import VectorSearchPool
+import asyncio
 import json
+import os
 
+TOP_K = 3
+# Local mirrors written by data_processing/sync_vector_index.py, under the
+# model directory so the registry hot-swaps them after each sync.
+LOCAL_INDEX_DIR = "vector_indexes"
 
-@tool
-def query_databricks_vector_search(query: str, index_name: str) -> str:
+# databricks_langchain pulls in mlflow and the Databricks SDK, which take
+# seconds to import, so its classes are imported on first use.
+DatabricksVectorSearch = None
+DatabricksEmbeddings = None
+
+
+def _import_databricks_langchain():
+    global DatabricksVectorSearch, DatabricksEmbeddings
+    import databricks_langchain
+
+    if DatabricksVectorSearch is None:
+        DatabricksVectorSearch = databricks_langchain.DatabricksVectorSearch
+    if DatabricksEmbeddings is None:
+        DatabricksEmbeddings = databricks_langchain.DatabricksEmbeddings
+
+
+embedding_cache = EmbeddingCache(max_entries=settings.RAG_EMBEDDING_CACHE_MAX_ENTRIES)
+result_cache = ResultCache(
+    ttl_seconds=settings.RAG_RESULT_CACHE_TTL_SECONDS,
+    max_entries=settings.RAG_RESULT_CACHE_MAX_ENTRIES,
+)
+
+
+def _create_retriever(index_name: str):
+    """Builds the long-lived retriever the pool keeps for one index."""
+    _import_databricks_langchain()
+    # Indexes with Databricks-managed embeddings embed the query server-side,
+    # which saves the separate round trip to the embedding endpoint.
+    embeddings = None
+    if not settings.VECTOR_SEARCH_MANAGED_EMBEDDINGS:
+        embeddings = CachedEmbeddings(
+            DatabricksEmbeddings(endpoint=settings.VECTOR_SEARCH_EMBEDDING_ENDPOINT),
+            embedding_cache,
+        )
+
+    dvs = DatabricksVectorSearch(
+        endpoint=settings.VECTOR_SEARCH_ENDPOINT,
+        index_name=index_name,
+        embedding=embeddings,
+        client_args={
+            "workspace_url": settings.DATABRICKS_HOST,
+            "personal_access_token": settings.DATABRICKS_TOKEN,
+        },
+    )
+    return dvs.as_retriever(search_kwargs={"k": TOP_K})
+
+
+def local_index_dir(index_name: str) -> str:
+    return os.path.join(model_registry.model_dir, LOCAL_INDEX_DIR, index_name)
+
+
+def _local_index_key(index_name: str) -> str:
+    return f"vector_index:{index_name}"
+
+
+for _index_name in settings.RAG_LOCAL_INDEXES:
+    model_registry.register(
+        _local_index_key(_index_name),
+        os.path.join(LOCAL_INDEX_DIR, _index_name, "meta.json"),
+        loader=load_local_vector_index,
+    )
+
+_query_embeddings = None
+
+
+def _embed_query(query: str):
+    """Embeds a query for the local indexes, through the shared embedding cache."""
+    global _query_embeddings
+    if _query_embeddings is None:
+        _import_databricks_langchain()
+        _query_embeddings = CachedEmbeddings(
+            DatabricksEmbeddings(endpoint=settings.VECTOR_SEARCH_EMBEDDING_ENDPOINT),
+            embedding_cache,
+        )
+    return _query_embeddings.embed_query(query)
+
+
+def _local_index(index_name: str):
     """
-    Queries a Databricks Vector Search index to retrieve relevant context.
-    Input should be a natural language query and the name of the index to search.
-    Returns a JSON string of the retrieved documents.
+    The loaded local mirror of an index, or None when the index is not served
+    locally or has not been synced yet, so the caller falls back to Databricks.
     """
-    try:
-        embeddings = DatabricksEmbeddings(endpoint="databricks-bge-large-en")
+    if index_name not in settings.RAG_LOCAL_INDEXES:
+        return None
+    return model_registry.get(_local_index_key(index_name))
+
 
-        dvs = DatabricksVectorSearch(
-            endpoint=settings.DATABRICKS_HOST,
-            index_name=index_name,
-            embedding=embeddings,
-            databricks_token=settings.DATABRICKS_TOKEN,
+def _cache_version(loaded) -> str:
+    # Results are cached per mirror version, so a sync (run in another
+    # process) retires them without an explicit invalidation.
+    return loaded.version if loaded is not None else ""
+
+
+def _local_search(loaded, query: str):
+    """Searches the local mirror of an index."""
+    if settings.RAG_HYBRID_ENABLED:
+        hits = hybrid_search(
+            loaded.model,
+            query,
+            _embed_query,
+            k=TOP_K,
+            candidates=settings.RAG_HYBRID_CANDIDATES,
+            n_probe=settings.RAG_LOCAL_IVF_PROBES,
+            lambda_mult=settings.RAG_MMR_LAMBDA,
+            dedup_similarity=settings.RAG_DEDUP_SIMILARITY,
         )
+    else:
+        hits = loaded.model.search(
+            _embed_query(query), k=TOP_K, n_probe=settings.RAG_LOCAL_IVF_PROBES
+        )
+    return [
+        Document(page_content=document.get("content", ""), metadata=document)
+        for document, _ in hits
+    ]
+
 
-        retriever = dvs.as_retriever(search_kwargs={"k": 3})
-        results = retriever.invoke(query)
+vector_search_pool = VectorSearchPool(
+    _create_retriever,
+    max_connections=settings.VECTOR_SEARCH_MAX_CONNECTIONS,
+    max_age_seconds=settings.VECTOR_SEARCH_CLIENT_MAX_AGE_SECONDS,
+)
 
-        # Format results for the LLM
-        formatted_results = [
-            {"source": doc.metadata.get("source", "N/A"), "content": doc.page_content}
-            for doc in results
-        ]
-        return json.dumps(formatted_results)
 
+def _format_results(results) -> str:
+    # Format results for the LLM
+    formatted_results = [
+        {"source": doc.metadata.get("source", "N/A"), "content": doc.page_content}
+        for doc in results
+    ]
+    return json.dumps(formatted_results)
+
+
+def _query_databricks_vector_search(query: str, index_name: str) -> str:
+    """
+    Queries a Databricks Vector Search index to retrieve relevant context.
+    Input should be a natural language query and the name of the index to search.
+    Returns a JSON string of the retrieved documents.
+    """
+    loaded = _local_index(index_name)
+    version = _cache_version(loaded)
+    cached = result_cache.get(index_name, query, TOP_K, version)
+    if cached is not None:
+        return cached
+    try:
+        if loaded is not None:
+            results = _local_search(loaded, query)
+        else:
+            results = vector_search_pool.query(index_name, query)
+        result = _format_results(results)
     except Exception as e:
         # In a real gpt_risk, you'd want more specific error handling
         return json.dumps({"error": f"Databricks RAG query failed: {str(e)}"})
+    result_cache.put(index_name, query, TOP_K, result, version)
+    return result
+
+
+async def _aquery_databricks_vector_search(query: str, index_name: str) -> str:
+    loaded = _local_index(index_name)
+    version = _cache_version(loaded)
+    cached = result_cache.get(index_name, query, TOP_K, version)
+    if cached is not None:
+        return cached
+    try:
+        if loaded is not None:
+            results = await asyncio.to_thread(_local_search, loaded, query)
+        else:
+            results = await vector_search_pool.aquery(index_name, query)
+        result = _format_results(results)
+    except Exception as e:
+        return json.dumps({"error": f"Databricks RAG query failed: {str(e)}"})
+    result_cache.put(index_name, query, TOP_K, result, version)
+    return result
+
+
+def invalidate_index(index_name: str = None) -> int:
+    """
+    Call after an index is refreshed: drops its cached results (all indexes
+    when `index_name` is None) and returns how many were dropped. Cached
+    embeddings stay valid since they depend only on the embedding model.
+    """
+    return result_cache.invalidate(index_name)
+
+
+def cache_stats() -> dict:
+    return {"embeddings": embedding_cache.stats(), "results": result_cache.stats()}
+
+
+# Indexes listed in RAG_LOCAL_INDEXES are served from their local mirror;
+# the rest, and any local index not synced yet, go to Databricks through the
+# pooled client for the index.
+query_databricks_vector_search = StructuredTool.from_function(
+    func=_query_databricks_vector_search,
+    coroutine=_aquery_databricks_vector_search,
+    name="query_databricks_vector_search",
+)
@@ -0,0 +1,89 @@
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+# The usual RRF constant; it damps the weight of the very top ranks.
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: List[Sequence[int]], k: int = RRF_K
+) -> List[Tuple[int, float]]:
+    """
+    Fuses several rankings of the same rows: each row scores the sum of
+    1 / (k + rank) over the rankings it appears in. Returns (row, score)
+    pairs, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            scores[int(row)] = scores.get(int(row), 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def maximal_marginal_relevance(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.7,
+    dedup_similarity: float = 0.95,
+) -> List[int]:
+    """
+    Picks up to `k` of the candidates, trading relevance against similarity
+    to those already picked. Candidates whose cosine similarity to a picked
+    one reaches `dedup_similarity` are dropped as near-duplicates, so fewer
+    than `k` may be returned. `vectors` must be L2-normalized.
+    """
+    if len(relevance) == 0:
+        return []
+    relevance = relevance / max(float(relevance.max()), 1e-12)
+    similarity = vectors @ vectors.T
+    max_similarity = np.zeros(len(relevance), dtype=np.float32)
+    available = np.ones(len(relevance), dtype=bool)
+    selected = []
+    while len(selected) < k and available.any():
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+        available &= similarity[best] < dedup_similarity
+    return selected
+
+
+def hybrid_search(
+    index,
+    query: str,
+    embed_query: Callable[[str], list],
+    k: int = 3,
+    candidates: int = 20,
+    n_probe: int = 8,
+    lambda_mult: float = 0.7,
+    dedup_similarity: float = 0.95,
+) -> List[Tuple[dict, float]]:
+    """
+    Hybrid retrieval over a `LocalVectorIndex`: exact-ID matches, BM25 and
+    dense results are fused with RRF, then diversified with MMR.
+
+    When the identifiers in the query alone match at least `k` documents,
+    the dense ranking is skipped, saving the query-embedding round trip.
+    """
+    lexical = index.lexical
+    id_rows = lexical.id_matches(query)[:candidates]
+    bm25_rows, _ = lexical.search(query, candidates)
+    rankings = [id_rows, bm25_rows]
+    if len(id_rows) < k:
+        dense_rows, _ = index.search_rows(embed_query(query), candidates, n_probe)
+        rankings.append(dense_rows)
+
+    fused = reciprocal_rank_fusion(rankings)[:candidates]
+    if not fused:
+        return []
+    rows = np.asarray([row for row, _ in fused])
+    relevance = np.asarray([score for _, score in fused], dtype=np.float32)
+    vectors = np.asarray(index.vectors[rows], dtype=np.float32)
+    picked = maximal_marginal_relevance(
+        vectors, relevance, k, lambda_mult, dedup_similarity
+    )
+    return [(index.documents[rows[i]], float(relevance[i])) for i in picked]
@@ -0,0 +1,145 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from src.app import metrics
+
+EXECUTOR_MODES = ("thread", "process")
+
+inference_latency_histogram = metrics.histogram(
+    "ml_inference_latency_seconds",
+    "Time from submitting a scoring call to the executor until its result.",
+    labelnames=("mode",),
+)
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound model scoring off the event loop.
+
+    In "thread" mode calls run on a thread pool; XGBoost and scikit-learn
+    release the GIL inside predict, so the loop keeps serving other requests.
+    In "process" mode calls run on a process pool whose workers each preload
+    the models via `worker_initializer`, which isolates the event loop from
+    pure-Python work as well. Functions submitted in process mode must be
+    importable at module level.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = None,
+        worker_initializer: Callable = None,
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown inference executor mode '{mode}'.")
+        self.mode = mode
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.worker_initializer = worker_initializer
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+        self._started_at = None
+
+    async def run(self, fn: Callable, *args):
+        """Runs `fn(*args)` on the pool and awaits its result."""
+        pool = self._ensure_pool()
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            self._submitted += 1
+        submitted_at = time.perf_counter()
+        try:
+            result, busy_seconds = await loop.run_in_executor(
+                pool, _timed_call, fn, *args
+            )
+        except Exception:
+            with self._stats_lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self._completed += 1
+        with self._stats_lock:
+            self._busy_seconds += busy_seconds
+        inference_latency_histogram.observe(
+            time.perf_counter() - submitted_at, mode=self.mode
+        )
+        return result
+
+    def start(self):
+        """Creates the pool and, in process mode, spawns and warms every worker."""
+        pool = self._ensure_pool()
+        if self.mode == "process":
+            warmups = [pool.submit(_noop) for _ in range(self.max_workers)]
+            for warmup in warmups:
+                warmup.result()
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> dict:
+        """Reports queue depth and worker utilization since the pool started."""
+        labels = {"mode": self.mode}
+        with self._stats_lock:
+            in_flight = self._submitted - self._completed
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            capacity = elapsed * self.max_workers
+            utilization = self._busy_seconds / capacity if capacity else 0.0
+            return {
+                "mode": self.mode,
+                "workers": self.max_workers,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.max_workers),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "busy_seconds": round(self._busy_seconds, 6),
+                "utilization": round(utilization, 4),
+                "latency_p50_ms": inference_latency_histogram.quantile(0.5, **labels)
+                * 1e3,
+                "latency_p99_ms": inference_latency_histogram.quantile(0.99, **labels)
+                * 1e3,
+            }
+
+    def _ensure_pool(self):
+        if self._pool is not None:
+            return self._pool
+        with self._pool_lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    # Spawn rather than fork: the parent runs watcher and
+                    # batcher threads that must not be copied mid-operation.
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=self.worker_initializer,
+                    )
+                else:
+                    # Threads share the parent's already-loaded models.
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="inference"
+                    )
+                self._started_at = time.monotonic()
+            return self._pool
+
+
+def _timed_call(fn: Callable, *args):
+    """Runs in the worker and reports how long the worker was busy."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _noop():
+    return None
@@ -0,0 +1,90 @@
+import re
+from collections import Counter, defaultdict
+from typing import List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Merchant, customer and transaction IDs and MCC codes all contain digits;
+# such tokens also get exact-match postings.
+ID_TOKEN_PATTERN = re.compile(r"^(?=.*\d)[a-z0-9]{3,}$")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def id_tokens(text: str) -> List[str]:
+    return [token for token in tokenize(text) if ID_TOKEN_PATTERN.match(token)]
+
+
+class BM25Index:
+    """
+    An in-memory BM25 inverted index over document texts.
+
+    Each term's postings are a pair of NumPy arrays (document rows, term
+    frequencies), so scoring a query is one vectorized update per query term.
+    Identifier-like terms are additionally kept in exact-match postings, used
+    to answer ID lookups without any ranking model.
+    """
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_documents = len(texts)
+        self.lengths = np.zeros(len(texts), dtype=np.float32)
+        postings = defaultdict(dict)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            self.lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                postings[term][row] = count
+
+        self.average_length = float(self.lengths.mean()) if len(texts) else 0.0
+        self._postings = {}
+        self._idf = {}
+        for term, rows in postings.items():
+            self._postings[term] = (
+                np.fromiter(rows.keys(), dtype=np.int64, count=len(rows)),
+                np.fromiter(rows.values(), dtype=np.float32, count=len(rows)),
+            )
+            df = len(rows)
+            self._idf[term] = float(
+                np.log(1 + (self.n_documents - df + 0.5) / (df + 0.5))
+            )
+        self._id_terms = {term for term in postings if ID_TOKEN_PATTERN.match(term)}
+
+    @classmethod
+    def from_documents(cls, documents: List[dict], field: str = "content"):
+        return cls([document.get(field) or "" for document in documents])
+
+    def search(self, query: str, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the rows and BM25 scores of the `k` best-matching documents."""
+        scores = np.zeros(self.n_documents, dtype=np.float32)
+        length_norm = self.k1 * (
+            1 - self.b + self.b * self.lengths / max(self.average_length, 1e-9)
+        )
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            rows, tf = self._postings[term]
+            scores[rows] += (
+                self._idf[term] * tf * (self.k1 + 1) / (tf + length_norm[rows])
+            )
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        order = np.argsort(-scores[matched], kind="stable")
+        return matched[order], scores[matched[order]]
+
+    def id_matches(self, query: str) -> np.ndarray:
+        """
+        Rows containing the identifiers in `query`, those matching the most
+        identifiers first. Empty when the query has no known identifier.
+        """
+        terms = [term for term in set(id_tokens(query)) if term in self._id_terms]
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate([self._postings[term][0] for term in terms])
+        unique, counts = np.unique(rows, return_counts=True)
+        return unique[np.argsort(-counts, kind="stable")]
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+from functools import cached_property
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.app.tools.lexical_index import BM25Index
+
+META_FILENAME = "meta.json"
+DOCUMENTS_FILENAME = "documents.jsonl"
+
+# Below this many rows one exact matrix-vector product beats probing lists.
+IVF_MIN_ROWS = 20_000
+KMEANS_SAMPLE_ROWS = 50_000
+KMEANS_ITERATIONS = 10
+# Scores are computed in row chunks to bound the temporary arrays.
+SEARCH_CHUNK_ROWS = 65_536
+
+
+class LocalVectorIndex:
+    """
+    A read-only local mirror of a vector search index.
+
+    Embeddings are L2-normalized float32 rows in a memory-mapped .npy file, so
+    cosine similarity is a dot product and only the pages a query touches are
+    read. Large indexes also carry an IVF coarse quantizer: rows are stored
+    grouped by their nearest centroid, and a query scans only the `n_probe`
+    lists whose centroids are closest to it.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        documents: List[dict],
+        meta: dict,
+        centroids: np.ndarray = None,
+        list_offsets: np.ndarray = None,
+    ):
+        self.vectors = vectors
+        self.documents = documents
+        self.meta = meta
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "LocalVectorIndex":
+        with open(os.path.join(directory, META_FILENAME)) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mode)
+        with open(os.path.join(directory, DOCUMENTS_FILENAME)) as f:
+            documents = [json.loads(line) for line in f]
+        centroids = list_offsets = None
+        if meta.get("n_lists"):
+            centroids = np.load(os.path.join(directory, "centroids.npy"))
+            list_offsets = np.load(os.path.join(directory, "list_offsets.npy"))
+        return cls(vectors, documents, meta, centroids, list_offsets)
+
+    @property
+    def size(self) -> int:
+        return len(self.documents)
+
+    @cached_property
+    def lexical(self) -> BM25Index:
+        """BM25 index over the document contents, for hybrid retrieval."""
+        return BM25Index.from_documents(self.documents)
+
+    def search(
+        self, query_vector, k: int = 3, n_probe: int = 8
+    ) -> List[Tuple[dict, float]]:
+        """Returns the `k` most similar documents with their cosine similarity."""
+        rows, scores = self.search_rows(query_vector, k, n_probe)
+        return [(self.documents[row], float(score)) for row, score in zip(rows, scores)]
+
+    def search_rows(self, query_vector, k: int = 3, n_probe: int = 8):
+        """Like `search`, but returns the matching rows and their scores."""
+        if self.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = _normalize(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+        if self.centroids is None:
+            rows = np.arange(self.size)
+            scores = self._scores(0, self.size, query)
+        else:
+            rows, scores = self._probe(query, n_probe)
+        k = min(k, len(scores))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    def _scores(self, start: int, stop: int, query: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [
+                self.vectors[i : min(i + SEARCH_CHUNK_ROWS, stop)] @ query
+                for i in range(start, stop, SEARCH_CHUNK_ROWS)
+            ]
+            or [np.empty(0, dtype=np.float32)]
+        )
+
+    def _probe(self, query: np.ndarray, n_probe: int):
+        n_probe = min(n_probe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        rows, scores = [], []
+        for list_id in lists:
+            start, stop = self.list_offsets[list_id], self.list_offsets[list_id + 1]
+            if stop > start:
+                rows.append(np.arange(start, stop))
+                scores.append(self._scores(start, stop, query))
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(rows), np.concatenate(scores)
+
+
+def load_local_vector_index(meta_path: str) -> LocalVectorIndex:
+    """Registry loader: takes the path of an index's meta.json."""
+    index = LocalVectorIndex.load(os.path.dirname(meta_path))
+    index.lexical  # Build the BM25 index before the mirror is swapped in.
+    return index
+
+
+def content_hash(document: dict) -> str:
+    """Fingerprint used by delta syncs to skip unchanged documents."""
+    payload = json.dumps(document, sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+# --- Writing ---
+
+
+def write_local_vector_index(
+    directory: str,
+    documents: List[dict],
+    vectors,
+    n_lists: Optional[int] = None,
+    centroids: np.ndarray = None,
+    trained_size: int = 0,
+) -> LocalVectorIndex:
+    """
+    Writes a complete index. Each document needs an "id"; the rest of its
+    fields (content, source, ...) are returned as-is by `search`.
+
+    An IVF quantizer is trained when there are at least IVF_MIN_ROWS rows
+    (with about sqrt(rows) lists unless `n_lists` is given); pass existing
+    `centroids` (trained on `trained_size` rows) to reuse them instead.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = _normalize(vectors.reshape(len(documents), -1 if len(documents) else 0))
+    if centroids is None and (n_lists or len(documents) >= IVF_MIN_ROWS):
+        n_lists = n_lists or int(np.sqrt(len(documents)))
+        centroids = _train_centroids(vectors, n_lists)
+        trained_size = len(documents)
+
+    list_offsets = None
+    if centroids is not None:
+        assignments = _assign(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        vectors = vectors[order]
+        documents = [documents[i] for i in order]
+        list_offsets = np.searchsorted(
+            assignments[order], np.arange(len(centroids) + 1)
+        ).astype(np.int64)
+
+    meta = {
+        "dimension": int(vectors.shape[1]) if len(vectors) else 0,
+        "size": len(documents),
+        "n_lists": 0 if centroids is None else len(centroids),
+        "trained_size": 0 if centroids is None else trained_size,
+        # Bumped on every write, so meta.json changes (and the registry
+        # reloads) even when a sync leaves the document count as it was.
+        "generation": _read_generation(directory) + 1,
+    }
+    os.makedirs(directory, exist_ok=True)
+    _save_array(directory, "vectors.npy", vectors)
+    if centroids is not None:
+        _save_array(directory, "centroids.npy", centroids.astype(np.float32))
+        _save_array(directory, "list_offsets.npy", list_offsets)
+    tmp_path = os.path.join(directory, DOCUMENTS_FILENAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        for document in documents:
+            f.write(json.dumps(document) + "\n")
+    os.replace(tmp_path, os.path.join(directory, DOCUMENTS_FILENAME))
+    # meta.json is written last and atomically; the model registry watches it
+    # to hot-swap a freshly synced index.
+    _write_meta(directory, meta)
+    return LocalVectorIndex.load(directory)
+
+
+def sync_local_vector_index(
+    directory: str,
+    upserts: Iterable[Tuple[dict, list]] = (),
+    deleted_ids: Iterable[str] = (),
+) -> LocalVectorIndex:
+    """
+    Applies a delta to an existing index (or creates it): `upserts` are
+    (document, vector) pairs replacing any document with the same id, and
+    `deleted_ids` are removed. Existing centroids are reused until the index
+    has doubled since they were trained, then the quantizer is retrained.
+    """
+    upserts = list(upserts)
+    deleted = set(deleted_ids)
+    deleted.update(document["id"] for document, _ in upserts)
+
+    documents = [document for document, _ in upserts]
+    vectors = np.asarray([vector for _, vector in upserts], dtype=np.float32)
+    centroids, trained_size = None, 0
+    if os.path.exists(os.path.join(directory, META_FILENAME)):
+        current = LocalVectorIndex.load(directory, mmap=False)
+        keep = [
+            i for i, doc in enumerate(current.documents) if doc["id"] not in deleted
+        ]
+        documents = [current.documents[i] for i in keep] + documents
+        if len(vectors):
+            vectors = np.vstack([current.vectors[keep], vectors])
+        else:
+            vectors = current.vectors[keep]
+        centroids = current.centroids
+        trained_size = current.meta.get("trained_size", 0)
+
+    if centroids is not None and len(documents) > 2 * trained_size:
+        centroids = None
+    return write_local_vector_index(
+        directory, documents, vectors, centroids=centroids, trained_size=trained_size
+    )
+
+
+def _read_generation(directory: str) -> int:
+    try:
+        with open(os.path.join(directory, META_FILENAME)) as f:
+            return int(json.load(f).get("generation", 0))
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_meta(directory: str, meta: dict):
+    tmp_path = os.path.join(directory, META_FILENAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, META_FILENAME))
+
+
+def _save_array(directory: str, filename: str, array: np.ndarray):
+    # Replace rather than overwrite: readers may still have the old file
+    # memory-mapped, and a new inode leaves their view intact.
+    tmp_path = os.path.join(directory, filename + ".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, os.path.join(directory, filename))
+
+
+# --- Quantizer ---
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for i in range(0, len(vectors), SEARCH_CHUNK_ROWS):
+        chunk = vectors[i : i + SEARCH_CHUNK_ROWS]
+        assignments[i : i + len(chunk)] = (chunk @ centroids.T).argmax(axis=1)
+    return assignments
+
+
+def _train_centroids(vectors: np.ndarray, n_lists: int) -> np.ndarray:
+    """Spherical k-means on a sample of the rows."""
+    rng = np.random.default_rng(0)
+    n_lists = max(1, min(n_lists, len(vectors)))
+    sample = vectors
+    if len(vectors) > KMEANS_SAMPLE_ROWS:
+        sample = vectors[rng.choice(len(vectors), KMEANS_SAMPLE_ROWS, replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignments = _assign(sample, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        # Empty lists keep their previous centroid.
+        sums = centroids.copy()
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+        centroids = _normalize(sums)
+    return centroids
@@ -0,0 +1,198 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Sequence
+
+from src.app import metrics
+
+batch_size_histogram = metrics.histogram(
+    "ml_micro_batch_size",
+    "Number of rows scored together by the micro-batcher.",
+    buckets=metrics.SIZE_BUCKETS,
+    labelnames=("model",),
+)
+queue_delay_histogram = metrics.histogram(
+    "ml_micro_batch_queue_delay_seconds",
+    "Time a scoring request waited in the micro-batcher before its batch ran.",
+    labelnames=("model",),
+)
+
+
+class _Pending:
+    __slots__ = ("record", "model", "future", "enqueued_at")
+
+    def __init__(self, record: dict, model: object):
+        self.record = record
+        self.model = model
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row scoring requests into vectorized calls.
+
+    Requests are collected for up to `window_ms` after the first one arrives,
+    or until `max_batch_rows` are waiting, then scored with one call to
+    `predict_fn(model, records)`. Requests are grouped by the model snapshot
+    they were submitted with, so a hot-swap never changes an in-flight request's
+    model.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        predict_fn: Callable[[object, list], Sequence],
+        window_ms: float = 2.0,
+        max_batch_rows: int = 256,
+    ):
+        self.name = name
+        self.predict_fn = predict_fn
+        self.window_seconds = window_ms / 1000
+        self.max_batch_rows = max_batch_rows
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, record: dict, model: object) -> Future:
+        """Queues one record for scoring and returns a future for its result."""
+        self._ensure_started()
+        pending = _Pending(record, model)
+        self._queue.put(pending)
+        return pending.future
+
+    async def asubmit(self, record: dict, model: object):
+        """Awaitable variant of `submit`."""
+        return await asyncio.wrap_future(self.submit(record, model))
+
+    def stop(self):
+        """Stops the worker after the queued requests have been scored."""
+        with self._start_lock:
+            if self._worker is not None:
+                self._queue.put(None)
+                self._worker.join(timeout=5)
+                if not self._worker.is_alive():
+                    self._drain()
+                self._worker = None
+
+    def _drain(self):
+        # Requests queued behind the stop sentinel are scored here, in
+        # batches, instead of being left unresolved.
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                batch.append(item)
+            if len(batch) == self.max_batch_rows:
+                self._score(batch)
+                batch = []
+        if batch:
+            self._score(batch)
+
+    def stats(self) -> dict:
+        """Reports queue depth plus batch-size and queue-delay percentiles."""
+        labels = {"model": self.name}
+        _, batches, rows = batch_size_histogram.samples().get(
+            (self.name,), (None, 0, 0.0)
+        )
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": batches,
+            "rows": int(rows),
+            "batch_size_p50": batch_size_histogram.quantile(0.5, **labels),
+            "batch_size_p99": batch_size_histogram.quantile(0.99, **labels),
+            "queue_delay_p50_ms": queue_delay_histogram.quantile(0.5, **labels) * 1e3,
+            "queue_delay_p99_ms": queue_delay_histogram.quantile(0.99, **labels) * 1e3,
+        }
+
+    def _ensure_started(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            # A worker that died is replaced, so queued requests never hang.
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"micro-batcher-{self.name}", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first.enqueued_at + self.window_seconds
+            stopping = False
+            while len(batch) < self.max_batch_rows:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        # Past the window, still take everything already
+                        # queued; under load the worker may wake up late.
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._score(batch)
+            if stopping:
+                return
+
+    def _score(self, batch: list):
+        started = time.perf_counter()
+        # Callers that gave up (e.g. a tool timeout cancelling the awaiting
+        # task) are dropped; the rest can no longer be cancelled.
+        batch = [
+            pending
+            for pending in batch
+            if pending.future.set_running_or_notify_cancel()
+        ]
+        groups = {}
+        for pending in batch:
+            groups.setdefault(id(pending.model), []).append(pending)
+            queue_delay_histogram.observe(
+                started - pending.enqueued_at, model=self.name
+            )
+
+        for group in groups.values():
+            batch_size_histogram.observe(len(group), model=self.name)
+            try:
+                results = list(
+                    self.predict_fn(
+                        group[0].model, [pending.record for pending in group]
+                    )
+                )
+            except Exception as e:
+                for pending in group:
+                    _resolve(pending.future, error=e)
+                continue
+            for pending, result in zip(group, results):
+                _resolve(pending.future, result=result)
+            if len(results) < len(group):
+                error = ValueError(
+                    f"{self.name} returned {len(results)} results "
+                    f"for {len(group)} records."
+                )
+                for pending in group[len(results) :]:
+                    _resolve(pending.future, error=error)
+
+
+def _resolve(future: Future, result=None, error: Exception = None):
+    # A future already resolved must not raise in, and kill, the worker.
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
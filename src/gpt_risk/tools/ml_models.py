@@ -1,83 +1,248 @@
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 import joblib
-import pandas as pd
+import numpy as np
 import json
 import os
+from src.app.tools.model_registry import ModelRegistry
+from src.app.tools.micro_batcher import MicroBatcher
+from src.app.tools.inference_executor import InferenceExecutor
+from src.app.tools.tree_ensemble import load_compiled_ensemble
+from src.app.config import settings
+from src.app.features import (
+    CREDIT_FEATURE_SPEC,
+    CREDIT_FEATURES,
+    FRAUD_FEATURE_SPEC,
+    FRAUD_FEATURES,
+)
 
 MODEL_DIR = "models"
 
+# Models are loaded once and kept in memory; see `ModelRegistry`.
+model_registry = ModelRegistry(MODEL_DIR)
 
-@tool
-def run_fraud_detection_model(transaction_data: dict) -> str:
+
+def _verified_loader(spec, load=joblib.load):
+    # A model trained on another feature spec fails to load, so the registry
+    # keeps serving the current version instead of skewed predictions.
+    return lambda path: spec.verify(load(path))
+
+
+if settings.FRAUD_MODEL_BACKEND == "compiled":
+    # Trees exported by data_processing/export_fraud_trees.py, scored with NumPy.
+    model_registry.register(
+        "fraud_detection",
+        os.path.join("fraud_detection_trees", "meta.json"),
+        loader=_verified_loader(FRAUD_FEATURE_SPEC, load_compiled_ensemble),
+    )
+else:
+    model_registry.register(
+        "fraud_detection",
+        "fraud_detection_model.joblib",
+        loader=_verified_loader(FRAUD_FEATURE_SPEC),
+    )
+model_registry.register(
+    "credit_risk",
+    "credit_risk_model.joblib",
+    loader=_verified_loader(CREDIT_FEATURE_SPEC),
+)
+
+
+# --- Feature Matrices ---
+# Shared by the single-row tools and the batch scoring path. Both use the
+# feature specs from `features.py`, the same ones the training scripts use.
+
+
+def fraud_feature_matrix(records: list) -> np.ndarray:
+    """Encodes transactions into the fraud model's feature matrix, one row each."""
+    return FRAUD_FEATURES.transform(records)
+
+
+def credit_feature_matrix(records: list) -> np.ndarray:
+    """Encodes loan applications into the credit model's feature matrix, one row each."""
+    return CREDIT_FEATURES.transform(records)
+
+
+# --- Scoring ---
+
+
+def _predict_fraud(loaded, records: list) -> list:
+    """Scores a list of transactions with one vectorized predict_proba call."""
+    return loaded.model.predict_proba(fraud_feature_matrix(records))[:, 1].tolist()
+
+
+def _predict_credit(loaded, records: list) -> list:
+    """Scores a list of loan applications with one vectorized predict_proba call."""
+    return loaded.model.predict_proba(credit_feature_matrix(records))[:, 1].tolist()
+
+
+# Concurrent tool calls are coalesced into a single predict_proba per window.
+fraud_batcher = MicroBatcher(
+    "fraud_detection",
+    _predict_fraud,
+    window_ms=settings.MICRO_BATCH_WINDOW_MS,
+    max_batch_rows=settings.MICRO_BATCH_MAX_ROWS,
+)
+credit_batcher = MicroBatcher(
+    "credit_risk",
+    _predict_credit,
+    window_ms=settings.MICRO_BATCH_WINDOW_MS,
+    max_batch_rows=settings.MICRO_BATCH_MAX_ROWS,
+)
+
+
+def score_fraud(loaded, transaction_data: dict) -> float:
+    """Scores one transaction, through the micro-batcher when it is enabled."""
+    if settings.MICRO_BATCH_ENABLED:
+        return fraud_batcher.submit(transaction_data, loaded).result()
+    return _predict_fraud(loaded, [transaction_data])[0]
+
+
+def score_credit(loaded, loan_application_data: dict) -> float:
+    """Scores one loan application, through the micro-batcher when it is enabled."""
+    if settings.MICRO_BATCH_ENABLED:
+        return credit_batcher.submit(loan_application_data, loaded).result()
+    return _predict_credit(loaded, [loan_application_data])[0]
+
+
+# --- Async Offload ---
+
+_PREDICTORS = {"fraud_detection": _predict_fraud, "credit_risk": _predict_credit}
+_BATCHERS = {"fraud_detection": fraud_batcher, "credit_risk": credit_batcher}
+
+
+def _init_inference_worker():
+    """Preloads the models once in each process-pool worker."""
+    model_registry.preload()
+    model_registry.start_watching(settings.MODEL_WATCH_INTERVAL_SECONDS)
+
+
+def _score_in_worker(model_name: str, record: dict):
+    # A worker scores one call at a time, so it skips the micro-batch window.
+    loaded = model_registry.get(model_name)
+    if loaded is None:
+        return None
+    return _PREDICTORS[model_name](loaded, [record])[0], loaded.version
+
+
+inference_executor = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+    worker_initializer=_init_inference_worker,
+)
+
+
+async def ascore(model_name: str, record: dict):
+    """
+    Scores one record on the inference executor without blocking the event loop.
+    Returns (probability, model_version), or None if the model is not trained.
+    """
+    if inference_executor.mode == "process":
+        return await inference_executor.run(_score_in_worker, model_name, record)
+    loaded = model_registry.get(model_name)
+    if loaded is None:
+        return None
+    if settings.MICRO_BATCH_ENABLED:
+        # The batcher already scores on its own thread; awaiting its future
+        # directly lets concurrent callers share one predict_proba.
+        probability = await _BATCHERS[model_name].asubmit(record, loaded)
+    else:
+        probability = (
+            await inference_executor.run(_PREDICTORS[model_name], loaded, [record])
+        )[0]
+    return probability, loaded.version
+
+
+# --- Tools ---
+
+FRAUD_MODEL_NOT_FOUND = "Fraud detection model not found. Please train it first."
+CREDIT_MODEL_NOT_FOUND = "Credit risk model not found. Please train it first."
+
+
+def _fraud_result(probability: float, version: str) -> str:
+    return json.dumps(
+        {
+            "fraud_probability": float(probability),
+            "contributing_features": [
+                "transaction_amount",
+                "merchant_category",
+            ],  # Placeholder
+            "model_version": version,
+        }
+    )
+
+
+def _credit_result(probability: float, version: str) -> str:
+    return json.dumps(
+        {
+            "default_probability": float(probability),
+            "model_version": version,
+        }
+    )
+
+
+def _run_fraud_detection_model(transaction_data: dict) -> str:
     """
     Analyzes a transaction using a pre-trained XGBoost model to predict the probability of fraud.
     Input should be a dictionary representing the transaction.
     Returns a JSON string with the fraud probability and key contributing features.
     """
-    model_path = os.path.join(MODEL_DIR, "fraud_detection_model.joblib")
-    if not os.path.exists(model_path):
-        return json.dumps(
-            {"error": "Fraud detection model not found. Please train it first."}
-        )
+    loaded = model_registry.get("fraud_detection")
+    if loaded is None:
+        return json.dumps({"error": FRAUD_MODEL_NOT_FOUND})
+
+    try:
+        # Features are encoded straight from the dict by the compiled spec.
+        probability = score_fraud(loaded, transaction_data)
+        return _fraud_result(probability, loaded.version)
+    except Exception as e:
+        return json.dumps({"error": f"Model inference failed: {str(e)}"})
+
 
+async def _arun_fraud_detection_model(transaction_data: dict) -> str:
     try:
-        model = joblib.load(model_path)
-
-        # In a real application, you would preprocess the input_data dictionary
-        # into the format the model expects (e.g., a Pandas DataFrame).
-        # For this example, we'll use a placeholder.
-        # Assuming the model expects a DataFrame with a single row.
-        data_for_prediction = pd.DataFrame([transaction_data])
-
-        # Mock preprocessing
-        if "transaction_amount" in data_for_prediction.columns:
-            data_for_prediction["amount_log"] = pd.np.log1p(
-                data_for_prediction["transaction_amount"]
-            )
-        # ... add other feature engineering steps as used in training...
-
-        # For this dummy model, we'll just create a dummy feature.
-        dummy_features = pd.DataFrame([[0.5, 1]], columns=["feature1", "feature2"])
-
-        probability = model.predict_proba(dummy_features)[:, 1]
-
-        return json.dumps(
-            {
-                "fraud_probability": float(probability),
-                "contributing_features": [
-                    "transaction_amount",
-                    "merchant_category",
-                ],  # Placeholder
-            }
-        )
+        result = await ascore("fraud_detection", transaction_data)
     except Exception as e:
         return json.dumps({"error": f"Model inference failed: {str(e)}"})
+    if result is None:
+        return json.dumps({"error": FRAUD_MODEL_NOT_FOUND})
+    return _fraud_result(*result)
 
 
-@tool
-def run_credit_risk_model(loan_application_data: dict) -> str:
+def _run_credit_risk_model(loan_application_data: dict) -> str:
     """
     Analyzes a loan application using a pre-trained Logistic Regression model to predict the probability of default.
     Input should be a dictionary representing the loan application.
     Returns a JSON string with the default probability.
     """
-    model_path = os.path.join(MODEL_DIR, "credit_risk_model.joblib")
-    if not os.path.exists(model_path):
-        return json.dumps(
-            {"error": "Credit risk model not found. Please train it first."}
-        )
+    loaded = model_registry.get("credit_risk")
+    if loaded is None:
+        return json.dumps({"error": CREDIT_MODEL_NOT_FOUND})
 
     try:
-        model = joblib.load(model_path)
-
-        # Similar to the fraud model, preprocess the input data here.
-        data_for_prediction = pd.DataFrame([loan_application_data])
-
-        # Mock preprocessing for the dummy model
-        dummy_features = pd.DataFrame([[0.8, 0.2]], columns=[])
+        probability = score_credit(loaded, loan_application_data)
+        return _credit_result(probability, loaded.version)
+    except Exception as e:
+        return json.dumps({"error": f"Model inference failed: {str(e)}"})
 
-        probability = model.predict_proba(dummy_features)[:, 1]
 
-        return json.dumps({"default_probability": float(probability)})
+async def _arun_credit_risk_model(loan_application_data: dict) -> str:
+    try:
+        result = await ascore("credit_risk", loan_application_data)
     except Exception as e:
         return json.dumps({"error": f"Model inference failed: {str(e)}"})
+    if result is None:
+        return json.dumps({"error": CREDIT_MODEL_NOT_FOUND})
+    return _credit_result(*result)
+
+
+# `ainvoke` on these tools offloads scoring to the inference executor.
+run_fraud_detection_model = StructuredTool.from_function(
+    func=_run_fraud_detection_model,
+    coroutine=_arun_fraud_detection_model,
+    name="run_fraud_detection_model",
+)
+run_credit_risk_model = StructuredTool.from_function(
+    func=_run_credit_risk_model,
+    coroutine=_arun_credit_risk_model,
+    name="run_credit_risk_model",
+)
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import joblib
+import numpy as np
+
+from src.app import metrics
+
+load_failures_counter = metrics.counter(
+    "model_load_failures_total",
+    "Model files that failed to load, by model and error type.",
+    labelnames=("model", "error"),
+)
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    An immutable snapshot of a model held by the registry.
+    Callers keep a reference to the snapshot for the duration of a request,
+    so a hot-swap never changes the model underneath an in-flight prediction.
+    """
+
+    name: str
+    version: str
+    model: object
+    path: str
+    mtime_ns: int
+    size_bytes: int
+    load_time_ms: float
+    memory_bytes: int
+    loaded_at: float
+
+
+class ModelRegistry:
+    """
+    Loads each registered model once, keeps it in memory under a name and
+    version, and atomically swaps in a new version when its file changes.
+    """
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        self._files: Dict[str, str] = {}
+        self._loaders: Dict[str, Callable[[str], object]] = {}
+        self._models: Dict[str, LoadedModel] = {}
+        # (mtime_ns, size) of each file that failed to load, so it is only
+        # retried once it changes.
+        self._failed: Dict[str, tuple] = {}
+        self._load_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def register(self, name: str, filename: str, loader: Callable = None):
+        """Registers a model file (relative to the model directory) under a name."""
+        self._files[name] = filename
+        self._loaders[name] = loader or joblib.load
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.model_dir, self._files[name])
+
+    def get(self, name: str) -> Optional[LoadedModel]:
+        """
+        Returns the current snapshot for a model, loading it on first use.
+        Returns None if the model has never been loaded and its file is
+        missing or fails to load.
+        """
+        loaded = self._models.get(name)
+        if loaded is not None:
+            return loaded
+        return self._load(name)
+
+    def preload(self) -> Dict[str, LoadedModel]:
+        """Loads every registered model whose file exists. Intended for startup."""
+        for name in self._files:
+            self._load(name)
+        return dict(self._models)
+
+    def refresh(self, name: str = None) -> list:
+        """
+        Checks the model files for changes and swaps in new versions.
+        Returns the names of the models that were reloaded.
+        """
+        names = [name] if name else list(self._files)
+        return [n for n in names if self._reload_if_changed(n)]
+
+    def stats(self) -> dict:
+        """Reports version, load time and memory footprint for each loaded model."""
+        return {
+            name: {
+                "version": loaded.version,
+                "path": loaded.path,
+                "size_bytes": loaded.size_bytes,
+                "memory_bytes": loaded.memory_bytes,
+                "load_time_ms": round(loaded.load_time_ms, 3),
+                "loaded_at": loaded.loaded_at,
+            }
+            for name, loaded in self._models.items()
+        }
+
+    def clear(self):
+        """Drops all loaded models. The next `get` reloads from disk."""
+        with self._load_lock:
+            self._models = {}
+
+    # --- File Watching ---
+
+    def start_watching(self, interval_seconds: float = 2.0):
+        """Starts a daemon thread that polls the model files for changes."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_event.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval_seconds,), daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self, interval_seconds: float):
+        while not self._stop_event.wait(interval_seconds):
+            try:
+                self.refresh()
+            except Exception:
+                # A half-written file or a failing loader must not kill the
+                # watcher; the current version stays in service.
+                continue
+
+    # --- Loading ---
+
+    def _reload_if_changed(self, name: str) -> bool:
+        current = self._models.get(name)
+        try:
+            stat = os.stat(self.path_for(name))
+        except FileNotFoundError:
+            return False
+        if current is not None and (stat.st_mtime_ns, stat.st_size) == (
+            current.mtime_ns,
+            current.size_bytes,
+        ):
+            return False
+        # mtime/size changed; only swap if the content actually differs.
+        if current is not None and _file_digest(current.path) == current.version:
+            with self._load_lock:
+                # Copy-on-write like `_load`, so readers never see the dict
+                # change underneath them.
+                if self._models.get(name) is current:
+                    self._models = {
+                        **self._models,
+                        name: _replace_stat(current, stat),
+                    }
+            return False
+        return self._load(name, force=True) is not None
+
+    def _load(self, name: str, force: bool = False) -> Optional[LoadedModel]:
+        with self._load_lock:
+            if not force and name in self._models:
+                return self._models[name]
+
+            path = self.path_for(name)
+            if not os.path.exists(path):
+                return None
+
+            stat = os.stat(path)
+            if self._failed.get(name) == (stat.st_mtime_ns, stat.st_size):
+                return None
+            version = _file_digest(path)
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name](path)
+            except Exception as e:
+                # A corrupt, half-written or skewed file is treated like a
+                # missing one instead of failing the caller; a version already
+                # in service stays there.
+                self._failed[name] = (stat.st_mtime_ns, stat.st_size)
+                load_failures_counter.inc(model=name, error=type(e).__name__)
+                return None
+            self._failed.pop(name, None)
+            load_time_ms = (time.perf_counter() - start) * 1000
+
+            loaded = LoadedModel(
+                name=name,
+                version=version,
+                model=model,
+                path=path,
+                mtime_ns=stat.st_mtime_ns,
+                size_bytes=stat.st_size,
+                load_time_ms=load_time_ms,
+                memory_bytes=_estimate_memory(model),
+                loaded_at=time.time(),
+            )
+            # A single dict assignment is the swap; readers see the old or
+            # the new snapshot, never a partially loaded model.
+            self._models = {**self._models, name: loaded}
+            return loaded
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _replace_stat(loaded: LoadedModel, stat: os.stat_result) -> LoadedModel:
+    return LoadedModel(
+        **{
+            **loaded.__dict__,
+            "mtime_ns": stat.st_mtime_ns,
+            "size_bytes": stat.st_size,
+        }
+    )
+
+
+def _estimate_memory(model: object) -> int:
+    """
+    Approximates the in-memory footprint. Models made of NumPy arrays (the
+    compiled trees, the local vector indexes) count their arrays' bytes,
+    leaving out memory-mapped ones, which live in the page cache; pickling
+    them would copy every mapped array into RAM. Other models count the size
+    of their pickle: native boosters hold their trees outside the Python
+    heap, so this is a better proxy than `sys.getsizeof`.
+    """
+    arrays = [
+        value
+        for value in getattr(model, "__dict__", {}).values()
+        if isinstance(value, np.ndarray)
+    ]
+    if arrays:
+        return sum(array.nbytes for array in arrays if not isinstance(array, np.memmap))
+    try:
+        return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
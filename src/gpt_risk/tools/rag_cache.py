@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.app import metrics
+
+cache_requests = metrics.counter(
+    "rag_cache_requests_total",
+    "Lookups in the RAG caches, by cache (embedding, result) and outcome.",
+    labelnames=("cache", "result"),
+)
+
+
+def _hit_rate_stats(name: str, size: int, max_entries: int) -> dict:
+    samples = cache_requests.samples()
+    hits = samples.get((name, "hit"), 0)
+    misses = samples.get((name, "miss"), 0)
+    lookups = hits + misses
+    return {
+        "size": size,
+        "max_entries": max_entries,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+class EmbeddingCache:
+    """
+    LRU cache from query text to its embedding.
+
+    Vectors are held as float16, which halves memory and the file written by
+    `save`; bge-style embeddings lose no meaningful precision at that width.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._vectors: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._vectors.get(text)
+            if vector is not None:
+                self._vectors.move_to_end(text)
+        cache_requests.inc(
+            cache="embedding", result="miss" if vector is None else "hit"
+        )
+        return vector
+
+    def put(self, text: str, vector) -> None:
+        with self._lock:
+            self._vectors[text] = np.asarray(vector, dtype=np.float16)
+            self._vectors.move_to_end(text)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+
+    def save(self, path: str):
+        """Writes the cache as an .npz of texts plus a float16 matrix."""
+        with self._lock:
+            texts = list(self._vectors)
+            vectors = list(self._vectors.values())
+        matrix = np.stack(vectors) if vectors else np.empty((0, 0), np.float16)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, texts=np.asarray(texts, dtype=str), vectors=matrix)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """Loads a file written by `save`; returns the number of entries read."""
+        if not os.path.exists(path):
+            return 0
+        with np.load(path, allow_pickle=False) as data:
+            texts, vectors = data["texts"], data["vectors"]
+        for text, vector in zip(texts.tolist(), vectors):
+            self.put(text, vector)
+        return len(texts)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._vectors)
+        return _hit_rate_stats("embedding", size, self.max_entries)
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an embedding model so repeated queries skip the embedding endpoint."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(text, vector)
+            return vector
+        return vector.astype(np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+
+class ResultCache:
+    """
+    Size-bounded TTL cache of formatted retrieval results keyed by
+    (index_name, query, k) and the index's version, so results cached for
+    an index that has since been replaced are never served. The least
+    recently used entry is evicted first.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self, index_name: str, query: str, k: int, version: str = ""
+    ) -> Optional[str]:
+        key = (index_name, query, k, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        cache_requests.inc(cache="result", result="miss" if entry is None else "hit")
+        return None if entry is None else entry[1]
+
+    def put(
+        self, index_name: str, query: str, k: int, result: str, version: str = ""
+    ) -> None:
+        key = (index_name, query, k, version)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, index_name: str = None) -> int:
+        """Drops the entries of one index (or all); returns how many were dropped."""
+        with self._lock:
+            if index_name is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            keys = [key for key in self._entries if key[0] == index_name]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            **_hit_rate_stats("result", size, self.max_entries),
+            "ttl_seconds": self.ttl_seconds,
+        }
@@ -0,0 +1,217 @@
+import json
+import os
+
+import numpy as np
+
+from src.app.features import FINGERPRINT_ATTRIBUTE
+
+# Node arrays written by `export_xgboost_trees`, one .npy file each so they
+# can be memory-mapped independently.
+ARRAY_NAMES = ("feature", "threshold", "left", "default_left", "value")
+META_FILENAME = "meta.json"
+
+# Rows are scored in chunks so the (rows x trees) working set stays in cache.
+ROW_CHUNK_SIZE = 256
+
+
+class CompiledTreeEnsemble:
+    """
+    A gradient-boosted tree ensemble flattened into contiguous arrays.
+
+    All trees share one set of node arrays. XGBoost allocates the two
+    children of a split next to each other, so the right child is always
+    `left + 1` and only one child array is needed. Leaves point to themselves
+    with an infinite threshold, so every row can take exactly `max_depth`
+    vectorized steps through all trees at once without tracking which rows
+    have already finished. Scoring needs only NumPy, not the xgboost library.
+    """
+
+    def __init__(self, arrays: dict, roots: np.ndarray, meta: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"]
+        self.roots = roots
+        self.max_depth = int(meta["max_depth"])
+        self.base_margin = np.float32(meta["base_margin"])
+        self.n_features_in_ = int(meta["n_features"])
+        self.objective = meta.get("objective", "binary:logistic")
+        # Carried over from the exported model, for FeatureSpec.verify.
+        self.feature_spec_fingerprint = meta.get(FINGERPRINT_ATTRIBUTE)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "CompiledTreeEnsemble":
+        """Loads an exported ensemble, memory-mapping the node arrays by default."""
+        with open(os.path.join(directory, META_FILENAME)) as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name in ARRAY_NAMES
+        }
+        roots = np.load(os.path.join(directory, "roots.npy"))
+        return cls(arrays, roots, meta)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_margin(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        has_missing = bool(np.isnan(X).any())
+        margin = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), ROW_CHUNK_SIZE):
+            chunk = X[start : start + ROW_CHUNK_SIZE]
+            margin[start : start + len(chunk)] = self._sum_leaves(chunk, has_missing)
+        return margin + self.base_margin
+
+    def _sum_leaves(self, X: np.ndarray, has_missing: bool) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        nodes = np.repeat(self.roots[None, :], n_rows, axis=0)
+        for _ in range(self.max_depth):
+            x = flat[self.feature[nodes] + row_offsets]
+            go_right = x >= self.threshold[nodes]
+            if has_missing:
+                go_right |= np.isnan(x) & ~self.default_left[nodes]
+            nodes = self.left[nodes] + go_right
+        return self.value[nodes].sum(axis=1, dtype=np.float32)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Same contract as `XGBClassifier.predict_proba` for binary objectives."""
+        probability = 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+        return np.column_stack([1.0 - probability, probability])
+
+
+# --- Export ---
+
+
+def export_xgboost_trees(model, directory: str) -> CompiledTreeEnsemble:
+    """
+    Flattens a fitted binary `XGBClassifier` (or `Booster`) into node arrays
+    under `directory` and returns the compiled ensemble loaded from them.
+    """
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    dumps = booster.get_dump(dump_format="json")
+    best_iteration = getattr(model, "best_iteration", None)
+    if best_iteration is not None:
+        # predict_proba stops at the best iteration when early stopping ran.
+        dumps = dumps[: best_iteration + 1]
+    feature_names = booster.feature_names
+
+    columns = {name: [] for name in ARRAY_NAMES}
+    roots, max_depth = [], 0
+    for dump in dumps:
+        root = len(columns["feature"])
+        roots.append(root)
+        max_depth = max(
+            max_depth, _flatten_tree(json.loads(dump), root, columns, feature_names)
+        )
+
+    arrays = {
+        "feature": np.asarray(columns["feature"], dtype=np.int32),
+        "threshold": np.asarray(columns["threshold"], dtype=np.float32),
+        "left": np.asarray(columns["left"], dtype=np.int32),
+        "default_left": np.asarray(columns["default_left"], dtype=bool),
+        "value": np.asarray(columns["value"], dtype=np.float32),
+    }
+    roots = np.asarray(roots, dtype=np.int32)
+    n_features = booster.num_features()
+    config = json.loads(booster.save_config())
+    objective = config["learner"]["objective"]["name"]
+    if objective not in ("binary:logistic", "binary:logitraw"):
+        raise ValueError(f"Unsupported objective for tree export: {objective}")
+
+    meta = {
+        "max_depth": max_depth,
+        "n_features": n_features,
+        "n_trees": len(roots),
+        "objective": objective,
+        "base_margin": 0.0,
+    }
+    fingerprint = getattr(model, FINGERPRINT_ATTRIBUTE, None)
+    if fingerprint is not None:
+        meta[FINGERPRINT_ATTRIBUTE] = fingerprint
+    # The base score is stored rounded in the config, so recover the exact
+    # bias from the booster's own margin on a probe row instead.
+    ensemble = CompiledTreeEnsemble(arrays, roots, meta)
+    probe = np.zeros((1, n_features), dtype=np.float32)
+    meta["base_margin"] = float(
+        _booster_margin(booster, probe)[0] - ensemble.predict_margin(probe)[0]
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(directory, f"{name}.npy", array)
+    _save_array(directory, "roots.npy", roots)
+    # meta.json is written last and atomically; the model registry watches it
+    # to hot-swap a freshly exported ensemble.
+    tmp_path = os.path.join(directory, META_FILENAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, META_FILENAME))
+    return CompiledTreeEnsemble.load(directory)
+
+
+def _save_array(directory: str, filename: str, array: np.ndarray):
+    # Replace rather than overwrite: a serving ensemble may have the old file
+    # memory-mapped, and a new inode leaves its view intact.
+    tmp_path = os.path.join(directory, filename + ".tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, os.path.join(directory, filename))
+
+
+def load_compiled_ensemble(meta_path: str) -> CompiledTreeEnsemble:
+    """Registry loader: takes the path of an export's meta.json."""
+    return CompiledTreeEnsemble.load(os.path.dirname(meta_path))
+
+
+def _flatten_tree(node: dict, root: int, columns: dict, feature_names) -> int:
+    """Appends one tree's nodes (in node-id order) and returns its depth."""
+    nodes = {}
+    stack = [(node, 0)]
+    depth = 0
+    while stack:
+        current, level = stack.pop()
+        nodes[current["nodeid"]] = current
+        depth = max(depth, level)
+        for child in current.get("children", ()):
+            stack.append((child, level + 1))
+
+    for node_id in range(len(nodes)):
+        current = nodes[node_id]
+        index = root + node_id
+        if "leaf" in current:
+            columns["feature"].append(0)
+            columns["threshold"].append(np.inf)
+            columns["left"].append(index)
+            columns["default_left"].append(True)
+            columns["value"].append(current["leaf"])
+            continue
+        if "split_condition" not in current:
+            raise ValueError("Categorical splits are not supported by the exporter.")
+        if current["no"] != current["yes"] + 1:
+            raise ValueError("Expected the right child to follow the left child.")
+        columns["feature"].append(_feature_index(current["split"], feature_names))
+        columns["threshold"].append(current["split_condition"])
+        columns["left"].append(root + current["yes"])
+        columns["default_left"].append(current["missing"] == current["yes"])
+        columns["value"].append(0.0)
+    return depth
+
+
+def _feature_index(split: str, feature_names) -> int:
+    if feature_names:
+        return feature_names.index(split)
+    # Models trained on plain arrays name their features f0, f1, ...
+    return int(split[1:])
+
+
+def _booster_margin(booster, X: np.ndarray) -> np.ndarray:
+    import xgboost as xgb
+
+    return booster.predict(xgb.DMatrix(X), output_margin=True)
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from src.app import metrics
+
+query_latency_histogram = metrics.histogram(
+    "vector_search_query_latency_seconds",
+    "Latency of vector search queries, including time waiting for a connection.",
+    labelnames=("index",),
+)
+client_builds = metrics.counter(
+    "vector_search_client_builds_total",
+    "Vector search clients created, by index and reason (new, stale, unhealthy).",
+    labelnames=("index", "reason"),
+)
+
+
+class _PooledClient:
+    __slots__ = ("client", "created_at", "queries", "consecutive_failures")
+
+    def __init__(self, client: object):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.queries = 0
+        self.consecutive_failures = 0
+
+
+class VectorSearchPool:
+    """
+    Long-lived vector search clients, one per index, created on first use.
+
+    `factory(index_name)` builds a client exposing `invoke(query)` (a LangChain
+    retriever). Reusing it keeps its HTTP sessions, and so their keep-alive
+    connections, warm across requests. A client is rebuilt once it is older
+    than `max_age_seconds` or after `max_consecutive_failures` failed queries
+    in a row. At most `max_connections` queries run at once across all
+    indexes; further callers wait for a free slot.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], object],
+        max_connections: int = 8,
+        max_age_seconds: float = 900.0,
+        max_consecutive_failures: int = 3,
+    ):
+        self.factory = factory
+        self.max_connections = max_connections
+        self.max_age_seconds = max_age_seconds
+        self.max_consecutive_failures = max_consecutive_failures
+        self._clients = {}
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._executor = None
+
+    def get(self, index_name: str):
+        """Returns the pooled client for `index_name`, building it if needed."""
+        return self._get(index_name).client
+
+    def query(self, index_name: str, query: str):
+        """Runs `query` against `index_name` on the pooled client."""
+        start = time.perf_counter()
+        entry = self._get(index_name)
+        with self._slots:
+            try:
+                results = entry.client.invoke(query)
+            except Exception:
+                entry.consecutive_failures += 1
+                raise
+            finally:
+                query_latency_histogram.observe(
+                    time.perf_counter() - start, index=index_name
+                )
+        entry.queries += 1
+        entry.consecutive_failures = 0
+        return results
+
+    async def aquery(self, index_name: str, query: str):
+        """
+        Async variant of `query`. The blocking client call runs on a thread
+        pool sized to `max_connections`, so the event loop is never blocked and
+        waiting callers queue without holding a thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._ensure_executor(), self.query, index_name, query
+        )
+
+    def stats(self) -> dict:
+        """Reports the age, query count and health of each pooled client."""
+        now = time.monotonic()
+        with self._lock:
+            entries = dict(self._clients)
+        return {
+            index_name: {
+                "age_seconds": round(now - entry.created_at, 3),
+                "queries": entry.queries,
+                "consecutive_failures": entry.consecutive_failures,
+                "latency_p50_ms": query_latency_histogram.quantile(
+                    0.5, index=index_name
+                )
+                * 1e3,
+                "latency_p99_ms": query_latency_histogram.quantile(
+                    0.99, index=index_name
+                )
+                * 1e3,
+            }
+            for index_name, entry in entries.items()
+        }
+
+    def clear(self):
+        """Drops all pooled clients; they are rebuilt on next use."""
+        with self._lock:
+            self._clients.clear()
+
+    def close(self):
+        with self._lock:
+            self._clients.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get(self, index_name: str) -> _PooledClient:
+        entry = self._clients.get(index_name)
+        reason = self._rebuild_reason(entry)
+        if reason is None:
+            return entry
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(index_name, threading.Lock())
+        # Build outside the pool lock so a slow index doesn't block the others,
+        # and only once per index when many requests miss at the same time.
+        with build_lock:
+            entry = self._clients.get(index_name)
+            reason = self._rebuild_reason(entry)
+            if reason is None:
+                return entry
+            entry = _PooledClient(self.factory(index_name))
+            client_builds.inc(index=index_name, reason=reason)
+            with self._lock:
+                self._clients[index_name] = entry
+            return entry
+
+    def _rebuild_reason(self, entry: _PooledClient):
+        if entry is None:
+            return "new"
+        if time.monotonic() - entry.created_at > self.max_age_seconds:
+            return "stale"
+        if entry.consecutive_failures >= self.max_consecutive_failures:
+            return "unhealthy"
+        return None
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self._executor is not None:
+            return self._executor
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_connections,
+                    thread_name_prefix="vector-search",
+                )
+            return self._executor
@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.app import metrics
+
+PAYLOAD_BUCKETS = (64, 256, 1024, 4096, 16_384, 65_536, 262_144, 1_048_576)
+
+span_duration_histogram = metrics.histogram(
+    "graph_span_duration_seconds",
+    "Wall time of graph nodes, LLM calls and tool calls.",
+    labelnames=("kind", "name", "status"),
+)
+span_payload_histogram = metrics.histogram(
+    "graph_span_payload_bytes",
+    "Size of the inputs and outputs of LLM and tool calls.",
+    buckets=PAYLOAD_BUCKETS,
+    labelnames=("kind", "name", "direction"),
+)
+span_tokens_counter = metrics.counter(
+    "graph_span_tokens_total",
+    "Tokens sent to and received from each LLM, as reported by the provider.",
+    labelnames=("name", "direction"),
+)
+span_errors_counter = metrics.counter(
+    "graph_span_errors_total",
+    "Graph nodes, LLM calls and tool calls that raised.",
+    labelnames=("kind", "name"),
+)
+llm_queue_histogram = metrics.histogram(
+    "llm_queue_seconds",
+    "Time LLM requests waited for one of their provider's concurrency slots.",
+    labelnames=("provider",),
+)
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode())
+    content = getattr(value, "content", None)
+    if content is not None:
+        return _size(content)
+    return len(json.dumps(value, default=str).encode())
+
+
+def _llm_output(response) -> tuple:
+    """(text, input tokens, output tokens) of an LLMResult."""
+    text, tokens_in, tokens_out = "", None, None
+    for generations in response.generations:
+        for generation in generations:
+            text += generation.text or ""
+            usage = getattr(
+                getattr(generation, "message", None), "usage_metadata", None
+            )
+            if usage:
+                tokens_in = (tokens_in or 0) + usage.get("input_tokens", 0)
+                tokens_out = (tokens_out or 0) + usage.get("output_tokens", 0)
+    return text, tokens_in, tokens_out
+
+
+class RequestTrace(BaseCallbackHandler):
+    """
+    Collects the spans of one graph run from LangChain callbacks: one per
+    graph node, LLM call and tool call, with wall time, queue time, tokens
+    in and out, payload sizes and errors. Every span also feeds the span
+    metrics, so a trace is attached to each request whether or not its
+    breakdown is returned.
+    """
+
+    # Called on the caller's thread or event loop, never from an executor.
+    run_inline = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[dict] = []
+        self._open: Dict[UUID, dict] = {}
+        self._queue_seconds: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    # --- Spans ---
+
+    def _start(self, run_id: UUID, kind: str, name: str, metadata: Optional[dict]):
+        span = {"kind": kind, "name": name, "start_ms": self._elapsed_ms()}
+        node = (metadata or {}).get("langgraph_node")
+        if node and node != name:
+            span["node"] = node
+        with self._lock:
+            self._open[run_id] = span
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **fields):
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            queue_seconds = self._queue_seconds.pop(run_id, None)
+        if span is None:
+            return
+        span["duration_ms"] = self._elapsed_ms() - span["start_ms"]
+        if queue_seconds is not None:
+            span["queue_ms"] = queue_seconds * 1e3
+        span.update((key, value) for key, value in fields.items() if value is not None)
+        kind, name = span["kind"], span["name"]
+        if error is not None:
+            span["error"] = f"{type(error).__name__}: {error}"
+            span_errors_counter.inc(kind=kind, name=name)
+        span_duration_histogram.observe(
+            span["duration_ms"] / 1e3,
+            kind=kind,
+            name=name,
+            status="error" if error is not None else "ok",
+        )
+        for direction in ("in", "out"):
+            if f"bytes_{direction}" in span:
+                span_payload_histogram.observe(
+                    span[f"bytes_{direction}"],
+                    kind=kind,
+                    name=name,
+                    direction=direction,
+                )
+            if f"tokens_{direction}" in span:
+                span_tokens_counter.inc(
+                    span[f"tokens_{direction}"], name=name, direction=direction
+                )
+        with self._lock:
+            self.spans.append(span)
+
+    def record_queue_time(self, run_id: UUID, seconds: float):
+        with self._lock:
+            self._queue_seconds[run_id] = self._queue_seconds.get(run_id, 0.0) + seconds
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1e3
+
+    # --- Graph nodes ---
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        # Only the node itself, not the runnables it is built from or the
+        # graph's routing functions.
+        name = kwargs.get("name")
+        if name and name == (metadata or {}).get("langgraph_node"):
+            self._start(run_id, "node", name, None)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # --- LLM calls ---
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, metadata=None, **kwargs
+    ):
+        name = (
+            (metadata or {}).get("ls_model_name")
+            or kwargs.get("name")
+            or (serialized or {}).get("name")
+            or "llm"
+        )
+        self._start(run_id, "llm", name, metadata)
+        with self._lock:
+            self._open[run_id]["bytes_in"] = sum(
+                _size(message) for batch in messages for message in batch
+            )
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        text, tokens_in, tokens_out = _llm_output(response)
+        self._end(
+            run_id,
+            bytes_out=len(text.encode()),
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # --- Tool calls ---
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, metadata=None, inputs=None, **kwargs
+    ):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, "tool", name, metadata)
+        with self._lock:
+            self._open[run_id]["bytes_in"] = _size(
+                inputs if inputs is not None else input_str
+            )
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, bytes_out=_size(output))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    # --- Breakdown ---
+
+    def breakdown(self) -> dict:
+        """The request's total time and its spans, in start order."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span["start_ms"])
+        return {"total_ms": self._elapsed_ms(), "spans": spans}
+
+
+def record_queue_time(provider: str, seconds: float, run_manager=None):
+    """
+    Records how long an LLM request waited for a concurrency slot, and adds
+    it to the request's trace when the call is traced.
+    """
+    llm_queue_histogram.observe(seconds, provider=provider)
+    for handler in getattr(run_manager, "handlers", None) or ():
+        if isinstance(handler, RequestTrace):
+            handler.record_queue_time(run_manager.run_id, seconds)
@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.app.cassette import CassetteMissError, _cassette
+from src.app.llms import pooled_chat_model
+
+
+def _result(message: AIMessage) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _llm():
+    return pooled_chat_model(ChatOpenAI, "openai")(
+        model="test-model", api_key="x", max_retries=0
+    )
+
+
+@pytest.fixture
+def cassette_settings(tmp_path):
+    _cassette.cache_clear()
+    with patch("gpt_risk.cassette.settings") as mock_settings:
+        mock_settings.LLM_CASSETTE_PATH = str(tmp_path / "llm.sqlite")
+        mock_settings.LLM_CASSETTE_REPLAY_TIMING = False
+        yield mock_settings
+    _cassette.cache_clear()
+
+
+@patch.object(ChatOpenAI, "_generate")
+def test_replay_serves_recorded_responses_without_the_provider(
+    mock_generate, cassette_settings
+):
+    mock_generate.return_value = _result(
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "score", "args": {"amount": 10}, "id": "call-1"}],
+            usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7},
+        )
+    )
+    cassette_settings.LLM_CASSETTE_MODE = "record"
+    recorded = _llm().invoke([HumanMessage("Score  this\n transaction.")])
+
+    cassette_settings.LLM_CASSETTE_MODE = "replay"
+    mock_generate.side_effect = AssertionError("the provider was called")
+    replayed = _llm().invoke([HumanMessage("Score this transaction.")])
+
+    assert mock_generate.call_count == 1
+    assert replayed.tool_calls == recorded.tool_calls
+    assert replayed.usage_metadata == recorded.usage_metadata
+
+
+@patch.object(ChatOpenAI, "_generate")
+def test_replay_cycles_through_takes_and_fails_on_unrecorded_prompts(
+    mock_generate, cassette_settings
+):
+    mock_generate.side_effect = [
+        _result(AIMessage("first")),
+        _result(AIMessage("second")),
+    ]
+    cassette_settings.LLM_CASSETTE_MODE = "record"
+    _llm().invoke("hello")
+    _llm().invoke("hello")
+
+    cassette_settings.LLM_CASSETTE_MODE = "replay"
+    replies = [_llm().invoke("hello").content for _ in range(3)]
+
+    assert replies == ["first", "second", "first"]
+    with pytest.raises(CassetteMissError):
+        _llm().invoke("goodbye")
+
+
+@pytest.mark.anyio
+async def test_streams_replay_chunk_by_chunk(cassette_settings):
+    async def stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for text in ("Low", " risk", "."):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=text))
+
+    cassette_settings.LLM_CASSETTE_MODE = "record"
+    with patch.object(ChatOpenAI, "_astream", stream):
+        recorded = [chunk.content async for chunk in _llm().astream("Summarize.")]
+
+    cassette_settings.LLM_CASSETTE_MODE = "replay"
+    replayed = [chunk.content async for chunk in _llm().astream("Summarize.")]
+
+    assert [text for text in replayed if text] == recorded == ["Low", " risk", "."]
+
+
+@patch("gpt_risk.cassette.time")
+@patch.object(ChatOpenAI, "_generate")
+def test_replay_timing_waits_the_recorded_latency(
+    mock_generate, mock_time, cassette_settings
+):
+    mock_generate.return_value = _result(AIMessage("ok"))
+    mock_time.perf_counter.side_effect = [10.0, 10.25]
+    cassette_settings.LLM_CASSETTE_MODE = "record"
+    _llm().invoke("hello")
+
+    cassette_settings.LLM_CASSETTE_MODE = "replay"
+    cassette_settings.LLM_CASSETTE_REPLAY_TIMING = True
+    _llm().invoke("hello")
+
+    mock_time.sleep.assert_called_once_with(0.25)
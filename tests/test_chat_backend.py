@@ -0,0 +1,69 @@
+import json
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from src.app.chat_backend import (
+    HttpChatBackend,
+    InProcessChatBackend,
+    create_chat_backend,
+)
+from src.app.streaming import format_sse
+
+
+async def _fake_stream_chat(query, thread_id):
+    yield "token", {"text": f"{thread_id}:"}
+    yield "done", {"response": json.dumps(query)}
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.chat_backend.stream_chat", side_effect=_fake_stream_chat)
+async def test_in_process_backend_calls_graph_directly(mock_stream_chat):
+    events = [event async for event in InProcessChatBackend().stream({"a": 1}, "t1")]
+
+    assert events == [("token", {"text": "t1:"}), ("done", {"response": '{"a": 1}'})]
+
+
+@pytest.mark.anyio
+async def test_http_backend_streams_over_one_pooled_client():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = format_sse("token", {"text": "Low risk."}) + format_sse(
+            "done", {"response": "Low risk."}
+        )
+        return httpx.Response(
+            200, text=body, headers={"content-type": "text/event-stream"}
+        )
+
+    backend = HttpChatBackend(
+        "http://risk-api:8000/", transport=httpx.MockTransport(handler)
+    )
+    try:
+        for _ in range(2):
+            events = [event async for event in backend.stream({"a": 1}, "t1")]
+            assert events[-1] == ("done", {"response": "Low risk."})
+        client = backend._client
+        assert client is not None and backend._get_client() is client
+    finally:
+        await backend.aclose()
+
+    assert [str(request.url) for request in requests] == [
+        "http://risk-api:8000/chat/stream"
+    ] * 2
+    assert json.loads(requests[0].content) == {"query": {"a": 1}, "thread_id": "t1"}
+
+
+@patch("gpt_risk.chat_backend.settings")
+def test_create_chat_backend_selects_transport(mock_settings):
+    mock_settings.CHAT_BACKEND_URL = None
+    assert isinstance(create_chat_backend(), InProcessChatBackend)
+
+    mock_settings.CHAT_BACKEND_URL = "http://risk-api:8000"
+    mock_settings.CHAT_BACKEND_TIMEOUT_SECONDS = 30.0
+    mock_settings.CHAT_BACKEND_MAX_CONNECTIONS = 5
+    backend = create_chat_backend()
+    assert isinstance(backend, HttpChatBackend)
+    assert backend.base_url == "http://risk-api:8000"
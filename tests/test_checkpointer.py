@@ -0,0 +1,153 @@
+import asyncio
+import json
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from unittest.mock import patch, AsyncMock
+from langgraph.graph import StateGraph, END
+from langchain_core.messages import AIMessage
+
+from src.app import graph
+from src.app.checkpointer import MemoryCheckpointSaver, SqliteCheckpointSaver
+
+
+class CounterState(TypedDict):
+    total: int
+    history: Annotated[list, operator.add]
+
+
+def _counter_graph(checkpointer):
+    workflow = StateGraph(CounterState)
+    workflow.add_node(
+        "add", lambda state: {"total": state.get("total", 0) + 1, "history": ["+1"]}
+    )
+    workflow.set_entry_point("add")
+    workflow.add_edge("add", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def test_memory_saver_resumes_threads_and_keeps_only_the_latest_checkpoint():
+    saver = MemoryCheckpointSaver()
+    app = _counter_graph(saver)
+
+    app.invoke({"history": []}, _config("t1"))
+    result = app.invoke({"history": []}, _config("t1"))
+
+    assert result["total"] == 2
+    assert result["history"] == ["+1", "+1"]
+    assert len(list(saver.list(_config("t1")))) == 1
+
+
+def test_memory_saver_evicts_least_recently_used_threads():
+    saver = MemoryCheckpointSaver(max_threads=2)
+    app = _counter_graph(saver)
+
+    app.invoke({"history": []}, _config("a"))
+    app.invoke({"history": []}, _config("b"))
+    app.invoke({"history": []}, _config("a"))  # "b" is now the oldest
+    app.invoke({"history": []}, _config("c"))
+
+    assert saver.get_tuple(_config("b")) is None
+    assert app.get_state(_config("a")).values["total"] == 2
+    assert app.get_state(_config("c")).values["total"] == 1
+
+
+@pytest.mark.anyio
+async def test_sqlite_saver_survives_a_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = SqliteCheckpointSaver(path)
+    await _counter_graph(saver).ainvoke({"history": []}, _config("t1"))
+    saver.close()
+
+    reopened = SqliteCheckpointSaver(path)
+    result = await _counter_graph(reopened).ainvoke({"history": []}, _config("t1"))
+
+    assert result["total"] == 2
+    reopened.delete_thread("t1")
+    assert reopened.get_tuple(_config("t1")) is None
+    reopened.close()
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_fraud_detection_model")
+@patch("gpt_risk.graph.synthesis_llm")
+@patch("gpt_risk.graph.triage_llm")
+async def test_follow_up_turns_reuse_tool_results(
+    mock_triage_llm, mock_synthesis_llm, mock_fraud_tool, mock_rag_tool, mock_settings
+):
+    mock_settings.FAST_TRIAGE_ENABLED = False
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = False
+    mock_settings.AGENT_TOOL_MODE = "direct"
+    mock_settings.TOOL_TIMEOUT_SECONDS = 5.0
+    mock_settings.FRAUD_RAG_INDEX_NAME = "fraud_index"
+    mock_triage_llm.ainvoke = AsyncMock(
+        side_effect=[AIMessage("fraud_check"), AIMessage("general_query")]
+    )
+    mock_synthesis_llm.ainvoke = AsyncMock(return_value=AIMessage("Summary."))
+    mock_fraud_tool.ainvoke = AsyncMock(return_value='{"fraud_probability": 0.9}')
+    mock_rag_tool.ainvoke = AsyncMock(return_value="[]")
+    app = graph.workflow.compile(checkpointer=MemoryCheckpointSaver())
+    transaction = {"transaction_id": "t1", "amount": 900.0}
+
+    for query in (transaction, transaction, {"text_query": "What should I do?"}):
+        await app.ainvoke({"input_data": query, "messages": []}, _config("t1"))
+
+    # The repeated transaction reused both the triage and the tool results.
+    assert mock_triage_llm.ainvoke.call_count == 2
+    mock_fraud_tool.ainvoke.assert_called_once()
+    mock_rag_tool.ainvoke.assert_called_once()
+    # The follow-up question was answered with the earlier model output.
+    follow_up_prompt = mock_synthesis_llm.ainvoke.call_args.args[0]
+    assert '{"fraud_probability": 0.9}' in follow_up_prompt
+    assert json.dumps({"text_query": "What should I do?"}) in follow_up_prompt
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_fraud_detection_model")
+@patch("gpt_risk.graph.synthesis_llm")
+@patch("gpt_risk.graph.triage_llm")
+async def test_retry_after_a_tool_timeout_reruns_the_tools(
+    mock_triage_llm, mock_synthesis_llm, mock_fraud_tool, mock_rag_tool, mock_settings
+):
+    mock_settings.FAST_TRIAGE_ENABLED = False
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = False
+    mock_settings.AGENT_TOOL_MODE = "direct"
+    mock_settings.TOOL_TIMEOUT_SECONDS = 0.05
+    mock_settings.FRAUD_RAG_INDEX_NAME = "fraud_index"
+    mock_triage_llm.ainvoke = AsyncMock(return_value=AIMessage("fraud_check"))
+    mock_synthesis_llm.ainvoke = AsyncMock(return_value=AIMessage("Summary."))
+    calls = []
+
+    async def fraud_model(args):
+        calls.append(args)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return '{"fraud_probability": 0.9}'
+
+    mock_fraud_tool.ainvoke = fraud_model
+    mock_rag_tool.ainvoke = AsyncMock(return_value="[]")
+    app = graph.workflow.compile(checkpointer=MemoryCheckpointSaver())
+    transaction = {"transaction_id": "t1", "amount": 900.0}
+
+    first = await app.ainvoke(
+        {"input_data": transaction, "messages": []}, _config("t1")
+    )
+    second = await app.ainvoke(
+        {"input_data": transaction, "messages": []}, _config("t1")
+    )
+
+    assert "timed out" in json.loads(first["ml_tool_output"])["error"]
+    assert first["tool_input_key"] is None
+    # The retry ran the tools again instead of reusing the timed-out output.
+    assert len(calls) == 2
+    assert json.loads(second["ml_tool_output"]) == {"fraud_probability": 0.9}
+    assert second["tool_input_key"] is not None
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app.evaluation import (
+    BASELINE_PATH,
+    GRAPH_PATH,
+    EvalTask,
+    ResultLog,
+    labeled_records,
+    read_records,
+    run_baseline,
+    run_graph,
+    summarize,
+)
+
+
+def _score_batch(records, chunk_size):
+    for record in records:
+        yield {"fraud_probability": float(record["transaction_amount"]) / 100}
+
+
+TASK = EvalTask("fraud", "fraud_check", _score_batch, "fraud_probability")
+
+
+def _records(amounts_and_labels):
+    return [
+        {"transaction_id": f"t{i}", "transaction_amount": amount, "is_fraud": label}
+        for i, (amount, label) in enumerate(amounts_and_labels)
+    ]
+
+
+def test_csv_records_stream_with_labels_and_renamed_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("TransactionAmt,isFraud\n12.5,0\n900,1\n")
+
+    records = list(
+        labeled_records(
+            read_records(str(path)), "isFraud", {"TransactionAmt": "transaction_amount"}
+        )
+    )
+
+    assert records == [
+        (0, {"transaction_amount": "12.5"}, 0),
+        (1, {"transaction_amount": "900"}, 1),
+    ]
+
+
+def test_baseline_run_resumes_after_an_interruption(tmp_path):
+    records = _records([(10, 0), (90, 1), (20, 0), (80, 1)])
+    path = str(tmp_path / "results.jsonl")
+    first = ResultLog(path)
+    run_baseline(TASK, labeled_records(records[:2], "is_fraud"), first, chunk_size=1)
+    first.close()
+    with open(path, "a") as f:
+        f.write('{"path": "baseline", "ind')  # A line cut short by a crash.
+
+    log = ResultLog(path)
+    scored = run_baseline(TASK, labeled_records(records, "is_fraud"), log, 3)
+    summary = summarize(log.results(BASELINE_PATH))
+    log.close()
+
+    assert scored == 2
+    assert summary["records"] == 4
+    assert summary["accuracy"] == 1.0
+    assert summary["auc"] == 1.0
+    assert summary["records_per_second"] > 0
+
+
+class FakeGraph:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, state, config):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        amount = state["input_data"]["transaction_amount"]
+        if amount < 0:
+            raise RuntimeError("provider unavailable")
+        if amount == 0:
+            return {"request_type": "general_query"}
+        # The assistant overrules its tool on mid-range scores.
+        verdict = "High risk of fraud" if amount >= 40 else "Low risk of fraud"
+        return {
+            "request_type": "fraud_check",
+            "ml_tool_output": json.dumps({"fraud_probability": amount / 100}),
+            "final_summary": f"1.  **Overall Assessment:** {verdict}.",
+        }
+
+
+@pytest.mark.anyio
+async def test_graph_run_is_bounded_and_retries_failed_records(tmp_path):
+    records = _records([(10, 0), (45, 1), (0, 0), (-1, 1)] * 3)
+    graph = FakeGraph()
+    log = ResultLog(str(tmp_path / "results.jsonl"))
+
+    await run_graph(TASK, labeled_records(records, "is_fraud"), log, graph, 2)
+    max_in_flight = graph.max_in_flight
+    retried = await run_graph(TASK, labeled_records(records, "is_fraud"), log, graph)
+    summary = summarize(log.results(GRAPH_PATH))
+    log.close()
+
+    assert max_in_flight == 2
+    assert retried == 3
+    assert summary["records"] == 12
+    assert summary["errors"] == 3
+    assert summary["coverage"] == 0.5
+    # Predictions come from the summaries, not the tool's scores.
+    assert summary["accuracy"] == 1.0
+    assert summary["tool_agreement"] == 0.5
+    assert summary["auc"] is None
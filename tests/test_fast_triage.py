@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import numpy as np
+
+from src.app.fast_triage import (
+    classify_by_keys,
+    fast_triage,
+    triage_decisions,
+)
+
+FRAUD_TRANSACTION = {
+    "transaction_id": "t12345",
+    "customer_id": "c67890",
+    "transaction_amount": 2500.75,
+    "merchant_id": "m54321",
+}
+
+CREDIT_APPLICATION = {
+    "application_id": "a98765",
+    "customer_id": "c11223",
+    "loan_amount": 50000,
+    "dti_ratio": 0.3,
+}
+
+
+def test_classify_by_keys_recognizes_structured_payloads():
+    fraud = classify_by_keys(FRAUD_TRANSACTION)
+    credit = classify_by_keys(CREDIT_APPLICATION)
+
+    assert fraud.request_type == "fraud_check"
+    assert credit.request_type == "credit_risk"
+    assert fraud.confidence > 0.9
+    assert credit.confidence > 0.9
+
+
+def test_classify_by_keys_is_unsure_about_mixed_or_sparse_payloads():
+    mixed = classify_by_keys({"transaction_amount": 10, "loan_amount": 10})
+    sparse = classify_by_keys({"transaction_id": "t1"})
+
+    assert mixed is None
+    assert sparse.confidence < 0.9
+    assert classify_by_keys({"text_query": "hello"}) is None
+
+
+@patch("gpt_risk.fast_triage.model_registry")
+def test_fast_triage_falls_back_when_not_confident(mock_registry):
+    mock_registry.get.return_value = None
+
+    assert fast_triage({"transaction_id": "t1"}, threshold=0.9) is None
+    assert fast_triage({"text_query": "hello"}, threshold=0.9) is None
+
+
+@patch("gpt_risk.fast_triage.model_registry")
+def test_fast_triage_uses_text_classifier_and_counts_paths(mock_registry):
+    classifier = MagicMock()
+    classifier.classes_ = np.array(["credit_risk", "fraud_check", "general_query"])
+    classifier.predict_proba.return_value = np.array([[0.02, 0.03, 0.95]])
+    mock_registry.get.return_value = MagicMock(model=classifier)
+    before = triage_decisions.value(path="classifier", request_type="general_query")
+
+    decision = fast_triage({"text_query": "what does kyc mean"}, threshold=0.9)
+
+    assert decision.request_type == "general_query"
+    assert decision.path == "classifier"
+    assert (
+        triage_decisions.value(path="classifier", request_type="general_query")
+        == before + 1
+    )
@@ -0,0 +1,110 @@
+import pytest
+import math
+import numpy as np
+
+from src.app.features import (
+    Feature,
+    FeatureSkewError,
+    FeatureSpec,
+    FRAUD_FEATURE_SPEC,
+    CREDIT_FEATURE_SPEC,
+)
+
+TEST_SPEC = FeatureSpec(
+    name="test",
+    features=(
+        Feature("amount", "amount"),
+        Feature("amount_log", "amount", "log1p"),
+        Feature("ratio", ("amount", "income"), "ratio", default=-1.0),
+        Feature("hour", "timestamp", "hour_of_day", default=-1.0),
+        Feature("bucket", "merchant_id", "hash_bucket", buckets=16),
+        Feature("channel", "channel", "one_hot", categories=("web", "pos")),
+        Feature("has_income", "income", "indicator"),
+    ),
+)
+
+
+def test_columns_expand_one_hot_features():
+    assert TEST_SPEC.columns == [
+        "amount",
+        "amount_log",
+        "ratio",
+        "hour",
+        "bucket",
+        "channel=web",
+        "channel=pos",
+        "has_income",
+    ]
+
+
+def test_transform_row_encodes_fields_and_defaults():
+    features = TEST_SPEC.compile()
+
+    row = features.transform_row(
+        {
+            "amount": 99.0,
+            "income": 0,
+            "timestamp": "2025-07-22T08:30:00Z",
+            "merchant_id": "m1",
+            "channel": "pos",
+        }
+    )[0]
+
+    assert row[0] == 99.0
+    assert row[1] == pytest.approx(math.log1p(99.0))
+    assert row[2] == -1.0  # Division by zero falls back to the default.
+    assert row[3] == 8.0
+    assert 0 <= row[4] < 16
+    assert list(row[5:7]) == [0.0, 1.0]
+    assert row[7] == 1.0
+
+
+def test_batch_transform_matches_row_transform():
+    features = TEST_SPEC.compile()
+    records = [
+        {"amount": 10, "income": 100, "timestamp": "2025-07-22T23:00:00Z"},
+        {"amount": "not a number", "merchant_id": "m2", "channel": "web"},
+        {},
+    ]
+
+    batch = features.transform(records)
+    rows = np.vstack([features.transform_row(record) for record in records])
+
+    assert batch.shape == (3, len(TEST_SPEC.columns))
+    np.testing.assert_allclose(batch, rows)
+
+
+def test_transform_reuses_preallocated_output():
+    features = CREDIT_FEATURE_SPEC.compile()
+    out = np.zeros((2, len(CREDIT_FEATURE_SPEC.columns)), dtype=np.float32)
+
+    result = features.transform([{"loan_amount": 1}, {"loan_amount": 2}], out=out)
+
+    assert result is out
+
+
+def test_invalid_feature_definitions_are_rejected():
+    with pytest.raises(ValueError):
+        Feature("bad", "x", "unknown_transform")
+    with pytest.raises(ValueError):
+        Feature("bad", "x", "ratio")
+
+
+def test_model_specs_read_api_payload_fields():
+    assert "transaction_amount" in FRAUD_FEATURE_SPEC.source_fields
+    assert "dti_ratio" in CREDIT_FEATURE_SPEC.source_fields
+    assert FRAUD_FEATURE_SPEC.fingerprint != CREDIT_FEATURE_SPEC.fingerprint
+
+
+class _Model:
+    pass
+
+
+def test_verify_rejects_models_trained_on_another_spec():
+    model = FRAUD_FEATURE_SPEC.stamp(_Model())
+
+    assert FRAUD_FEATURE_SPEC.verify(model) is model
+    with pytest.raises(FeatureSkewError, match=FRAUD_FEATURE_SPEC.fingerprint):
+        CREDIT_FEATURE_SPEC.verify(model)
+    # Models saved before fingerprints were stored still load.
+    assert CREDIT_FEATURE_SPEC.verify(_Model())
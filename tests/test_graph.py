@@ -1,15 +1,23 @@
+import asyncio
+import json
+import time
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+from src.app.config import settings
 from src.app.state import AgentState
 from src.app.graph import (
     triage_node,
     fraud_agent_node,
     credit_agent_node,
     synthesis_node,
+    afraud_agent_node,
+    acredit_agent_node,
+    asynthesis_node,
+    reset_llms,
     route_request,
 )
 
-
 # --- Test Triage Node and Routing ---
 
 
@@ -97,9 +105,11 @@ def test_credit_agent_node(mock_llm, mock_credit_tool, mock_rag_tool):
     assert result_state["rag_context"] == '[{"content": "credit history"}]'
 
 
+@patch("gpt_risk.graph.settings")
 @patch("gpt_risk.graph.synthesis_llm")
-def test_synthesis_node(mock_synthesis_llm):
+def test_synthesis_node(mock_synthesis_llm, mock_settings):
     """Unit test for the synthesis_node."""
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = False
     mock_synthesis_llm.invoke.return_value = MagicMock(
         content="Final detailed summary."
     )
@@ -117,3 +127,216 @@ def test_synthesis_node(mock_synthesis_llm):
 
     mock_synthesis_llm.invoke.assert_called_once()
     assert result_state["final_summary"] == "Final detailed summary."
+
+
+@patch("gpt_risk.graph.triage_llm")
+def test_triage_node_skips_llm_for_obvious_payloads(mock_triage_llm):
+    """Structured payloads with a clear key signature are triaged locally."""
+    initial_state = AgentState(
+        input_data={
+            "transaction_id": "t12345",
+            "transaction_amount": 2500.75,
+            "merchant_id": "m54321",
+        },
+        messages="",
+    )
+
+    result_state = triage_node(initial_state)
+
+    assert result_state["request_type"] == "fraud_check"
+    mock_triage_llm.invoke.assert_not_called()
+
+
+# --- Test Async Nodes ---
+
+
+def _slow_tool(output: str, delay: float):
+    tool = MagicMock()
+
+    async def ainvoke(args):
+        await asyncio.sleep(delay)
+        return output
+
+    tool.ainvoke = AsyncMock(side_effect=ainvoke)
+    return tool
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_fraud_detection_model")
+@patch("gpt_risk.graph.fraud_agent_llm")
+async def test_afraud_agent_node_runs_tools_concurrently(
+    mock_llm, mock_fraud_tool, mock_rag_tool
+):
+    """The ML and RAG tools overlap, so the node waits for the slower one only."""
+    mock_llm.ainvoke = AsyncMock(
+        return_value=MagicMock(
+            tool_calls=[
+                {"name": "run_fraud_detection_model", "args": {"transaction_data": {}}},
+                {"name": "query_databricks_vector_search", "args": {"query": "x"}},
+            ]
+        )
+    )
+    fraud_tool = _slow_tool('{"fraud_probability": 0.98}', 0.2)
+    rag_tool = _slow_tool('[{"content": "some context"}]', 0.2)
+    mock_fraud_tool.ainvoke = fraud_tool.ainvoke
+    mock_rag_tool.ainvoke = rag_tool.ainvoke
+
+    start = time.perf_counter()
+    result_state = await afraud_agent_node(
+        AgentState(input_data={"amount": 5000}, messages="")
+    )
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.35
+    assert result_state["ml_tool_output"] == '{"fraud_probability": 0.98}'
+    assert result_state["rag_context"] == '[{"content": "some context"}]'
+    rag_args = mock_rag_tool.ainvoke.call_args.args[0]
+    assert rag_args["index_name"] == settings.FRAUD_RAG_INDEX_NAME
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_credit_risk_model")
+@patch("gpt_risk.graph.credit_agent_llm")
+async def test_acredit_agent_node_times_out_slow_tool(
+    mock_llm, mock_credit_tool, mock_rag_tool, mock_settings
+):
+    """A tool that exceeds its timeout yields an error without failing the node."""
+    mock_settings.AGENT_TOOL_MODE = "llm"
+    mock_settings.TOOL_TIMEOUT_SECONDS = 0.05
+    mock_settings.CREDIT_RAG_INDEX_NAME = "credit_index"
+    mock_llm.ainvoke = AsyncMock(
+        return_value=MagicMock(
+            tool_calls=[
+                {
+                    "name": "run_credit_risk_model",
+                    "args": {"loan_application_data": {}},
+                },
+                {"name": "query_databricks_vector_search", "args": {"query": "x"}},
+            ]
+        )
+    )
+    mock_credit_tool.ainvoke = _slow_tool('{"default_probability": 0.05}', 0).ainvoke
+    mock_rag_tool.ainvoke = _slow_tool("[]", 1.0).ainvoke
+
+    result_state = await acredit_agent_node(
+        AgentState(input_data={"loan_amount": 10000}, messages="")
+    )
+
+    assert result_state["ml_tool_output"] == '{"default_probability": 0.05}'
+    assert "timed out" in json.loads(result_state["rag_context"])["error"]
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.synthesis_llm")
+async def test_asynthesis_node_handles_general_query(mock_synthesis_llm):
+    """General queries reach synthesis without any tool output in the state."""
+    mock_synthesis_llm.ainvoke = AsyncMock(return_value=MagicMock(content="Summary."))
+
+    result_state = await asynthesis_node(
+        AgentState(input_data={"q": "hi"}, request_type="general_query", messages="")
+    )
+
+    assert result_state["final_summary"] == "Summary."
+
+
+# --- Test Direct Tool Mode ---
+
+
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_fraud_detection_model")
+@patch("gpt_risk.graph.fraud_agent_llm")
+def test_fraud_agent_node_direct_mode_skips_llm(
+    mock_llm, mock_fraud_tool, mock_rag_tool, mock_settings
+):
+    """In direct mode the tool calls are built from the input, not by the LLM."""
+    mock_settings.AGENT_TOOL_MODE = "direct"
+    mock_settings.FRAUD_RAG_INDEX_NAME = "fraud_index"
+    mock_fraud_tool.invoke.return_value = '{"fraud_probability": 0.98}'
+    mock_rag_tool.invoke.return_value = "[]"
+    transaction = {"transaction_amount": 5000, "customer_id": "c1", "merchant_id": "m2"}
+
+    result_state = fraud_agent_node(AgentState(input_data=transaction, messages=""))
+
+    mock_llm.invoke.assert_not_called()
+    mock_fraud_tool.invoke.assert_called_once_with({"transaction_data": transaction})
+    mock_rag_tool.invoke.assert_called_once_with(
+        {
+            "query": "Historical fraud patterns for customer c1 and merchant m2",
+            "index_name": "fraud_index",
+        }
+    )
+    assert result_state["ml_tool_output"] == '{"fraud_probability": 0.98}'
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search")
+@patch("gpt_risk.graph.run_credit_risk_model")
+@patch("gpt_risk.graph.credit_agent_llm")
+async def test_acredit_agent_node_direct_mode_skips_llm(
+    mock_llm, mock_credit_tool, mock_rag_tool, mock_settings
+):
+    """Without identifiers the retrieval query falls back to the raw input."""
+    mock_settings.AGENT_TOOL_MODE = "direct"
+    mock_settings.TOOL_TIMEOUT_SECONDS = 1.0
+    mock_settings.CREDIT_RAG_INDEX_NAME = "credit_index"
+    mock_credit_tool.ainvoke = AsyncMock(return_value='{"default_probability": 0.05}')
+    mock_rag_tool.ainvoke = AsyncMock(return_value="[]")
+
+    result_state = await acredit_agent_node(
+        AgentState(input_data={"loan_amount": 10000}, messages="")
+    )
+
+    mock_llm.ainvoke.assert_not_called()
+    rag_args = mock_rag_tool.ainvoke.call_args.args[0]
+    assert rag_args["query"] == 'Financial history similar to: {"loan_amount": 10000}'
+    assert rag_args["index_name"] == "credit_index"
+    assert result_state["ml_tool_output"] == '{"default_probability": 0.05}'
+
+
+# --- Test Lazy LLM Initialization ---
+
+
+@patch("gpt_risk.graph.triage_llm", None)
+def test_llms_are_built_on_first_use_only():
+    build_triage_llm = MagicMock()
+    build_triage_llm.return_value.invoke.return_value = MagicMock(
+        content="general_query"
+    )
+    state = AgentState(input_data={"text_query": "hello"}, messages=[])
+
+    with patch.dict("gpt_risk.graph._LLM_FACTORIES", triage_llm=build_triage_llm):
+        triage_node(state)
+        triage_node(state)
+
+    build_triage_llm.assert_called_once()
+
+
+@patch.multiple(
+    "gpt_risk.graph",
+    triage_llm=None,
+    synthesis_llm=None,
+    small_synthesis_llm=None,
+    fraud_agent_llm=None,
+    credit_agent_llm=None,
+)
+def test_reset_llms_rebuilds_clients_on_next_use():
+    closed, rebuilt = MagicMock(), MagicMock()
+    for llm in (closed, rebuilt):
+        llm.invoke.return_value = MagicMock(content="general_query")
+    state = AgentState(input_data={"text_query": "hello"}, messages=[])
+
+    with patch.dict(
+        "gpt_risk.graph._LLM_FACTORIES",
+        triage_llm=MagicMock(side_effect=[closed, rebuilt]),
+    ):
+        triage_node(state)
+        reset_llms()
+        triage_node(state)
+
+    closed.invoke.assert_called_once()
+    rebuilt.invoke.assert_called_once()
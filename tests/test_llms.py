@@ -0,0 +1,148 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.app.config import settings
+from src.app.llms import (
+    ConcurrencyLimit,
+    RateLimit,
+    backoff_seconds,
+    get_gemini_llm,
+    get_llama_llm,
+    get_qwen_llm,
+    pooled_chat_model,
+    rate_limit,
+)
+
+
+def _result(text: str) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def _llm():
+    return pooled_chat_model(ChatOpenAI, "openai")(
+        model="test-model", api_key="x", max_retries=0
+    )
+
+
+def test_model_clients_are_built_once_per_config():
+    assert get_gemini_llm() is get_gemini_llm()
+    assert get_qwen_llm() is get_qwen_llm()
+
+
+def test_openai_compatible_models_share_pooled_http_clients():
+    qwen, llama = get_qwen_llm(), get_llama_llm()
+
+    assert qwen is not llama
+    assert qwen.http_client is llama.http_client
+    assert qwen.http_async_client is llama.http_async_client
+    assert qwen.root_client._client is qwen.http_client
+
+
+@patch("gpt_risk.llms.settings")
+def test_backoff_is_jittered_and_capped(mock_settings):
+    mock_settings.LLM_RETRY_BACKOFF_SECONDS = 1.0
+    mock_settings.LLM_RETRY_BACKOFF_MAX_SECONDS = 4.0
+
+    delays = [backoff_seconds(10) for _ in range(200)]
+
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_rate_limit_spaces_request_start_times():
+    limit = RateLimit(per_second=10)
+
+    delays = [limit.reserve() for _ in range(3)]
+
+    assert delays[0] == 0
+    assert delays[1] == pytest.approx(0.1, abs=0.01)
+    assert delays[2] == pytest.approx(0.2, abs=0.01)
+
+
+def test_rate_limit_is_shared_by_a_providers_endpoints():
+    qwen, llama = get_qwen_llm(), get_llama_llm()
+    rate_limit.cache_clear()
+
+    try:
+        with patch.object(settings, "LLM_PROVIDER_RATE_LIMITS", {"openai": 10}):
+            delays = [model._rate_limit_delay() for model in (qwen, llama)]
+    finally:
+        rate_limit.cache_clear()
+
+    assert delays[0] == 0
+    assert delays[1] == pytest.approx(0.1, abs=0.01)
+
+
+@patch("gpt_risk.llms.time.sleep")
+@patch.object(ChatOpenAI, "_generate")
+def test_transient_failures_are_retried(mock_generate, mock_sleep):
+    mock_generate.side_effect = [httpx.ConnectError("refused"), _result("ok")]
+
+    response = _llm().invoke("hello")
+
+    assert response.content == "ok"
+    assert mock_generate.call_count == 2
+    mock_sleep.assert_called_once()
+
+
+@patch("gpt_risk.llms.settings")
+@patch("gpt_risk.llms.time.sleep")
+@patch.object(ChatOpenAI, "_generate")
+def test_retries_are_bounded(mock_generate, mock_sleep, mock_settings):
+    mock_settings.LLM_MAX_RETRIES = 2
+    mock_settings.LLM_RETRY_BACKOFF_SECONDS = 0.0
+    mock_settings.LLM_RETRY_BACKOFF_MAX_SECONDS = 0.0
+    mock_generate.side_effect = httpx.ConnectError("refused")
+
+    with pytest.raises(httpx.ConnectError):
+        _llm().invoke("hello")
+
+    assert mock_generate.call_count == 3
+
+
+@patch("gpt_risk.llms.time.sleep")
+@patch.object(ChatOpenAI, "_generate")
+def test_other_errors_are_not_retried(mock_generate, mock_sleep):
+    mock_generate.side_effect = ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        _llm().invoke("hello")
+
+    assert mock_generate.call_count == 1
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.llms.asyncio.sleep")
+@patch.object(ChatOpenAI, "_agenerate")
+async def test_async_transient_failures_are_retried(mock_agenerate, mock_sleep):
+    mock_agenerate.side_effect = [httpx.ReadTimeout("slow"), _result("ok")]
+
+    response = await _llm().ainvoke("hello")
+
+    assert response.content == "ok"
+    assert mock_agenerate.call_count == 2
+
+
+def test_async_slots_work_across_event_loops():
+    limit = ConcurrencyLimit(1)
+
+    async def contend():
+        slots = limit.async_slots
+        await asyncio.gather(*(_hold(slots) for _ in range(3)))
+        return slots
+
+    first = asyncio.run(contend())
+    second = asyncio.run(contend())
+
+    assert first is not second
+
+
+async def _hold(slots):
+    async with slots:
+        await asyncio.sleep(0)
@@ -88,3 +88,70 @@ async def test_chat_endpoint_credit_risk(test_client):
         assert response.status_code == 200
         assert response.json() == {"response": "Low risk applicant."}
         mock_astream.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_chat_stream_endpoint(test_client):
+    """
+    The /chat/stream endpoint forwards tokens as server-sent events.
+    """
+
+    async def fake_stream_chat(query, thread_id, timings=False):
+        yield "token", {"text": "High risk "}
+        yield "token", {"text": "of fraud."}
+        yield "done", {"response": "High risk of fraud."}
+
+    with patch("gpt_risk.main.stream_chat", side_effect=fake_stream_chat):
+        response = await test_client.post(
+            "/chat/stream",
+            json={"query": FRAUD_TRANSACTION_PAYLOAD, "thread_id": "test_stream_789"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[-1] == {"response": "High risk of fraud."}
+    assert "".join(event.get("text", "") for event in events) == "High risk of fraud."
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint(test_client):
+    """/metrics serves the registered metrics in the Prometheus text format."""
+    response = await test_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE graph_span_duration_seconds histogram" in response.text
+
+
+@pytest.mark.anyio
+async def test_batch_endpoint_rejects_malformed_json(test_client):
+    """Malformed JSON or NDJSON bodies are a client error, not a server error."""
+    ndjson = await test_client.post(
+        "/score/fraud/batch",
+        content=json.dumps(FRAUD_TRANSACTION_PAYLOAD) + "\n{not json\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+    body = await test_client.post(
+        "/score/credit/batch",
+        content='{"records": [',
+        headers={"content-type": "application/json"},
+    )
+
+    assert ndjson.status_code == 422
+    assert body.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_batch_endpoint_rejects_non_object_records(test_client):
+    """Every record is checked before any result is streamed."""
+    response = await test_client.post(
+        "/score/fraud/batch", json={"records": [FRAUD_TRANSACTION_PAYLOAD, 42]}
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Record 1 is not a JSON object."
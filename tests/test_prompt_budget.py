@@ -0,0 +1,111 @@
+import json
+from unittest.mock import patch, MagicMock
+
+from langchain_core.messages import AIMessage
+
+from src.app.graph import synthesis_node
+from src.app.prompt_budget import (
+    count_tokens,
+    fit_documents,
+    fit_input,
+    relevant_input,
+    summarize_text,
+    token_usage,
+)
+from src.app.state import AgentState
+
+TRANSACTION = {
+    "transaction_id": "t1",
+    "customer_id": "c1",
+    "merchant_id": "m1",
+    "transaction_amount": 250.0,
+    "timestamp": "2024-01-01T03:00:00",
+    "device_fingerprint": "x" * 2000,
+}
+
+
+def test_relevant_input_keeps_model_fields_and_identifiers():
+    kept = relevant_input(TRANSACTION, "fraud_check")
+
+    assert "device_fingerprint" not in kept
+    assert kept["transaction_amount"] == 250.0
+    assert kept["merchant_id"] == "m1"
+    assert relevant_input(TRANSACTION, "general_query") == TRANSACTION
+
+
+def test_fit_input_truncates_long_text_to_the_budget():
+    fitted = fit_input({"text_query": "why? " * 500}, 50, "gemini")
+
+    assert count_tokens(fitted, "gemini") <= 50
+    assert json.loads(fitted)["text_query"].endswith("[...]")
+
+
+def test_fit_input_counts_each_field_once():
+    fields = {f"field_{i}": "value " * 10 for i in range(200)}
+
+    with patch("gpt_risk.prompt_budget.count_tokens", wraps=count_tokens) as counted:
+        fitted = fit_input(fields, 1000, "openai")
+
+    assert count_tokens(fitted, "openai") <= 1000
+    assert 0 < len(json.loads(fitted)) < 200
+    # Linear in the input: no call re-counts the fields kept so far.
+    assert max(len(call.args[0]) for call in counted.call_args_list) < 100
+
+
+def test_summarize_text_cuts_on_sentence_boundaries():
+    text = "First sentence. Second sentence. " + "Long tail " * 100
+
+    summary = summarize_text(text, 12, "gemini")
+
+    assert summary == "First sentence. Second sentence. [...]"
+    assert summarize_text("Short.", 12, "gemini") == "Short."
+
+
+def test_fit_documents_summarizes_and_packs_in_rank_order():
+    documents = [
+        {"source": f"doc-{i}", "content": "A fact. " + "More detail. " * 100}
+        for i in range(10)
+    ]
+
+    fitted = json.loads(fit_documents(json.dumps(documents), 200, 40, "gemini"))
+
+    assert 0 < len(fitted) < 10
+    assert [doc["source"] for doc in fitted] == [f"doc-{i}" for i in range(len(fitted))]
+    assert all(count_tokens(doc["content"], "gemini") <= 40 for doc in fitted)
+    assert fit_documents('{"error": "down"}', 200, 40, "gemini") == '{"error": "down"}'
+
+
+def test_token_usage_prefers_the_reported_counts():
+    reported = AIMessage(
+        "ok",
+        usage_metadata={"input_tokens": 120, "output_tokens": 7, "total_tokens": 127},
+    )
+
+    assert token_usage("synthesis", "gemini", [("prompt", reported)]) == {
+        "synthesis": {"prompt_tokens": 120, "completion_tokens": 7}
+    }
+    estimated = token_usage("triage", "openai", [("x" * 36, AIMessage("y" * 18))])
+    assert estimated == {"triage": {"prompt_tokens": 10, "completion_tokens": 5}}
+
+
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.synthesis_llm")
+def test_synthesis_prompt_stays_within_budget(mock_synthesis_llm, mock_settings):
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = False
+    mock_synthesis_llm.invoke.return_value = MagicMock(content="Summary.")
+    documents = [{"source": "kb", "content": "Detail. " * 2000} for _ in range(20)]
+
+    result = synthesis_node(
+        AgentState(
+            input_data=TRANSACTION,
+            request_type="fraud_check",
+            ml_tool_output='{"fraud_probability": 0.5}',
+            rag_context=json.dumps(documents),
+            messages=[],
+        )
+    )
+
+    prompt = mock_synthesis_llm.invoke.call_args.args[0]
+    assert "device_fingerprint" not in prompt
+    assert count_tokens(prompt, "gemini") < 2000
+    assert result["token_usage"]["synthesis"]["prompt_tokens"] < 2000
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.app import graph
+from src.app.checkpointer import MemoryCheckpointSaver
+from src.app.streaming import format_sse, parse_sse, stream_chat
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.triage_llm")
+@patch("gpt_risk.graph.synthesis_llm")
+async def test_stream_chat_forwards_synthesis_tokens(
+    mock_synthesis_llm, mock_triage_llm
+):
+    """Tokens from the synthesis LLM are forwarded as they are generated."""
+    fake_llm = GenericFakeChatModel(messages=iter([AIMessage("Low risk overall.")]))
+    mock_synthesis_llm.ainvoke = fake_llm.ainvoke
+    mock_triage_llm.ainvoke = GenericFakeChatModel(
+        messages=iter([AIMessage("general_query")])
+    ).ainvoke
+
+    events = await _collect(stream_chat({"text_query": "hello"}, "thread-1"))
+
+    tokens = [data["text"] for event, data in events if event == "token"]
+    # Triage output is not user-facing and must not leak into the stream.
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Low risk overall."
+    assert events[-1] == ("done", {"response": "Low risk overall."})
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.streaming.langgraph_app")
+async def test_stream_chat_falls_back_to_final_summary(mock_graph):
+    """A non-streaming LLM still produces one token event with the summary."""
+
+    async def astream(*args, **kwargs):
+        yield "messages", (
+            AIMessageChunk(content="triage"),
+            {"langgraph_node": "triage"},
+        )
+        yield "values", {"final_summary": "High risk of fraud detected."}
+
+    mock_graph.astream = MagicMock(side_effect=astream)
+
+    events = await _collect(stream_chat({"amount": 1}, "thread-2"))
+
+    assert events == [
+        ("token", {"text": "High risk of fraud detected."}),
+        ("done", {"response": "High risk of fraud detected."}),
+    ]
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.triage_llm")
+@patch("gpt_risk.graph.synthesis_llm")
+async def test_stream_chat_never_repeats_the_previous_turns_summary(
+    mock_synthesis_llm, mock_triage_llm
+):
+    """A turn whose synthesis produced nothing does not answer with the last one."""
+    mock_synthesis_llm.ainvoke = AsyncMock(
+        side_effect=[AIMessage("First answer."), AIMessage("")]
+    )
+    mock_triage_llm.ainvoke = AsyncMock(return_value=AIMessage("general_query"))
+    app = graph.workflow.compile(checkpointer=MemoryCheckpointSaver())
+
+    with patch("gpt_risk.streaming.langgraph_app", app):
+        first = await _collect(stream_chat({"text_query": "hello"}, "thread-3"))
+        second = await _collect(stream_chat({"text_query": "hello"}, "thread-3"))
+
+    assert first[-1] == ("done", {"response": "First answer."})
+    assert second == [("done", {"response": ""})]
+
+
+@pytest.mark.anyio
+async def test_sse_round_trip():
+    body = format_sse("token", {"text": "a\nb"}) + format_sse("done", {"response": "x"})
+
+    async def lines():
+        for line in body.split("\n"):
+            yield line
+
+    assert await _collect(parse_sse(lines())) == [
+        ("token", {"text": "a\nb"}),
+        ("done", {"response": "x"}),
+    ]
@@ -0,0 +1,120 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.app.graph import synthesis_node, asynthesis_node
+from src.app.state import AgentState
+from src.app.synthesis_cascade import (
+    LARGE_TIER,
+    SMALL_TIER,
+    TEMPLATE_TIER,
+    assessment_verdict,
+    first_tier,
+    needs_escalation,
+    template_summary,
+)
+
+GOOD_SUMMARY = (
+    "1.  **Overall Assessment:** Moderate risk.\n"
+    "2.  **Key Evidence:** The score is borderline.\n"
+    "3.  **Recommended Actions:** Review manually."
+)
+
+
+def _fraud_state(probability: float) -> AgentState:
+    return AgentState(
+        input_data={"transaction_id": "t1", "amount": 5000},
+        request_type="fraud_check",
+        ml_tool_output=(
+            f'{{"fraud_probability": {probability}, "model_version": "v1", '
+            f'"contributing_features": ["amount"]}}'
+        ),
+        rag_context='[{"content": "similar case", "source": "case-1"}]',
+        messages="",
+    )
+
+
+def _cascade_settings(mock_settings):
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = True
+    mock_settings.SYNTHESIS_GRAY_ZONE_LOW = 0.1
+    mock_settings.SYNTHESIS_GRAY_ZONE_HIGH = 0.9
+
+
+def test_first_tier_follows_the_model_score():
+    general = AgentState(input_data={"q": "hi"}, request_type="general_query")
+    failed = AgentState(request_type="fraud_check", ml_tool_output='{"error": "x"}')
+
+    assert first_tier(_fraud_state(0.98), 0.1, 0.9) == TEMPLATE_TIER
+    assert first_tier(_fraud_state(0.02), 0.1, 0.9) == TEMPLATE_TIER
+    assert first_tier(_fraud_state(0.5), 0.1, 0.9) == SMALL_TIER
+    assert first_tier(general, 0.1, 0.9) == LARGE_TIER
+    assert first_tier(failed, 0.1, 0.9) == LARGE_TIER
+
+
+def test_template_summary_has_the_report_sections():
+    summary = template_summary(_fraud_state(0.98))
+
+    assert "High risk of fraud" in summary
+    assert "98.0%" in summary
+    assert "case-1" in summary
+    assert not needs_escalation(summary)
+    assert "Low risk of fraud" in template_summary(_fraud_state(0.02))
+
+
+def test_needs_escalation():
+    assert not needs_escalation(GOOD_SUMMARY)
+    assert needs_escalation("ESCALATE")
+    assert needs_escalation("**Overall Assessment:** Risky.")
+
+
+def test_assessment_verdict_reads_the_overall_assessment():
+    assert assessment_verdict(template_summary(_fraud_state(0.98))) is True
+    assert assessment_verdict(template_summary(_fraud_state(0.02))) is False
+    # Hedged or missing assessments have no verdict; evidence is not read.
+    assert assessment_verdict(GOOD_SUMMARY) is None
+    assert assessment_verdict("**Key Evidence:** High risk merchant.") is None
+    assert assessment_verdict(None) is None
+
+
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.small_synthesis_llm")
+@patch("gpt_risk.graph.synthesis_llm")
+def test_clear_cut_scores_skip_the_llms(mock_large, mock_small, mock_settings):
+    _cascade_settings(mock_settings)
+
+    result = synthesis_node(_fraud_state(0.98))
+
+    assert result["synthesis_tier"] == TEMPLATE_TIER
+    mock_small.invoke.assert_not_called()
+    mock_large.invoke.assert_not_called()
+
+
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.small_synthesis_llm")
+@patch("gpt_risk.graph.synthesis_llm")
+def test_small_tier_answers_gray_zone_scores(mock_large, mock_small, mock_settings):
+    _cascade_settings(mock_settings)
+    mock_small.invoke.return_value = MagicMock(content=GOOD_SUMMARY)
+
+    result = synthesis_node(_fraud_state(0.5))
+
+    assert result["final_summary"] == GOOD_SUMMARY
+    assert result["synthesis_tier"] == SMALL_TIER
+    mock_large.invoke.assert_not_called()
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.small_synthesis_llm")
+@patch("gpt_risk.graph.synthesis_llm")
+async def test_small_tier_escalates_when_unsure(mock_large, mock_small, mock_settings):
+    _cascade_settings(mock_settings)
+    mock_small.ainvoke = AsyncMock(return_value=MagicMock(content="ESCALATE"))
+    mock_large.ainvoke = AsyncMock(return_value=MagicMock(content="Full report."))
+
+    result = await asynthesis_node(_fraud_state(0.5))
+
+    assert result["final_summary"] == "Full report."
+    assert result["synthesis_tier"] == LARGE_TIER
+    mock_small.ainvoke.assert_called_once()
+    # The small tier's tokens are kept out of the user's stream.
+    assert "nostream" in mock_small.ainvoke.call_args.kwargs["config"]["tags"]
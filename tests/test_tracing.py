@@ -0,0 +1,86 @@
+import json
+
+import pytest
+from unittest.mock import patch
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.tools import tool
+
+from src.app import graph, metrics
+from src.app.checkpointer import MemoryCheckpointSaver
+from src.app.tracing import RequestTrace
+
+
+@tool
+def fake_fraud_model(transaction_data: dict) -> str:
+    """Scores a transaction."""
+    return json.dumps({"fraud_probability": 0.5})
+
+
+@tool
+def fake_vector_search(query: str, index_name: str) -> str:
+    """Finds related records."""
+    raise RuntimeError("index unavailable")
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.graph.settings")
+@patch("gpt_risk.graph.query_databricks_vector_search", fake_vector_search)
+@patch("gpt_risk.graph.run_fraud_detection_model", fake_fraud_model)
+async def test_trace_has_spans_per_node_llm_and_tool_call(mock_settings):
+    mock_settings.AGENT_TOOL_MODE = "direct"
+    mock_settings.FAST_TRIAGE_ENABLED = True
+    mock_settings.FAST_TRIAGE_CONFIDENCE_THRESHOLD = 0.9
+    mock_settings.TOOL_TIMEOUT_SECONDS = 5.0
+    mock_settings.FRAUD_RAG_INDEX_NAME = "fraud_index"
+    mock_settings.SYNTHESIS_CASCADE_ENABLED = False
+    trace = RequestTrace()
+    app = graph.workflow.compile(checkpointer=MemoryCheckpointSaver())
+
+    with patch("gpt_risk.graph.synthesis_llm", FakeListChatModel(responses=["Ok."])):
+        await app.ainvoke(
+            {
+                "input_data": {
+                    "transaction_id": "t1",
+                    "merchant_id": "m1",
+                    "transaction_amount": 10.0,
+                },
+                "messages": [],
+            },
+            {"configurable": {"thread_id": "t1"}, "callbacks": [trace]},
+        )
+
+    spans = trace.breakdown()["spans"]
+    assert [span["name"] for span in spans if span["kind"] == "node"] == [
+        "triage",
+        "fraud_agent",
+        "synthesis",
+    ]
+    tools = {span["name"]: span for span in spans if span["kind"] == "tool"}
+    assert tools["fake_fraud_model"]["node"] == "fraud_agent"
+    assert tools["fake_fraud_model"]["bytes_out"] > 0
+    assert "index unavailable" in tools["fake_vector_search"]["error"]
+    (llm,) = [span for span in spans if span["kind"] == "llm"]
+    assert llm["node"] == "synthesis"
+    assert llm["bytes_in"] > 0
+    assert all(span["duration_ms"] >= 0 for span in spans)
+
+
+def test_prometheus_text_exposes_counters_and_cumulative_buckets():
+    counter = metrics.counter("test_requests_total", "Requests.", ("route",))
+    histogram = metrics.histogram(
+        "test_latency_seconds", "Latency.", buckets=(0.1, 1.0), labelnames=("route",)
+    )
+    counter.inc(route='say "hi"')
+    histogram.observe(0.05, route="a")
+    histogram.observe(0.5, route="a")
+    histogram.observe(5.0, route="a")
+
+    text = metrics.prometheus_text()
+
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="say \\"hi\\""} 1' in text
+    assert 'test_latency_seconds_bucket{route="a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="a",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="a"} 3' in text
+    assert 'test_latency_seconds_sum{route="a"} 5.55' in text
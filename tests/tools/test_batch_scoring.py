@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import patch, MagicMock
+import json
+import numpy as np
+
+from src.app.tools.batch_scoring import (
+    ModelNotLoadedError,
+    score_fraud_batch,
+    score_credit_batch,
+    to_ndjson,
+)
+
+
+def _mock_model(probabilities):
+    """A model whose predict_proba returns the given positive-class probabilities."""
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda X: np.column_stack(
+        [1 - np.asarray(probabilities[: len(X)]), probabilities[: len(X)]]
+    )
+    return model
+
+
+@patch("gpt_risk.tools.batch_scoring.model_registry")
+def test_score_fraud_batch_chunks_and_preserves_order(mock_registry):
+    mock_model = _mock_model([0.1, 0.2, 0.3])
+    mock_registry.get.return_value = MagicMock(model=mock_model, version="v1")
+    records = [{"transaction_id": f"t{i}"} for i in range(5)]
+
+    results = list(score_fraud_batch(records, chunk_size=3))
+
+    # One predict_proba call per chunk, not per row.
+    assert mock_model.predict_proba.call_count == 2
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r["transaction_id"] for r in results] == ["t0", "t1", "t2", "t3", "t4"]
+    assert results[1]["fraud_probability"] == pytest.approx(0.2)
+    assert all(r["model_version"] == "v1" for r in results)
+
+
+@patch("gpt_risk.tools.batch_scoring.model_registry")
+def test_score_credit_batch_raises_when_model_missing(mock_registry):
+    mock_registry.get.return_value = None
+
+    with pytest.raises(ModelNotLoadedError):
+        score_credit_batch([{"application_id": "a1"}])
+
+
+def test_to_ndjson_emits_one_line_per_result():
+    results = [{"index": i} for i in range(3)]
+
+    chunks = list(to_ndjson(results, chunk_size=2))
+
+    assert len(chunks) == 2
+    lines = "".join(chunks).splitlines()
+    assert [json.loads(line) for line in lines] == results
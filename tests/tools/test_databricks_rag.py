@@ -3,7 +3,13 @@ from unittest.mock import patch, MagicMock
 import json
 
 # Import the tool to be tested
-from src.app.tools.databricks_rag import query_databricks_vector_search
+from src.app.config import settings
+from src.app.tools.local_vector_index import write_local_vector_index
+from src.app.tools.databricks_rag import (
+    invalidate_index,
+    query_databricks_vector_search,
+    vector_search_pool,
+)
 
 
 class MockDocument:
@@ -14,6 +20,16 @@ class MockDocument:
         self.metadata = metadata
 
 
+@pytest.fixture(autouse=True)
+def clear_vector_search_pool():
+    """Each test builds its own (mocked) clients and starts with empty caches."""
+    vector_search_pool.clear()
+    invalidate_index()
+    yield
+    vector_search_pool.clear()
+    invalidate_index()
+
+
 @patch("gpt_risk.tools.databricks_rag.DatabricksVectorSearch")
 @patch("gpt_risk.tools.databricks_rag.DatabricksEmbeddings")
 def test_query_databricks_vector_search_success(mock_embeddings, mock_dvs_client):
@@ -23,7 +39,10 @@ def test_query_databricks_vector_search_success(mock_embeddings, mock_dvs_client
     """
     # Setup mock retriever and its return value
     mock_retriever = MagicMock()
-    mock_retriever.invoke.return_value = []
+    mock_retriever.invoke.return_value = [
+        MockDocument("Doc 1 content", {"source": "doc1.pdf"}),
+        MockDocument("Doc 2 content", {"source": "doc2.pdf"}),
+    ]
 
     # The DatabricksVectorSearch instance will have the as_retriever method
     mock_dvs_instance = MagicMock()
@@ -41,7 +60,7 @@ def test_query_databricks_vector_search_success(mock_embeddings, mock_dvs_client
     mock_retriever.invoke.assert_called_with("customer history")
     assert isinstance(result, list)
     assert len(result) == 2
-    assert result["content"] == "Doc 1 content"
+    assert result[0]["content"] == "Doc 1 content"
     assert result[1]["source"] == "doc2.pdf"
 
 
@@ -61,3 +80,133 @@ def test_query_databricks_vector_search_failure(mock_embeddings, mock_dvs_client
 
     assert "error" in result
     assert "Connection failed" in result["error"]
+
+
+@patch("gpt_risk.tools.databricks_rag.DatabricksVectorSearch")
+@patch("gpt_risk.tools.databricks_rag.DatabricksEmbeddings")
+def test_query_databricks_vector_search_reuses_client(mock_embeddings, mock_dvs_client):
+    """The client for an index is built once and reused across queries."""
+    mock_retriever = MagicMock()
+    mock_retriever.invoke.return_value = []
+    mock_dvs_client.return_value.as_retriever.return_value = mock_retriever
+
+    for query in ("first", "second"):
+        query_databricks_vector_search.invoke(
+            {"query": query, "index_name": "test_index"}
+        )
+    query_databricks_vector_search.invoke(
+        {"query": "third", "index_name": "other_index"}
+    )
+
+    assert mock_dvs_client.call_count == 2
+    assert mock_retriever.invoke.call_count == 3
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.tools.databricks_rag.DatabricksVectorSearch")
+@patch("gpt_risk.tools.databricks_rag.DatabricksEmbeddings")
+async def test_query_databricks_vector_search_async(mock_embeddings, mock_dvs_client):
+    """The async path returns the same formatted documents."""
+    mock_retriever = MagicMock()
+    mock_retriever.invoke.return_value = [
+        MockDocument("Doc 1 content", {"source": "doc1.pdf"})
+    ]
+    mock_dvs_client.return_value.as_retriever.return_value = mock_retriever
+
+    result_str = await query_databricks_vector_search.ainvoke(
+        {"query": "customer history", "index_name": "test_index"}
+    )
+
+    assert json.loads(result_str) == [
+        {"source": "doc1.pdf", "content": "Doc 1 content"}
+    ]
+    mock_retriever.invoke.assert_called_once_with("customer history")
+
+
+@patch("gpt_risk.tools.databricks_rag.DatabricksVectorSearch")
+@patch("gpt_risk.tools.databricks_rag.DatabricksEmbeddings")
+def test_query_databricks_vector_search_caches_results(
+    mock_embeddings, mock_dvs_client
+):
+    """Repeated queries are served from the result cache until invalidated."""
+    mock_retriever = MagicMock()
+    mock_retriever.invoke.return_value = [
+        MockDocument("Doc 1 content", {"source": "doc1.pdf"})
+    ]
+    mock_dvs_client.return_value.as_retriever.return_value = mock_retriever
+    args = {"query": "customer history", "index_name": "test_index"}
+
+    first = query_databricks_vector_search.invoke(args)
+    second = query_databricks_vector_search.invoke(args)
+    assert first == second
+    assert mock_retriever.invoke.call_count == 1
+
+    assert invalidate_index("test_index") == 1
+    query_databricks_vector_search.invoke(args)
+    assert mock_retriever.invoke.call_count == 2
+
+
+@patch(
+    "gpt_risk.tools.databricks_rag.DatabricksVectorSearch",
+    side_effect=Exception("Connection failed"),
+)
+@patch("gpt_risk.tools.databricks_rag.DatabricksEmbeddings")
+def test_query_databricks_vector_search_does_not_cache_errors(
+    mock_embeddings, mock_dvs_client
+):
+    args = {"query": "customer history", "index_name": "test_index"}
+
+    query_databricks_vector_search.invoke(args)
+    query_databricks_vector_search.invoke(args)
+
+    assert mock_dvs_client.call_count == 2
+
+
+@patch("gpt_risk.tools.databricks_rag._embed_query", return_value=[1.0, 0.0])
+@patch("gpt_risk.tools.databricks_rag.model_registry")
+@patch("gpt_risk.tools.databricks_rag.DatabricksVectorSearch")
+def test_query_databricks_vector_search_uses_local_index(
+    mock_dvs_client, mock_registry, mock_embed, tmp_path
+):
+    """Indexes listed in RAG_LOCAL_INDEXES are answered from the local mirror."""
+    index = write_local_vector_index(
+        str(tmp_path),
+        [
+            {"id": "1", "content": "Merchant m1 chargebacks", "source": "kb1"},
+            {"id": "2", "content": "Unrelated", "source": "kb2"},
+        ],
+        [[1.0, 0.1], [0.0, 1.0]],
+    )
+    mock_registry.get.return_value = MagicMock(model=index)
+
+    with patch.object(settings, "RAG_LOCAL_INDEXES", ["local_index"]):
+        result = json.loads(
+            query_databricks_vector_search.invoke(
+                {"query": "merchant m1", "index_name": "local_index"}
+            )
+        )
+
+    assert result[0] == {"source": "kb1", "content": "Merchant m1 chargebacks"}
+    mock_dvs_client.assert_not_called()
+
+
+@patch("gpt_risk.tools.databricks_rag._embed_query", return_value=[1.0, 0.0])
+@patch("gpt_risk.tools.databricks_rag.model_registry")
+def test_query_databricks_vector_search_drops_results_of_replaced_mirror(
+    mock_registry, mock_embed, tmp_path
+):
+    """A synced mirror has a new version, so results cached before it are unused."""
+    documents = [{"id": "1", "content": "Old text", "source": "kb1"}]
+    old = write_local_vector_index(str(tmp_path), documents, [[1.0, 0.0]])
+    documents = [{"id": "1", "content": "New text", "source": "kb1"}]
+    new = write_local_vector_index(str(tmp_path), documents, [[1.0, 0.0]])
+    args = {"query": "merchant m1", "index_name": "local_index"}
+
+    with patch.object(settings, "RAG_LOCAL_INDEXES", ["local_index"]):
+        mock_registry.get.return_value = MagicMock(model=old, version="v1")
+        first = json.loads(query_databricks_vector_search.invoke(args))
+        mock_registry.get.return_value = MagicMock(model=new, version="v2")
+        second = json.loads(query_databricks_vector_search.invoke(args))
+
+    assert first[0]["content"] == "Old text"
+    assert second[0]["content"] == "New text"
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.app.tools.hybrid_retrieval import (
+    hybrid_search,
+    maximal_marginal_relevance,
+    reciprocal_rank_fusion,
+)
+from src.app.tools.local_vector_index import write_local_vector_index
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1], [1]])
+
+    assert [row for row, _ in fused] == [1, 3, 2]
+
+
+def test_mmr_drops_near_duplicates():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    picked = maximal_marginal_relevance(vectors, np.array([1.0, 0.9, 0.5]), k=3)
+
+    assert picked == [0, 2]
+
+
+def _index(tmp_path):
+    documents = [
+        {"id": "1", "content": "Merchant m54321 chargeback spike", "source": "a"},
+        {"id": "2", "content": "Merchant m54321 chargeback spike", "source": "b"},
+        {"id": "3", "content": "Merchant m54321 refund abuse", "source": "c"},
+        {"id": "4", "content": "Card testing on electronics merchants", "source": "d"},
+    ]
+    vectors = [[1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.7, 0.7, 0.0], [0.0, 0.0, 1.0]]
+    return write_local_vector_index(str(tmp_path), documents, vectors)
+
+
+def test_hybrid_search_skips_embedding_for_id_lookups(tmp_path):
+    embed_query = MagicMock()
+
+    hits = hybrid_search(_index(tmp_path), "merchant m54321", embed_query, k=3)
+
+    embed_query.assert_not_called()
+    # The duplicate of the best document is dropped, so only two remain.
+    assert [document["source"] for document, _ in hits] == ["a", "c"]
+
+
+def test_hybrid_search_fuses_dense_results(tmp_path):
+    embed_query = MagicMock(return_value=[0.0, 0.0, 1.0])
+
+    hits = hybrid_search(_index(tmp_path), "suspicious night purchases", embed_query)
+
+    embed_query.assert_called_once()
+    assert hits[0][0]["source"] == "d"
@@ -0,0 +1,50 @@
+import pytest
+import threading
+
+from src.app.tools.inference_executor import InferenceExecutor
+
+
+def _square(x):
+    return x * x
+
+
+@pytest.mark.anyio
+async def test_run_offloads_to_worker_thread():
+    executor = InferenceExecutor(mode="thread", max_workers=2)
+    caller = threading.get_ident()
+    try:
+        worker = await executor.run(threading.get_ident)
+        result = await executor.run(_square, 7)
+    finally:
+        executor.shutdown()
+
+    assert worker != caller
+    assert result == 49
+
+
+@pytest.mark.anyio
+async def test_stats_track_completed_and_failed_calls():
+    executor = InferenceExecutor(mode="thread", max_workers=1)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    try:
+        await executor.run(_square, 3)
+        with pytest.raises(RuntimeError):
+            await executor.run(fail)
+        stats = executor.stats()
+    finally:
+        executor.shutdown()
+
+    assert stats["submitted"] == 2
+    assert stats["completed"] == 2
+    assert stats["failed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["queue_depth"] == 0
+    assert 0.0 <= stats["utilization"] <= 1.0
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor(mode="gpu")
@@ -0,0 +1,35 @@
+from src.app.tools.lexical_index import BM25Index, id_tokens, tokenize
+
+DOCUMENTS = [
+    "Merchant m54321 had a spike of chargebacks in March.",
+    "Customer c67890 disputed two electronics purchases.",
+    "Electronics merchants see card testing at night.",
+    "Loan application a98765 was approved after review.",
+]
+
+
+def test_tokenize_and_id_tokens():
+    assert tokenize("Merchant M54321, MCC 5732!") == [
+        "merchant",
+        "m54321",
+        "mcc",
+        "5732",
+    ]
+    assert id_tokens("merchant m54321 mcc 5732 at 3am") == ["m54321", "5732", "3am"]
+
+
+def test_bm25_ranks_matching_documents():
+    index = BM25Index(DOCUMENTS)
+
+    rows, scores = index.search("electronics card testing", k=2)
+
+    assert list(rows) == [2, 1]
+    assert scores[0] > scores[1] > 0
+
+
+def test_id_matches_use_exact_postings():
+    index = BM25Index(DOCUMENTS)
+
+    assert list(index.id_matches("history for merchant m54321")) == [0]
+    assert list(index.id_matches("customer c67890 and merchant m54321")) == [0, 1]
+    assert len(index.id_matches("merchant m00000")) == 0
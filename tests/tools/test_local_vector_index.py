@@ -0,0 +1,98 @@
+import numpy as np
+
+from src.app.tools.local_vector_index import (
+    LocalVectorIndex,
+    load_local_vector_index,
+    sync_local_vector_index,
+    write_local_vector_index,
+)
+from src.app.tools.model_registry import ModelRegistry
+
+
+def _corpus(rows: int, dimension: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(20, dimension))
+    vectors = centers[rng.integers(0, 20, rows)] + rng.normal(size=(rows, dimension))
+    documents = [
+        {"id": f"d{i}", "content": f"doc {i}", "source": "kb"} for i in range(rows)
+    ]
+    return documents, vectors.astype(np.float32)
+
+
+def test_exact_search_ranks_by_cosine_similarity(tmp_path):
+    documents = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    vectors = [[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]]
+    index = write_local_vector_index(str(tmp_path), documents, vectors)
+
+    hits = index.search([10.0, 1.0], k=2)
+
+    assert [document["id"] for document, _ in hits] == ["a", "b"]
+    assert hits[0][1] > hits[1][1]
+    assert index.centroids is None
+    assert isinstance(LocalVectorIndex.load(str(tmp_path)).vectors, np.memmap)
+
+
+def test_ivf_search_matches_exact_search(tmp_path):
+    documents, vectors = _corpus(2000)
+    index = write_local_vector_index(str(tmp_path), documents, vectors, n_lists=16)
+    exact = LocalVectorIndex(index.vectors, index.documents, index.meta)
+
+    recall = []
+    for query in vectors[:50]:
+        expected = {document["id"] for document, _ in exact.search(query, k=5)}
+        found = {document["id"] for document, _ in index.search(query, 5, n_probe=4)}
+        recall.append(len(expected & found) / 5)
+
+    assert index.meta["n_lists"] == 16
+    assert np.mean(recall) > 0.9
+
+
+def test_delta_sync_upserts_and_deletes(tmp_path):
+    directory = str(tmp_path)
+    documents, vectors = _corpus(100)
+    write_local_vector_index(directory, documents, vectors, n_lists=4)
+
+    changed = {"id": "d0", "content": "updated", "source": "kb"}
+    added = {"id": "new", "content": "added", "source": "kb"}
+    index = sync_local_vector_index(
+        directory,
+        upserts=[(changed, vectors[0]), (added, vectors[1])],
+        deleted_ids=["d2"],
+    )
+
+    ids = {document["id"] for document in index.documents}
+    assert index.size == 100
+    assert "d2" not in ids and "new" in ids
+    assert index.search(vectors[0], k=1, n_probe=4)[0][0]["content"] == "updated"
+    # Centroids are reused until the index doubles in size.
+    assert index.meta["n_lists"] == 4 and index.meta["trained_size"] == 100
+
+
+def test_registry_reloads_after_a_sync_that_keeps_the_size(tmp_path):
+    documents, vectors = _corpus(10)
+    write_local_vector_index(str(tmp_path / "kb"), documents, vectors)
+    registry = ModelRegistry(str(tmp_path))
+    registry.register("kb", "kb/meta.json", loader=load_local_vector_index)
+    before = registry.get("kb")
+
+    changed = {"id": "d0", "content": "updated", "source": "kb"}
+    sync_local_vector_index(str(tmp_path / "kb"), [(changed, vectors[0])], [])
+
+    assert registry.refresh() == ["kb"]
+    after = registry.get("kb")
+    assert after.version != before.version
+    assert after.model.size == before.model.size
+    assert after.model.search(vectors[0], k=1)[0][0]["content"] == "updated"
+
+
+def test_registry_does_not_count_the_mapped_vectors(tmp_path):
+    documents, vectors = _corpus(200)
+    write_local_vector_index(str(tmp_path / "kb"), documents, vectors, n_lists=4)
+    registry = ModelRegistry(str(tmp_path))
+    registry.register("kb", "kb/meta.json", loader=load_local_vector_index)
+
+    loaded = registry.get("kb")
+
+    index = loaded.model
+    assert isinstance(index.vectors, np.memmap)
+    assert loaded.memory_bytes == index.centroids.nbytes + index.list_offsets.nbytes
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from src.app.tools.micro_batcher import MicroBatcher
+
+
+def _recording_predict(calls):
+    """A predict_fn that records each batch and returns row * model multiplier."""
+
+    def predict(model, records):
+        calls.append((model, [r["x"] for r in records]))
+        return [r["x"] * model for r in records]
+
+    return predict
+
+
+def test_concurrent_submissions_are_coalesced_into_one_batch():
+    calls = []
+    batcher = MicroBatcher("test", _recording_predict(calls), window_ms=200)
+    try:
+        futures = [batcher.submit({"x": i}, 10) for i in range(5)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert results == [0, 10, 20, 30, 40]
+    assert calls == [(10, [0, 1, 2, 3, 4])]
+
+
+def test_batches_are_capped_at_max_rows():
+    calls = []
+    batcher = MicroBatcher(
+        "test_cap", _recording_predict(calls), window_ms=200, max_batch_rows=2
+    )
+    try:
+        futures = [batcher.submit({"x": i}, 1) for i in range(5)]
+        assert [future.result(timeout=5) for future in futures] == [0, 1, 2, 3, 4]
+    finally:
+        batcher.stop()
+
+    assert [len(rows) for _, rows in calls] == [2, 2, 1]
+
+
+def test_requests_are_grouped_by_model_snapshot():
+    calls = []
+    batcher = MicroBatcher("test_groups", _recording_predict(calls), window_ms=200)
+    try:
+        old = batcher.submit({"x": 1}, 1)
+        new = batcher.submit({"x": 1}, 2)
+        assert old.result(timeout=5) == 1
+        assert new.result(timeout=5) == 2
+    finally:
+        batcher.stop()
+
+    assert sorted(calls) == [(1, [1]), (2, [1])]
+
+
+def test_predict_errors_are_propagated_to_every_caller():
+    def failing_predict(model, records):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher("test_errors", failing_predict, window_ms=50)
+    try:
+        futures = [batcher.submit({"x": i}, None) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="model exploded"):
+                future.result(timeout=5)
+    finally:
+        batcher.stop()
+
+    stats = batcher.stats()
+    assert stats["batches"] >= 1
+    assert stats["queue_depth"] == 0
+
+
+def test_missing_results_fail_the_remaining_callers():
+    def short_predict(model, records):
+        return [r["x"] for r in records][:-1]
+
+    batcher = MicroBatcher("test_short", short_predict, window_ms=200)
+    try:
+        futures = [batcher.submit({"x": i}, None) for i in range(3)]
+        assert [future.result(timeout=5) for future in futures[:2]] == [0, 1]
+        with pytest.raises(ValueError, match="2 results for 3 records"):
+            futures[2].result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_stop_scores_requests_queued_behind_it():
+    entered, release = threading.Event(), threading.Event()
+
+    def blocking_predict(model, records):
+        entered.set()
+        release.wait(timeout=5)
+        return [r["x"] for r in records]
+
+    batcher = MicroBatcher("test_stop", blocking_predict, window_ms=0)
+    first = batcher.submit({"x": 1}, None)
+    assert entered.wait(timeout=5)
+    stopper = threading.Thread(target=batcher.stop)
+    stopper.start()
+    while batcher.stats()["queue_depth"] == 0:  # The stop sentinel is queued.
+        time.sleep(0.001)
+    late = batcher.submit({"x": 2}, None)
+    release.set()
+    stopper.join(timeout=5)
+
+    assert first.result(timeout=5) == 1
+    assert late.result(timeout=0) == 2
+
+
+def test_cancelled_requests_are_skipped_and_the_worker_survives():
+    calls = []
+    entered, release = threading.Event(), threading.Event()
+
+    def blocking_predict(model, records):
+        calls.append([r["x"] for r in records])
+        entered.set()
+        release.wait(timeout=5)
+        return [r["x"] for r in records]
+
+    batcher = MicroBatcher("test_cancel", blocking_predict, window_ms=0)
+    try:
+        first = batcher.submit({"x": 1}, None)
+        assert entered.wait(timeout=5)
+        # Queued behind the running batch, then abandoned by its caller.
+        abandoned = batcher.submit({"x": 2}, None)
+        assert abandoned.cancel()
+        release.set()
+
+        assert first.result(timeout=5) == 1
+        assert batcher.submit({"x": 3}, None).result(timeout=5) == 3
+    finally:
+        batcher.stop()
+
+    assert [2] not in calls
+
+
+def test_a_dead_worker_is_replaced_on_submit():
+    batcher = MicroBatcher("test_restart", _recording_predict([]), window_ms=0)
+    try:
+        assert batcher.submit({"x": 1}, 2).result(timeout=5) == 2
+        batcher._queue.put(None)  # The worker exits as if it had crashed.
+        batcher._worker.join(timeout=5)
+
+        assert batcher.submit({"x": 2}, 2).result(timeout=5) == 4
+    finally:
+        batcher.stop()
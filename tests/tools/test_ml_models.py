@@ -1,71 +1,119 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 import json
 import pandas as pd
 import numpy as np
+import joblib
+from sklearn.linear_model import LogisticRegression
 
 # Import the tools to be tested
-from src.app.tools.ml_models import run_fraud_detection_model, run_credit_risk_model
+from src.app.features import CREDIT_FEATURE_SPEC, FRAUD_FEATURE_SPEC, FeatureSkewError
+from src.app.tools.ml_models import (
+    _verified_loader,
+    run_fraud_detection_model,
+    run_credit_risk_model,
+)
 
 # Sample data for tool inputs
 SAMPLE_TRANSACTION = {"transaction_amount": 100.0}
 SAMPLE_LOAN_APP = {"loan_amount": 20000}
 
 
-@patch("joblib.load")
-@patch("os.path.exists", return_value=True)
-def test_run_fraud_detection_model_success(mock_exists, mock_joblib_load):
+@patch("gpt_risk.tools.ml_models.model_registry")
+def test_run_fraud_detection_model_success(mock_registry):
     """
     Unit test for the fraud detection tool on a successful run.
-    Mocks the model loading to avoid file system dependency.
+    Mocks the model registry to avoid file system dependency.
     """
     # Create a mock model object
     mock_model = MagicMock()
     mock_model.predict_proba.return_value = np.array(
         [[0.1, 0.9]]
     )  # [prob_class_0, prob_class_1]
-    mock_joblib_load.return_value = mock_model
+    mock_registry.get.return_value = MagicMock(model=mock_model, version="abc123")
 
     # Call the tool
-    result_str = run_fraud_detection_model.invoke(SAMPLE_TRANSACTION)
+    result_str = run_fraud_detection_model.invoke(
+        {"transaction_data": SAMPLE_TRANSACTION}
+    )
     result = json.loads(result_str)
 
     # Assertions
-    mock_exists.assert_called_once()
-    mock_joblib_load.assert_called_once()
+    mock_registry.get.assert_called_once_with("fraud_detection")
     mock_model.predict_proba.assert_called_once()
     assert "fraud_probability" in result
     assert result["fraud_probability"] == 0.9
+    assert result["model_version"] == "abc123"
 
 
-@patch("os.path.exists", return_value=False)
-def test_run_fraud_detection_model_not_found(mock_exists):
+@patch("gpt_risk.tools.ml_models.model_registry")
+def test_run_fraud_detection_model_not_found(mock_registry):
     """
     Unit test for the fraud detection tool when the model file is not found.
     """
-    result_str = run_fraud_detection_model.invoke(SAMPLE_TRANSACTION)
+    mock_registry.get.return_value = None
+
+    result_str = run_fraud_detection_model.invoke(
+        {"transaction_data": SAMPLE_TRANSACTION}
+    )
     result = json.loads(result_str)
 
-    mock_exists.assert_called_once()
+    mock_registry.get.assert_called_once()
     assert "error" in result
     assert "not found" in result["error"]
 
 
-@patch("joblib.load")
-@patch("os.path.exists", return_value=True)
-def test_run_credit_risk_model_success(mock_exists, mock_joblib_load):
+@patch("gpt_risk.tools.ml_models.model_registry")
+def test_run_credit_risk_model_success(mock_registry):
     """
     Unit test for the credit risk tool on a successful run.
     """
     mock_model = MagicMock()
     mock_model.predict_proba.return_value = np.array([[0.88, 0.12]])
-    mock_joblib_load.return_value = mock_model
+    mock_registry.get.return_value = MagicMock(model=mock_model, version="def456")
 
-    result_str = run_credit_risk_model.invoke(SAMPLE_LOAN_APP)
+    result_str = run_credit_risk_model.invoke(
+        {"loan_application_data": SAMPLE_LOAN_APP}
+    )
     result = json.loads(result_str)
 
-    mock_exists.assert_called_once()
-    mock_joblib_load.assert_called_once()
+    mock_registry.get.assert_called_once_with("credit_risk")
     mock_model.predict_proba.assert_called_once()
     assert "default_probability" in result
     assert result["default_probability"] == 0.12
+
+
+@pytest.mark.anyio
+@patch("gpt_risk.tools.ml_models.inference_executor")
+@patch("gpt_risk.tools.ml_models.settings")
+@patch("gpt_risk.tools.ml_models.model_registry")
+async def test_run_fraud_detection_model_async_offloads_scoring(
+    mock_registry, mock_settings, mock_executor
+):
+    """
+    The async entry point scores on the inference executor instead of the event loop.
+    """
+    mock_registry.get.return_value = MagicMock(model=MagicMock(), version="abc123")
+    mock_settings.MICRO_BATCH_ENABLED = False
+    mock_executor.mode = "thread"
+    mock_executor.run = AsyncMock(return_value=[0.75])
+
+    result_str = await run_fraud_detection_model.ainvoke(
+        {"transaction_data": SAMPLE_TRANSACTION}
+    )
+    result = json.loads(result_str)
+
+    mock_executor.run.assert_awaited_once()
+    assert result["fraud_probability"] == 0.75
+    assert result["model_version"] == "abc123"
+
+
+def test_models_trained_on_another_feature_spec_fail_to_load(tmp_path):
+    path = str(tmp_path / "credit_risk_model.joblib")
+    load = _verified_loader(CREDIT_FEATURE_SPEC)
+
+    joblib.dump(CREDIT_FEATURE_SPEC.stamp(LogisticRegression()), path)
+    assert isinstance(load(path), LogisticRegression)
+    joblib.dump(FRAUD_FEATURE_SPEC.stamp(LogisticRegression()), path)
+    with pytest.raises(FeatureSkewError):
+        load(path)
@@ -0,0 +1,93 @@
+import os
+import joblib
+import pytest
+
+from src.app.tools.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """A registry over a temporary model directory with one registered model."""
+    registry = ModelRegistry(str(tmp_path))
+    registry.register("fraud_detection", "fraud.joblib")
+    return registry
+
+
+def _write_model(registry, payload):
+    path = registry.path_for("fraud_detection")
+    joblib.dump(payload, path)
+    return path
+
+
+def test_get_returns_none_when_model_missing(registry):
+    assert registry.get("fraud_detection") is None
+
+
+def test_preload_loads_once_and_reports_stats(registry):
+    _write_model(registry, {"weights": [1, 2, 3]})
+
+    loaded = registry.preload()["fraud_detection"]
+
+    assert loaded.model == {"weights": [1, 2, 3]}
+    # Subsequent gets are served from memory.
+    assert registry.get("fraud_detection") is loaded
+
+    stats = registry.stats()["fraud_detection"]
+    assert stats["version"] == loaded.version
+    assert stats["memory_bytes"] > 0
+    assert stats["load_time_ms"] >= 0
+
+
+def test_refresh_swaps_changed_model_and_keeps_old_snapshot(registry):
+    path = _write_model(registry, {"weights": [1]})
+    in_flight = registry.get("fraud_detection")
+
+    _write_model(registry, {"weights": [2]})
+    # Force a visible mtime change even on coarse-grained filesystems.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.refresh() == ["fraud_detection"]
+    current = registry.get("fraud_detection")
+    assert current.model == {"weights": [2]}
+    assert current.version != in_flight.version
+    # The snapshot held by an in-flight request is untouched.
+    assert in_flight.model == {"weights": [1]}
+
+
+def test_refresh_ignores_touch_without_content_change(registry):
+    path = _write_model(registry, {"weights": [1]})
+    loaded = registry.get("fraud_detection")
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.refresh() == []
+    assert registry.get("fraud_detection").version == loaded.version
+
+
+def test_a_file_that_fails_to_load_is_reported_missing_until_it_changes(registry):
+    path = registry.path_for("fraud_detection")
+    with open(path, "wb") as f:
+        f.write(b"not a joblib file")
+
+    assert registry.get("fraud_detection") is None
+    assert registry.refresh() == []
+
+    _write_model(registry, {"weights": [1]})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.get("fraud_detection").model == {"weights": [1]}
+
+
+def test_a_failed_reload_keeps_the_current_version(registry):
+    path = _write_model(registry, {"weights": [1]})
+    loaded = registry.get("fraud_detection")
+
+    with open(path, "wb") as f:
+        f.write(b"half-written")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert registry.refresh() == []
+    assert registry.get("fraud_detection") is loaded
@@ -0,0 +1,63 @@
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.app.tools.rag_cache import CachedEmbeddings, EmbeddingCache, ResultCache
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", [1.0, 2.0])
+    cache.put("b", [3.0, 4.0])
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", [5.0, 6.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a").dtype == np.float16
+    assert cache.stats()["size"] == 2
+
+
+def test_embedding_cache_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "embeddings.npz")
+    cache = EmbeddingCache()
+    cache.put("merchant m1", [0.25, -0.5, 1.0])
+    cache.put("customer c1", [0.125, 0.75, -1.0])
+    cache.save(path)
+
+    restored = EmbeddingCache()
+    assert restored.load(path) == 2
+    np.testing.assert_array_equal(restored.get("customer c1"), [0.125, 0.75, -1.0])
+    assert restored.load(str(tmp_path / "missing.npz")) == 0
+
+
+def test_cached_embeddings_skip_repeated_queries():
+    inner = MagicMock()
+    inner.embed_query.return_value = [0.5, 0.25]
+    embeddings = CachedEmbeddings(inner, EmbeddingCache())
+
+    assert embeddings.embed_query("history") == [0.5, 0.25]
+    assert embeddings.embed_query("history") == [0.5, 0.25]
+    inner.embed_query.assert_called_once_with("history")
+
+
+def test_result_cache_expires_entries():
+    cache = ResultCache(ttl_seconds=0.05)
+    cache.put("index", "query", 3, "[]")
+
+    assert cache.get("index", "query", 3) == "[]"
+    assert cache.get("index", "query", 5) is None
+    time.sleep(0.1)
+    assert cache.get("index", "query", 3) is None
+
+
+def test_result_cache_bounds_size_and_invalidates_per_index():
+    cache = ResultCache(max_entries=2)
+    cache.put("fraud", "q1", 3, "1")
+    cache.put("credit", "q2", 3, "2")
+    cache.put("fraud", "q3", 3, "3")
+
+    assert cache.get("fraud", "q1", 3) is None
+    assert cache.invalidate("fraud") == 1
+    assert cache.get("credit", "q2", 3) == "2"
+    assert cache.invalidate() == 1
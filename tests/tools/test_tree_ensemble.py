@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+
+from src.app.tools.tree_ensemble import CompiledTreeEnsemble, export_xgboost_trees
+
+
+def _two_stump_ensemble():
+    """
+    Tree 0: x0 < 0.5 ? 1.0 : -1.0 (missing goes right)
+    Tree 1: x1 < 2.0 ? 0.5 : 0.25 (missing goes left)
+    """
+    arrays = {
+        "feature": np.array([0, 0, 0, 1, 0, 0], dtype=np.int32),
+        "threshold": np.array(
+            [0.5, np.inf, np.inf, 2.0, np.inf, np.inf], dtype=np.float32
+        ),
+        "left": np.array([1, 1, 2, 4, 4, 5], dtype=np.int32),
+        "default_left": np.array([False, True, True, True, True, True]),
+        "value": np.array([0.0, 1.0, -1.0, 0.0, 0.5, 0.25], dtype=np.float32),
+    }
+    meta = {"max_depth": 1, "base_margin": 0.0, "n_features": 2}
+    return CompiledTreeEnsemble(arrays, np.array([0, 3], dtype=np.int32), meta)
+
+
+def test_predict_margin_sums_leaves_across_trees():
+    ensemble = _two_stump_ensemble()
+    X = np.array([[0.0, 0.0], [1.0, 3.0], [np.nan, np.nan]], dtype=np.float32)
+
+    margin = ensemble.predict_margin(X)
+
+    np.testing.assert_allclose(margin, [1.5, -0.75, -0.5])
+
+
+def test_predict_proba_is_sigmoid_of_margin():
+    ensemble = _two_stump_ensemble()
+    X = np.array([[0.0, 0.0]], dtype=np.float32)
+
+    proba = ensemble.predict_proba(X)
+
+    assert proba.shape == (1, 2)
+    assert proba[0, 1] == pytest.approx(1 / (1 + np.exp(-1.5)), rel=1e-6)
+    assert proba[0].sum() == pytest.approx(1.0)
+
+
+def test_export_matches_xgboost_predict_proba(tmp_path):
+    xgb = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+
+    ensemble = export_xgboost_trees(model, str(tmp_path))
+
+    X_test = rng.normal(size=(300, 4)).astype(np.float32)
+    X_test[::5, 2] = np.nan
+    np.testing.assert_allclose(
+        ensemble.predict_proba(X_test), model.predict_proba(X_test), atol=1e-5
+    )
+    # Reloading memory-maps the same arrays.
+    reloaded = CompiledTreeEnsemble.load(str(tmp_path))
+    assert isinstance(reloaded.feature, np.memmap)
+    np.testing.assert_array_equal(
+        reloaded.predict_proba(X_test), ensemble.predict_proba(X_test)
+    )
+
+
+def test_reexport_leaves_a_loaded_ensemble_serving_its_own_trees(tmp_path):
+    xgb = pytest.importorskip("xgboost")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] > 0).astype(int)
+    old_model = xgb.XGBClassifier(n_estimators=20, max_depth=3).fit(X, y)
+    new_model = xgb.XGBClassifier(n_estimators=50, max_depth=5).fit(X, 1 - y)
+    export_xgboost_trees(old_model, str(tmp_path))
+    serving = CompiledTreeEnsemble.load(str(tmp_path))
+    expected = serving.predict_proba(X)
+
+    export_xgboost_trees(new_model, str(tmp_path))
+
+    np.testing.assert_array_equal(serving.predict_proba(X), expected)
+    reloaded = CompiledTreeEnsemble.load(str(tmp_path))
+    np.testing.assert_allclose(
+        reloaded.predict_proba(X), new_model.predict_proba(X), atol=1e-5
+    )
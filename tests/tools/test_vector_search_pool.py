@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.app.tools.vector_search_pool import VectorSearchPool
+
+
+def _factory(invoke=None):
+    """A factory that records every client it builds."""
+    built = []
+
+    def factory(index_name):
+        client = MagicMock()
+        client.invoke.side_effect = invoke or (lambda query: [query])
+        built.append(index_name)
+        return client
+
+    return factory, built
+
+
+def test_pool_builds_one_client_per_index():
+    factory, built = _factory()
+    pool = VectorSearchPool(factory)
+
+    assert pool.query("a", "q1") == ["q1"]
+    assert pool.query("a", "q2") == ["q2"]
+    assert pool.query("b", "q3") == ["q3"]
+
+    assert built == ["a", "b"]
+    assert pool.stats()["a"]["queries"] == 2
+
+
+def test_pool_rebuilds_stale_client():
+    factory, built = _factory()
+    pool = VectorSearchPool(factory, max_age_seconds=0.05)
+
+    pool.query("a", "q")
+    time.sleep(0.1)
+    pool.query("a", "q")
+
+    assert built == ["a", "a"]
+
+
+def test_pool_rebuilds_unhealthy_client():
+    factory, built = _factory(invoke=MagicMock(side_effect=ConnectionError("down")))
+    pool = VectorSearchPool(factory, max_consecutive_failures=2)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            pool.query("a", "q")
+
+    # The third query found two consecutive failures and used a new client.
+    assert built == ["a", "a"]
+
+
+def test_pool_builds_once_under_concurrent_misses():
+    def slow_factory(index_name):
+        time.sleep(0.05)
+        built.append(index_name)
+        return MagicMock()
+
+    built = []
+    pool = VectorSearchPool(slow_factory)
+    threads = [threading.Thread(target=pool.query, args=("a", "q")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert built == ["a"]
+
+
+@pytest.mark.anyio
+async def test_pool_bounds_concurrent_async_queries():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def invoke(query):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return [query]
+
+    factory, _ = _factory(invoke=invoke)
+    pool = VectorSearchPool(factory, max_connections=2)
+    try:
+        results = await asyncio.gather(*(pool.aquery("a", str(i)) for i in range(6)))
+    finally:
+        pool.close()
+
+    assert results == [[str(i)] for i in range(6)]
+    assert peak == 2